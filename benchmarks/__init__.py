@@ -0,0 +1 @@
+"""Repeatable performance benchmarks for the RAG pipeline."""
@@ -0,0 +1,48 @@
+"""End-to-end generate_answer benchmarks against the stubbed LLM."""
+
+import statistics
+import time
+from typing import Dict, Any, List
+
+from benchmarks.harness import latency_metrics, metric, time_repeated
+from src.generation.answer_generator import AnswerGenerator
+from src.retrieval.retriever import DocumentRetriever
+
+
+def bench_generate_answer(generator: AnswerGenerator, queries: List[str], repeat: int) -> Dict[str, Any]:
+    """Latency percentiles of sequential generate_answer calls."""
+    for query in queries:
+        generator.generate_answer(query, log_interaction=False)
+
+    durations = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            generator.generate_answer(query, log_interaction=False)
+            durations.append(time.perf_counter() - start)
+
+    results = latency_metrics(durations)
+    results['queries_per_s'] = metric(
+        len(durations) / sum(durations), "queries/s", better="higher", gate=False
+    )
+    return results
+
+
+def bench_generate_answers(generator: AnswerGenerator, queries: List[str], repeat: int) -> Dict[str, Any]:
+    """Throughput of the concurrent bulk answering API over the median of repeated batches."""
+    durations = time_repeated(lambda: generator.generate_answers(queries, log_interaction=False), repeat)
+    return {'queries_per_s': metric(len(queries) / statistics.median(durations), "queries/s", better="higher")}
+
+
+def run(queries: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Run end-to-end answering benchmarks for each vector store backend.
+
+    Returns:
+        Results keyed by benchmark name
+    """
+    results = {}
+    for store_type in ("chromadb", "numpy"):
+        generator = AnswerGenerator(retriever=DocumentRetriever(store_type=store_type))
+        results[f"generate_answer_{store_type}"] = bench_generate_answer(generator, queries, repeat)
+        results[f"generate_answers_batch_{store_type}"] = bench_generate_answers(generator, queries, repeat)
+    return results
@@ -0,0 +1,123 @@
+"""Ingestion benchmarks: text cleaning, chunking and vector store build."""
+
+import json
+import logging
+import time
+from typing import Dict, Any, List
+
+from benchmarks.harness import metric, throughput_metric, time_repeated
+from src.data_preparation.chunker import DocumentChunker
+from src.data_preparation.document_loader import DocumentLoader
+from src.data_preparation.text_cleaner import TextCleaner
+from src.embeddings.embedding_generator import EmbeddingGenerator
+from src.embeddings.embedding_store import EmbeddingStore
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _corpus_bytes(documents: List[Dict[str, str]]) -> int:
+    return sum(len(doc['content'].encode('utf-8')) for doc in documents)
+
+
+def bench_text_cleaning(documents: List[Dict[str, str]], repeat: int) -> Dict[str, Any]:
+    """Throughput of TextCleaner.clean_text over the raw documents."""
+    cleaner = TextCleaner()
+    durations = time_repeated(
+        lambda: [cleaner.clean_text(doc['content']) for doc in documents], repeat
+    )
+    return {
+        'throughput': throughput_metric(_corpus_bytes(documents), durations),
+        'documents': len(documents),
+    }
+
+
+def bench_chunking(documents: List[Dict[str, str]], repeat: int) -> Dict[str, Any]:
+    """Throughput of DocumentChunker.chunk_documents over the cleaned documents."""
+    chunker = DocumentChunker()
+    chunk_counts = []
+    durations = time_repeated(
+        lambda: chunk_counts.append(len(chunker.chunk_documents(documents))), repeat
+    )
+    return {
+        'throughput': throughput_metric(_corpus_bytes(documents), durations),
+        'chunks': chunk_counts[-1],
+    }
+
+
+def prepare_chunks(documents: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Chunk and embed the corpus and write it where build_vector_store reads it."""
+    try:
+        chunks = DocumentChunker().chunk_documents(documents)
+    except Exception as e:
+        # The tokenizer vocabulary may be unavailable offline
+        logger.warning(f"Chunking failed ({e}); using processed_chunks.json")
+        with open(Config.CHUNKS_DATA_DIR / "processed_chunks.json", 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+
+    generator = EmbeddingGenerator()
+    embeddings = generator.embeddings.embed_documents([chunk['content'] for chunk in chunks])
+    for chunk, embedding in zip(chunks, embeddings):
+        chunk['embedding'] = embedding
+
+    with open(Config.CHUNKS_WITH_EMBEDDINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(chunks, f)
+    EmbeddingStore.write(chunks)
+    return chunks
+
+
+def bench_build_vector_store(chunk_count: int) -> Dict[str, Any]:
+    """Wall time of one build_vector_store run into the scratch directory.
+
+    A single build is too noisy to gate on, so both metrics are only reported.
+    """
+    from src.embeddings.build_vector_store import build_vector_store
+
+    start = time.perf_counter()
+    build_vector_store()
+    elapsed = time.perf_counter() - start
+    return {
+        'build_time_s': metric(elapsed, "s", gate=False),
+        'chunks_per_s': metric(chunk_count / elapsed, "chunks/s", better="higher", gate=False),
+    }
+
+
+def run(repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Run the ingestion benchmarks.
+
+    Returns:
+        Results keyed by benchmark name
+    """
+    results = {}
+    raw_documents = DocumentLoader().load_all_documents()
+    results['text_cleaning'] = bench_text_cleaning(raw_documents, repeat)
+
+    cleaner = TextCleaner()
+    documents = [cleaner.clean_document(doc) for doc in raw_documents]
+    try:
+        results['chunking'] = bench_chunking(documents, repeat)
+    except Exception as e:
+        logger.error(f"Chunking benchmark failed: {e}")
+        results['chunking'] = {'error': str(e)}
+
+    chunks = prepare_chunks(documents)
+    results['build_vector_store'] = bench_build_vector_store(len(chunks))
+    return results
+
+
+def build_scratch_index() -> int:
+    """Build chunks, embeddings and the vector store in the current environment.
+
+    Used by tools that need a populated index under benchmark_environment
+    without timing the build.
+
+    Returns:
+        Number of indexed chunks
+    """
+    from src.embeddings.build_vector_store import build_vector_store
+
+    cleaner = TextCleaner()
+    documents = [cleaner.clean_document(doc) for doc in DocumentLoader().load_all_documents()]
+    chunks = prepare_chunks(documents)
+    build_vector_store()
+    return len(chunks)
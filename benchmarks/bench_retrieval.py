@@ -0,0 +1,55 @@
+"""Retrieval latency benchmarks for both vector store backends."""
+
+import time
+from typing import Dict, Any, List
+
+from benchmarks.harness import latency_metrics, metric
+from src.retrieval.retriever import DocumentRetriever
+
+TOP_K_VALUES = (1, 3, 5, 10)
+
+
+def bench_retrieve(
+    retriever: DocumentRetriever,
+    queries: List[str],
+    top_k: int,
+    repeat: int
+) -> Dict[str, Any]:
+    """Latency percentiles of DocumentRetriever.retrieve over the test queries."""
+
+    # Warm up caches for this top_k with one full pass
+    for query in queries:
+        retriever.retrieve(query, top_k)
+
+    durations = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            retriever.retrieve(query, top_k)
+            durations.append(time.perf_counter() - start)
+
+    results = latency_metrics(durations)
+    results['queries_per_s'] = metric(
+        len(durations) / sum(durations), "queries/s", better="higher", gate=False
+    )
+    return results
+
+
+def run(queries: List[str], repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Run retrieval benchmarks for each backend and top_k.
+
+    Returns:
+        Results keyed by 'retrieve_<backend>_top<k>'
+    """
+    results = {}
+    for store_type in ("chromadb", "numpy"):
+        retriever = DocumentRetriever(store_type=store_type)
+        # Settle connections and lazily loaded indexes before the first timed top_k
+        for _ in range(repeat):
+            for query in queries:
+                retriever.retrieve(query, max(TOP_K_VALUES))
+        for top_k in TOP_K_VALUES:
+            results[f"retrieve_{store_type}_top{top_k}"] = bench_retrieve(
+                retriever, queries, top_k, repeat
+            )
+    return results
@@ -0,0 +1,74 @@
+"""Isolated, offline configuration for benchmark runs."""
+
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from src.utils.config import Config
+from src.utils.mock_openai_server import start_server
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def benchmark_environment(
+    workdir: Path,
+    live: bool = False,
+    latency_ms: float = 0.0,
+    caches: bool = False,
+    **server_settings
+) -> Iterator[Path]:
+    """Point Config at a scratch directory and, unless live, at the mock server.
+
+    Caches are disabled by default so every run measures the uncached
+    path. The vector store, chunk files and cache files are created under
+    workdir instead of the project data directories.
+
+    Args:
+        workdir: Scratch directory for this run
+        live: Use the configured OpenAI endpoint instead of the local stand-in
+        latency_ms: Simulated upstream latency when using the stand-in
+        caches: Keep the embedding, semantic and completion caches enabled
+        **server_settings: Further MockSettings for the stand-in
+
+    Yields:
+        The scratch directory
+    """
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    overrides = {
+        'VECTOR_STORE_PATH': workdir / "chroma_db",
+        'CHUNKS_WITH_EMBEDDINGS_FILE': workdir / "chunks_with_embeddings.json",
+        'EMBEDDING_STORE_DIR': workdir / "embedding_store",
+        'CACHE_DIR': workdir / "cache",
+        'EMBEDDING_CACHE_PATH': workdir / "cache" / "query_embeddings.sqlite",
+        'COMPLETION_CACHE_PATH': workdir / "cache" / "completions.sqlite",
+        'EMBEDDING_CACHE_ENABLED': caches and Config.EMBEDDING_CACHE_ENABLED,
+        'SEMANTIC_CACHE_ENABLED': caches and Config.SEMANTIC_CACHE_ENABLED,
+        'COMPLETION_CACHE_ENABLED': caches and Config.COMPLETION_CACHE_ENABLED,
+    }
+
+    server = None
+    if not live:
+        server = start_server(latency_ms=latency_ms, **server_settings)
+        overrides.update({
+            'OPENAI_BASE_URL': server.base_url,
+            'OPENAI_API_KEY': Config.OPENAI_API_KEY or "mock",
+            'EMBEDDING_CHECK_CTX_LENGTH': False,
+        })
+
+    saved = {name: getattr(Config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    try:
+        yield workdir
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
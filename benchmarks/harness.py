@@ -0,0 +1,203 @@
+"""Timing helpers, result files and baseline comparison for the benchmarks."""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+
+def metric(value: float, unit: str, better: str = "lower", gate: bool = True) -> Dict[str, Any]:
+    """Build one result metric.
+
+    Args:
+        value: Measured value
+        unit: Unit label, e.g. 'ms' or 'MB/s'
+        better: 'lower' or 'higher'; the direction counted as an improvement
+        gate: Whether a regression fails the run; tail percentiles and
+              single-shot timings are too noisy and are only reported
+
+    Returns:
+        Metric dictionary stored in the results file
+    """
+    return {'value': round(float(value), 6), 'unit': unit, 'better': better, 'gate': gate}
+
+
+def time_repeated(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """Call fn repeatedly and return the duration of each call in seconds."""
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def latency_metrics(durations: List[float], prefix: str = "") -> Dict[str, Dict[str, Any]]:
+    """p50/p95/p99/mean latency metrics in milliseconds; only the median is gated."""
+    ms = np.asarray(durations) * 1000
+    return {
+        f"{prefix}p50_ms": metric(np.percentile(ms, 50), "ms"),
+        f"{prefix}p95_ms": metric(np.percentile(ms, 95), "ms", gate=False),
+        f"{prefix}p99_ms": metric(np.percentile(ms, 99), "ms", gate=False),
+        f"{prefix}mean_ms": metric(statistics.fmean(ms), "ms", gate=False),
+    }
+
+
+def throughput_metric(total_bytes: int, durations: List[float]) -> Dict[str, Any]:
+    """MB/s over the median run, which is robust to scheduler noise."""
+    return metric(total_bytes / 1e6 / statistics.median(durations), "MB/s", better="higher")
+
+
+def environment_info() -> Dict[str, Any]:
+    """Describe the machine and revision a result was produced on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def write_results(results: Dict[str, Any], path: Path) -> Path:
+    """Write a results document as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Read a results document."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2
+) -> List[Dict[str, Any]]:
+    """Compare the metrics of a run against the baseline.
+
+    Benchmarks that failed in this run are reported with status 'error',
+    and baseline metrics of the suites that ran but absent from this run
+    with status 'missing', so neither can drop out of the comparison
+    unnoticed.
+
+    Args:
+        current: Results of this run
+        baseline: Stored baseline results
+        tolerance: Allowed relative change in the worse direction
+
+    Returns:
+        One row per metric with 'benchmark', 'metric', 'baseline',
+        'current', 'change' (relative), 'gate' and 'status' ('ok',
+        'improved', 'regressed', 'error' or 'missing')
+    """
+    rows = []
+    current_benchmarks = current.get('benchmarks', {})
+    base_benchmarks = baseline.get('benchmarks', {})
+
+    for name, metrics in current_benchmarks.items():
+        if 'error' in metrics:
+            rows.append(_problem_row(name, "", "error", metrics['error']))
+            continue
+        base_metrics = base_benchmarks.get(name, {})
+        for key, entry in metrics.items():
+            base = base_metrics.get(key)
+            if not _is_metric(entry) or not _is_metric(base) or not base['value']:
+                continue
+
+            change = (entry['value'] - base['value']) / base['value']
+            worse = change if entry['better'] == "lower" else -change
+            if worse > tolerance:
+                status = "regressed"
+            elif worse < -tolerance:
+                status = "improved"
+            else:
+                status = "ok"
+
+            rows.append({
+                'benchmark': name,
+                'metric': key,
+                'unit': entry['unit'],
+                'baseline': base['value'],
+                'current': entry['value'],
+                'change': change,
+                'gate': entry.get('gate', True) and base.get('gate', True),
+                'status': status
+            })
+
+    # Only benchmarks of the suites run this time are expected
+    expected = {
+        name
+        for suite in current.get('settings', {}).get('suites', [])
+        for name in baseline.get('suites', {}).get(suite, [])
+    }
+    for name in sorted(expected):
+        for key, base in base_benchmarks.get(name, {}).items():
+            if _is_metric(base) and not _is_metric(current_benchmarks.get(name, {}).get(key)):
+                if 'error' not in current_benchmarks.get(name, {}):
+                    rows.append(_problem_row(name, key, "missing", "not measured in this run"))
+    return rows
+
+
+def _is_metric(entry: Any) -> bool:
+    return isinstance(entry, dict) and 'value' in entry
+
+
+def _problem_row(benchmark: str, metric_name: str, status: str, detail: str) -> Dict[str, Any]:
+    """Comparison row for a benchmark that failed or a metric that was not measured."""
+    return {
+        'benchmark': benchmark,
+        'metric': metric_name,
+        'unit': "",
+        'baseline': None,
+        'current': None,
+        'change': None,
+        'gate': True,
+        'status': status,
+        'detail': detail
+    }
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render comparison rows as a text table.
+
+    Metrics that are reported but not gated are marked with '(info)'.
+    """
+    lines = [f"{'benchmark':<32} {'metric':<22} {'baseline':>12} {'current':>12} {'change':>8}  status"]
+    for row in rows:
+        if row['change'] is None:
+            lines.append(
+                f"{row['benchmark']:<32} {row['metric']:<22} {'-':>12} {'-':>12} {'-':>8}  "
+                f"{row['status']}: {row['detail']}"
+            )
+            continue
+        status = row['status'] if row['gate'] else f"{row['status']} (info)"
+        lines.append(
+            f"{row['benchmark']:<32} {row['metric']:<22} {row['baseline']:>12.3f} "
+            f"{row['current']:>12.3f} {row['change']:>+7.1%}  {status}"
+        )
+    return "\n".join(lines)
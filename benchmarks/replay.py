@@ -0,0 +1,309 @@
+"""Replay recorded queries against AnswerGenerator at a target arrival rate.
+
+Usage:
+    python -m benchmarks.replay logs/interactions.jsonl --rate 5 --concurrency 16 --duration 60
+    python -m benchmarks.replay logs/interactions.jsonl --offline --upstream-latency-ms 400
+
+Queries are read from any JSONL file with a 'query' or 'question' field,
+such as the interaction log, whose rotated (optionally gzipped) segments
+are replayed before the live file. Requests arrive open-loop (Poisson by default)
+so a slow system accumulates a queue instead of silently lowering the load,
+and latency is measured from each request's scheduled arrival time. At most
+--concurrency requests are answered at once.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.generation.batch import read_queries
+from src.utils.log_analytics import resolve_inputs
+
+logger = logging.getLogger(__name__)
+
+
+def load_queries(path: Path, shuffle: bool = False, seed: Optional[int] = None) -> List[str]:
+    """Read the query mix to replay.
+
+    Args:
+        path: JSONL or CSV file with 'query' or 'question' fields, or a log
+              directory; an interaction log includes its rotated segments
+        shuffle: Randomize the replay order
+        seed: Random seed for shuffling
+
+    Returns:
+        Non-empty queries in replay order
+    """
+    queries = [
+        query
+        for input_file in resolve_inputs([path])
+        for query in read_queries(input_file)
+        if query and query.strip()
+    ]
+    if not queries:
+        raise ValueError(f"No queries found in {path}")
+    if shuffle:
+        random.Random(seed).shuffle(queries)
+    return queries
+
+
+def arrival_offsets(
+    rate: float,
+    duration: Optional[float],
+    max_requests: Optional[int],
+    arrival: str = "poisson",
+    seed: Optional[int] = None
+) -> List[float]:
+    """Schedule request start times, in seconds from the start of the run.
+
+    Args:
+        rate: Mean arrivals per second
+        duration: Stop scheduling after this many seconds
+        max_requests: Stop scheduling after this many requests
+        arrival: 'poisson' (exponential gaps) or 'uniform' (fixed gaps)
+        seed: Random seed for Poisson arrivals
+
+    Returns:
+        Sorted arrival offsets
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    if duration is None and max_requests is None:
+        raise ValueError("Set a duration or a maximum number of requests")
+
+    rng = random.Random(seed)
+    offsets = []
+    t = 0.0
+    while True:
+        if max_requests is not None and len(offsets) >= max_requests:
+            break
+        if duration is not None and t >= duration:
+            break
+        offsets.append(t)
+        t += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+    return offsets
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'mean': None, 'max': None}
+    ms = np.asarray(values) * 1000
+    return {
+        'p50': float(np.percentile(ms, 50)),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+        'mean': float(ms.mean()),
+        'max': float(ms.max()),
+    }
+
+
+def run_replay(
+    answer_generator,
+    queries: List[str],
+    rate: float,
+    concurrency: int = 8,
+    duration: Optional[float] = 60.0,
+    max_requests: Optional[int] = None,
+    arrival: str = "poisson",
+    seed: Optional[int] = None,
+    top_k: int = None,
+    log_interaction: bool = False
+) -> Dict[str, Any]:
+    """Replay queries against an AnswerGenerator and summarize the run.
+
+    Args:
+        answer_generator: AnswerGenerator under test
+        queries: Query mix, cycled in order
+        rate: Target arrivals per second
+        concurrency: Maximum requests answered at once
+        duration: Seconds of arrivals to schedule
+        max_requests: Cap on the number of requests
+        arrival: 'poisson' or 'uniform'
+        seed: Random seed for arrivals
+        top_k: Number of documents to retrieve per query
+        log_interaction: Write each answer to the interaction log
+
+    Returns:
+        Report with request counts, error rate, throughput, latency
+        percentiles in ms (end-to-end from scheduled arrival, service time
+        and queue wait) and cache hit rates
+    """
+    offsets = arrival_offsets(rate, duration, max_requests, arrival, seed)
+    retriever = answer_generator.retriever
+    embedding_stats_before = retriever.cache_stats()
+
+    records = []
+    records_lock = threading.Lock()
+
+    def answer(query: str, scheduled: float):
+        started = time.perf_counter()
+        error = None
+        cache = None
+        try:
+            result = answer_generator.generate_answer(
+                query, top_k=top_k, log_interaction=log_interaction
+            )
+            cache = result.get('cache')
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+        with records_lock:
+            records.append({
+                'latency': finished - scheduled,
+                'service': finished - started,
+                'queue': started - scheduled,
+                'cache': cache,
+                'error': error
+            })
+
+    run_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i, offset in enumerate(offsets):
+            scheduled = run_start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(answer, queries[i % len(queries)], scheduled)
+    elapsed = time.perf_counter() - run_start
+
+    ok = [r for r in records if r['error'] is None]
+    errors = Counter(r['error'].split(":")[0] for r in records if r['error'] is not None)
+    caches = Counter(r['cache'] for r in ok)
+
+    report = {
+        'requests': len(records),
+        'succeeded': len(ok),
+        'errors': sum(errors.values()),
+        'error_rate': sum(errors.values()) / len(records) if records else 0.0,
+        'error_types': dict(errors),
+        'elapsed_s': elapsed,
+        'offered_rate': rate,
+        'throughput': len(ok) / elapsed if elapsed > 0 else 0.0,
+        'concurrency': concurrency,
+        'latency_ms': _percentiles([r['latency'] for r in ok]),
+        'service_ms': _percentiles([r['service'] for r in ok]),
+        'queue_ms': _percentiles([r['queue'] for r in records]),
+        'cache_hit_rates': {
+            'semantic': caches['semantic'] / len(ok) if ok else 0.0,
+            'completion': caches['completion'] / len(ok) if ok else 0.0,
+        },
+    }
+
+    embedding_stats = retriever.cache_stats()
+    if embedding_stats:
+        lookups_before = sum(embedding_stats_before.get(k, 0) for k in ('memory_hits', 'disk_hits', 'misses'))
+        hits_before = sum(embedding_stats_before.get(k, 0) for k in ('memory_hits', 'disk_hits'))
+        lookups = sum(embedding_stats[k] for k in ('memory_hits', 'disk_hits', 'misses')) - lookups_before
+        hits = sum(embedding_stats[k] for k in ('memory_hits', 'disk_hits')) - hits_before
+        report['cache_hit_rates']['embedding'] = hits / lookups if lookups else 0.0
+
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a replay report for the terminal."""
+    def row(label, stats):
+        if stats['p50'] is None:
+            return f"{label:<22} n/a"
+        return (
+            f"{label:<22} p50 {stats['p50']:8.1f}  p95 {stats['p95']:8.1f}  "
+            f"p99 {stats['p99']:8.1f}  max {stats['max']:8.1f}"
+        )
+
+    hit_rates = ", ".join(f"{name} {rate:.1%}" for name, rate in report['cache_hit_rates'].items())
+    return "\n".join([
+        f"Requests: {report['requests']} in {report['elapsed_s']:.1f}s "
+        f"(offered {report['offered_rate']:.2f}/s, concurrency {report['concurrency']})",
+        f"Throughput: {report['throughput']:.2f} answers/s",
+        f"Errors: {report['errors']} ({report['error_rate']:.2%}) {report['error_types'] or ''}",
+        row("Latency (ms)", report['latency_ms']),
+        row("Service time (ms)", report['service_ms']),
+        row("Queue wait (ms)", report['queue_ms']),
+        f"Cache hit rates: {hit_rates}",
+    ])
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Replay recorded queries as load")
+    parser.add_argument("queries", type=Path, nargs="?", default=Path("logs/interactions.jsonl"),
+                        help="JSONL file of queries (default logs/interactions.jsonl)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Target arrivals per second")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of arrivals")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--shuffle", action="store_true", help="Randomize the query order")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--log", action="store_true", help="Write answers to the interaction log")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use the local OpenAI stand-in and a scratch index")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                        help="Median stand-in latency (with --offline)")
+    parser.add_argument("--upstream-latency-sigma", type=float, default=0.0,
+                        help="Log-normal spread of the stand-in latency (with --offline)")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0,
+                        help="Stand-in HTTP 500 probability (with --offline)")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    # Pipeline modules configure INFO logging on import; keep the report readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    queries = load_queries(args.queries, args.shuffle, args.seed)
+    replay_args = dict(
+        queries=queries,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        duration=args.duration if args.requests is None else None,
+        max_requests=args.requests,
+        arrival=args.arrival,
+        seed=args.seed,
+        top_k=args.top_k,
+        log_interaction=args.log
+    )
+
+    from src.generation.answer_generator import AnswerGenerator
+
+    if args.offline:
+        from benchmarks.bench_ingest import build_scratch_index
+        from benchmarks.environment import benchmark_environment
+
+        with tempfile.TemporaryDirectory(prefix="rag-replay-") as workdir:
+            with benchmark_environment(
+                Path(workdir),
+                latency_ms=args.upstream_latency_ms,
+                caches=True,
+                latency_sigma=args.upstream_latency_sigma,
+                error_rate=args.upstream_error_rate,
+                seed=args.seed
+            ):
+                build_scratch_index()
+                report = run_replay(AnswerGenerator(), **replay_args)
+    else:
+        report = run_replay(AnswerGenerator(), **replay_args)
+
+    print(format_report(report))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Run the benchmark suite and compare against the stored baseline.
+
+Usage:
+    python -m benchmarks.run                     # run everything offline, compare to baseline
+    python -m benchmarks.run --only retrieval    # a single suite
+    python -m benchmarks.run --save-baseline     # store this run as the new baseline
+
+Embeddings and chat completions are served by the local OpenAI stand-in
+(src/utils/mock_openai_server.py) unless --live is given, so timings measure
+this code rather than the network. The committed benchmarks/baseline.json
+comes from an offline run; its 'environment' records the machine it was
+measured on. Only medians are gated; tail percentiles, means and
+single-shot timings are reported for information. Exits with status 1 if a
+gated metric regressed by more than --tolerance, and with status 2 if a
+benchmark failed, a baseline metric was not measured or there is no
+comparable baseline.
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import bench_generation, bench_ingest, bench_retrieval
+from benchmarks.environment import benchmark_environment
+from benchmarks.harness import (
+    BASELINE_FILE,
+    RESULTS_DIR,
+    compare_results,
+    environment_info,
+    format_comparison,
+    load_results,
+    write_results
+)
+from tests.test_queries import TEST_QUERIES
+
+logger = logging.getLogger(__name__)
+
+SUITES = ("ingest", "retrieval", "generation")
+
+
+def run_suites(suites, repeat: int, live: bool = False, latency_ms: float = 0.0) -> dict:
+    """Run the selected suites in a scratch environment.
+
+    The ingest suite always runs first when another suite needs the vector
+    store it builds.
+
+    Returns:
+        Results document with 'environment', 'settings', 'suites' (the
+        benchmark names of each suite) and 'benchmarks'
+    """
+    queries = [item['question'] for item in TEST_QUERIES]
+    by_suite = {}
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as workdir:
+        with benchmark_environment(Path(workdir), live=live, latency_ms=latency_ms):
+            ingest = bench_ingest.run(repeat)
+            if "ingest" in suites:
+                by_suite["ingest"] = ingest
+            if "retrieval" in suites:
+                by_suite["retrieval"] = bench_retrieval.run(queries, repeat)
+            if "generation" in suites:
+                by_suite["generation"] = bench_generation.run(queries, repeat)
+
+    return {
+        'environment': environment_info(),
+        'settings': {
+            'suites': list(suites),
+            'repeat': repeat,
+            'live': live,
+            'upstream_latency_ms': latency_ms,
+            'queries': len(queries)
+        },
+        'suites': {suite: list(results) for suite, results in by_suite.items()},
+        'benchmarks': {name: result for results in by_suite.values() for name, result in results.items()}
+    }
+
+
+def main(argv=None):
+    """Command-line entry point.
+
+    Returns:
+        0 if no gated metric regressed, 1 on regressions beyond the
+        tolerance, 2 if a benchmark failed, a baseline metric was not
+        measured, or the baseline is missing or was recorded in another mode
+    """
+    parser = argparse.ArgumentParser(description="Run the RAG benchmark suite")
+    parser.add_argument("--only", choices=SUITES, action="append",
+                        help="Run only this suite (may be repeated)")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetitions per measurement")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--offline", dest="live", action="store_false",
+                      help="Serve OpenAI calls from the local stand-in (default)")
+    mode.add_argument("--live", dest="live", action="store_true",
+                      help="Call the configured OpenAI endpoint instead of the local stand-in")
+    parser.set_defaults(live=False)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                        help="Simulated latency of the local stand-in")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.35,
+                        help="Allowed relative slowdown before a metric counts as regressed")
+    args = parser.parse_args(argv)
+    
+    # Pipeline modules configure INFO logging on import; keep the report readable
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_suites(
+        args.only or SUITES,
+        repeat=args.repeat,
+        live=args.live,
+        latency_ms=args.upstream_latency_ms
+    )
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    print(f"\nResults written to {write_results(results, output)}")
+
+    failed = sorted(name for name, result in results['benchmarks'].items() if 'error' in result)
+    if args.save_baseline:
+        if failed:
+            print(f"Not saving a baseline with failed benchmarks: {', '.join(failed)}")
+            return 2
+        print(f"Baseline saved to {write_results(results, args.baseline)}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 2
+
+    baseline = load_results(args.baseline)
+    baseline_live = baseline.get('settings', {}).get('live', False)
+    if baseline_live != args.live:
+        print(f"Baseline {args.baseline} was recorded {'live' if baseline_live else 'offline'}; "
+              f"rerun in the same mode or save a new baseline")
+        return 2
+
+    rows = compare_results(results, baseline, args.tolerance)
+    print("\n" + format_comparison(rows))
+
+    problems = [row for row in rows if row['status'] in ("error", "missing")]
+    if problems:
+        print(f"\n{len(problems)} benchmark(s) or metric(s) failed or were not measured")
+        return 2
+
+    regressions = [row for row in rows if row['status'] == "regressed" and row['gate']]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
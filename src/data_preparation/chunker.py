@@ -5,11 +5,26 @@ import tiktoken
 from typing import List, Dict, Any
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from src.data_preparation.manifest import content_hash
 from src.utils.config import Config
 
 logger = logging.getLogger(__name__)
 
 
+class ApproximateEncoder:
+    """Fallback encoder used when the tiktoken encoding cannot be loaded.
+    
+    Treats every 4 characters as one token, the same estimate the
+    character-based splitter uses.
+    """
+    
+    def encode(self, text: str) -> List[str]:
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+    
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
 class DocumentChunker:
     """Chunks documents into smaller segments with specified token size and overlap."""
     
@@ -30,12 +45,14 @@ class DocumentChunker:
         self.chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP
         self.encoding_name = encoding_name
         
-        # Initialize tiktoken encoder
+        # Initialize tiktoken encoder; its vocabulary may not be downloadable offline
         try:
             self.encoder = tiktoken.get_encoding(encoding_name)
         except Exception as e:
-            logger.warning(f"Could not load encoding {encoding_name}, using default: {e}")
-            self.encoder = tiktoken.get_encoding("cl100k_base")
+            logger.warning(
+                f"Could not load encoding {encoding_name}, estimating tokens from length: {e}"
+            )
+            self.encoder = ApproximateEncoder()
         
         # Initialize text splitter
         # Note: RecursiveCharacterTextSplitter uses characters, not tokens
@@ -111,7 +128,8 @@ class DocumentChunker:
                     'source': source,
                     'chunk_id': i,
                     'token_count': self.count_tokens(chunk_text),
-                    'char_count': len(chunk_text)
+                    'char_count': len(chunk_text),
+                    'content_hash': content_hash(chunk_text)
                 }
             }
             chunks.append(chunk_dict)
@@ -0,0 +1,152 @@
+"""Content-hash manifest for incremental ingestion.
+
+The manifest records, for every ingested document, the hash of its raw
+text and the hashes of the chunks produced from it, together with the
+chunking settings. The next run compares against it to rechunk only the
+documents that changed and to report which chunks were added, changed or
+removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    """Short stable hash of a text.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        First 16 hex digits of the SHA-256 of the UTF-8 text
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def chunk_hash(chunk: Dict[str, Any]) -> str:
+    """Content hash of a chunk, computed if its metadata does not carry one."""
+    return chunk.get('metadata', {}).get('content_hash') or content_hash(chunk['content'])
+
+
+def chunking_settings() -> Dict[str, Any]:
+    """Settings that change the chunks produced from unchanged documents."""
+    return {'chunk_size': Config.CHUNK_SIZE, 'chunk_overlap': Config.CHUNK_OVERLAP}
+
+
+class IngestionManifest:
+    """Per-file and per-chunk content hashes of the last ingestion run."""
+
+    def __init__(self, settings: Dict[str, Any] = None, files: Dict[str, Dict[str, Any]] = None):
+        """Initialize a manifest.
+
+        Args:
+            settings: Chunking settings the hashes were produced with
+            files: Filename to {'hash': file hash, 'chunks': chunk hashes in chunk_id order}
+        """
+        self.settings = settings if settings is not None else chunking_settings()
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, path: Path = None) -> "IngestionManifest":
+        """Load a manifest, or return an empty one if none can be read.
+
+        Args:
+            path: Manifest file (default Config.INGESTION_MANIFEST_FILE)
+
+        Returns:
+            The stored manifest (empty if missing, unreadable or outdated)
+        """
+        path = Path(path or Config.INGESTION_MANIFEST_FILE)
+        if not path.exists():
+            return cls(settings={})
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable ingestion manifest {path}: {e}")
+            return cls(settings={})
+        if data.get('version') != MANIFEST_VERSION:
+            logger.warning(f"Ignoring ingestion manifest {path} with version {data.get('version')}")
+            return cls(settings={})
+        return cls(settings=data.get('settings', {}), files=data.get('files', {}))
+
+    def save(self, path: Path = None):
+        """Write the manifest atomically.
+
+        Args:
+            path: Manifest file (default Config.INGESTION_MANIFEST_FILE)
+        """
+        path = Path(path or Config.INGESTION_MANIFEST_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'settings': self.settings,
+            'files': self.files
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def is_current(self, filename: str, file_hash: str, settings: Dict[str, Any] = None) -> bool:
+        """Whether a document is unchanged since the run this manifest describes.
+
+        Args:
+            filename: Document filename
+            file_hash: content_hash of the document's raw text
+            settings: Current chunking settings (default chunking_settings())
+
+        Returns:
+            True if the text and the chunking settings are both unchanged
+        """
+        entry = self.files.get(filename)
+        return (
+            entry is not None
+            and entry.get('hash') == file_hash
+            and self.settings == (settings if settings is not None else chunking_settings())
+        )
+
+    def record(self, filename: str, file_hash: str, chunks: List[Dict[str, Any]]):
+        """Record the hash of a document and of the chunks produced from it."""
+        self.files[filename] = {
+            'hash': file_hash,
+            'chunks': [chunk_hash(chunk) for chunk in chunks]
+        }
+
+    def chunk_hashes(self) -> Dict[str, str]:
+        """Map 'source::chunk_id' to the content hash of that chunk."""
+        return {
+            f"{filename}::{chunk_id}": hash_
+            for filename, entry in self.files.items()
+            for chunk_id, hash_ in enumerate(entry.get('chunks', []))
+        }
+
+    def diff(self, previous: "IngestionManifest") -> Dict[str, List[str]]:
+        """Compare the chunks of this manifest against an earlier one.
+
+        Args:
+            previous: Manifest of the earlier run
+
+        Returns:
+            Dictionary of 'added', 'changed', 'removed' and 'unchanged'
+            'source::chunk_id' keys
+        """
+        old, new = previous.chunk_hashes(), self.chunk_hashes()
+        return {
+            'added': sorted(key for key in new if key not in old),
+            'changed': sorted(key for key in new if key in old and old[key] != new[key]),
+            'removed': sorted(key for key in old if key not in new),
+            'unchanged': sorted(key for key in new if old.get(key) == new[key]),
+        }
@@ -1,5 +1,6 @@
 """Data processing pipeline to load, clean, and chunk documents."""
 
+import argparse
 import json
 import logging
 from pathlib import Path
@@ -8,15 +9,27 @@ from typing import List, Dict, Any
 from src.data_preparation.document_loader import DocumentLoader
 from src.data_preparation.text_cleaner import TextCleaner
 from src.data_preparation.chunker import DocumentChunker
+from src.data_preparation.manifest import (
+    IngestionManifest, chunk_hash, chunking_settings, content_hash
+)
 from src.utils.config import Config
+from src.utils.profiling import profiled
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def process_documents() -> List[Dict[str, Any]]:
+@profiled("process_documents")
+def process_documents(incremental: bool = True) -> List[Dict[str, Any]]:
     """Process all documents: load, clean, and chunk.
     
+    With incremental processing, documents whose text and chunking settings
+    are unchanged since the last run (per the ingestion manifest) keep their
+    previous chunks; only new or changed documents are cleaned and chunked.
+    
+    Args:
+        incremental: Reuse the chunks of unchanged documents
+    
     Returns:
         List of all chunks from all documents
     """
@@ -24,6 +37,11 @@ def process_documents() -> List[Dict[str, Any]]:
     logger.info("Starting document processing pipeline")
     logger.info("=" * 60)
     
+    chunks_file = Config.CHUNKS_DATA_DIR / "processed_chunks.json"
+    settings = chunking_settings()
+    previous_manifest = IngestionManifest.load() if incremental else IngestionManifest(settings={})
+    previous_chunks = _load_chunks_by_source(chunks_file) if incremental else {}
+    
     # Step 1: Load documents
     logger.info("\n[Step 1/3] Loading documents...")
     loader = DocumentLoader()
@@ -32,13 +50,34 @@ def process_documents() -> List[Dict[str, Any]]:
     logger.info(f"Loaded {stats['total_documents']} documents")
     logger.info(f"Total words: {stats['total_words']:,}")
     
+    manifest = IngestionManifest(settings=settings)
+    chunks_by_source = {}
+    changed_documents = []
+    for doc in documents:
+        file_hash = content_hash(doc['content'])
+        reusable = previous_chunks.get(doc['filename'])
+        if (
+            reusable
+            and previous_manifest.is_current(doc['filename'], file_hash, settings)
+            # The saved chunks must be the ones the manifest describes
+            and previous_manifest.files[doc['filename']]['chunks'] == [chunk_hash(c) for c in reusable]
+        ):
+            chunks_by_source[doc['filename']] = reusable
+            manifest.record(doc['filename'], file_hash, reusable)
+        else:
+            changed_documents.append((doc, file_hash))
+    logger.info(
+        f"{len(changed_documents)} new or changed documents, "
+        f"{len(documents) - len(changed_documents)} unchanged"
+    )
+    
     # Step 2: Clean documents
     logger.info("\n[Step 2/3] Cleaning documents...")
     cleaner = TextCleaner()
     cleaned_documents = []
-    for doc in documents:
+    for doc, file_hash in changed_documents:
         cleaned_doc = cleaner.clean_document(doc)
-        cleaned_documents.append(cleaned_doc)
+        cleaned_documents.append((cleaned_doc, file_hash))
         logger.info(
             f"  {doc['filename']}: "
             f"{cleaned_doc['original_length']:,} → {cleaned_doc['cleaned_length']:,} chars"
@@ -47,7 +86,17 @@ def process_documents() -> List[Dict[str, Any]]:
     # Step 3: Chunk documents
     logger.info("\n[Step 3/3] Chunking documents...")
     chunker = DocumentChunker()
-    all_chunks = chunker.chunk_documents(cleaned_documents)
+    for cleaned_doc, file_hash in cleaned_documents:
+        chunks = chunker.chunk_document(cleaned_doc)
+        chunks_by_source[cleaned_doc['filename']] = chunks
+        manifest.record(cleaned_doc['filename'], file_hash, chunks)
+    
+    # Keep the configured document order
+    all_chunks = [
+        chunk
+        for doc in documents
+        for chunk in chunks_by_source[doc['filename']]
+    ]
     
     # Validate chunks
     validation_stats = chunker.validate_chunks(all_chunks)
@@ -58,10 +107,16 @@ def process_documents() -> List[Dict[str, Any]]:
     logger.info(f"  Max tokens: {validation_stats['max_tokens']}")
     logger.info(f"  Avg tokens: {validation_stats['avg_tokens']:.1f}")
     
-    # Save chunks to JSON file
-    chunks_file = Config.CHUNKS_DATA_DIR / "processed_chunks.json"
+    changes = manifest.diff(previous_manifest)
+    logger.info(
+        f"Chunk changes: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+        f"{len(changes['removed'])} removed, {len(changes['unchanged'])} unchanged"
+    )
+    
+    # Save chunks to JSON file, then the manifest describing them
     with open(chunks_file, 'w', encoding='utf-8') as f:
         json.dump(all_chunks, f, ensure_ascii=False, indent=2)
+    manifest.save()
     logger.info(f"\nSaved {len(all_chunks)} chunks to {chunks_file}")
     
     logger.info("\n" + "=" * 60)
@@ -71,6 +126,41 @@ def process_documents() -> List[Dict[str, Any]]:
     return all_chunks
 
 
-if __name__ == "__main__":
-    chunks = process_documents()
+def _load_chunks_by_source(chunks_file: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Group the chunks of a previous run by source document."""
+    if not chunks_file.exists():
+        return {}
+    try:
+        with open(chunks_file, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Reprocessing all documents, could not read {chunks_file}: {e}")
+        return {}
+    
+    chunks_by_source = {}
+    for chunk in chunks:
+        chunks_by_source.setdefault(chunk['metadata']['source'], []).append(chunk)
+    return chunks_by_source
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Load, clean and chunk the policy documents")
+    parser.add_argument("--full", action="store_true",
+                        help="Reprocess and re-embed everything instead of only changed content")
+    parser.add_argument("--embed", action="store_true",
+                        help="Also update the embedding store, embedding only new or changed chunks")
+    args = parser.parse_args()
+    
+    chunks = process_documents(incremental=not args.full)
     print(f"\n✓ Successfully processed {len(chunks)} chunks")
+    
+    if args.embed:
+        from src.embeddings.embedding_generator import EmbeddingGenerator
+        
+        store = EmbeddingGenerator().update_embedding_store(chunks, reuse=not args.full)
+        print(f"✓ Embedding store {store.directory} holds {store.count()} chunks")
+
+
+if __name__ == "__main__":
+    main()
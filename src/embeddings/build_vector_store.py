@@ -1,83 +1,199 @@
 """Simplified vector store builder using LangChain's Chroma."""
 
+import argparse
 import json
 import logging
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import chromadb
+import numpy as np
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
-from langchain_core.documents import Document
 
+from src.embeddings.embedding_store import EmbeddingStore, make_chunk_id
 from src.utils.config import Config
+from src.utils.http_client import get_http_client, get_timeout
+from src.utils.profiling import profiled
+from src.utils.usage import UsageTrackingEmbeddings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def build_vector_store():
-    """Build the vector store from processed chunks."""
+@profiled("build_vector_store")
+def build_vector_store(
+    batch_size: int = None,
+    progress: Callable[[int, int], None] = None,
+    collect_garbage: bool = True
+):
+    """Build the vector store from processed chunks.
+    
+    Stored embeddings are bulk-upserted into the collection under stable
+    chunk ids (see make_chunk_id), so rebuilding into the same directory
+    updates the collection in place instead of adding another copy. The
+    embedding API is only called for chunks without a stored vector.
+    
+    Args:
+        batch_size: Chunks per upsert (default Config.VECTOR_STORE_BATCH_SIZE)
+        progress: Optional callback receiving (upserted, total) after each batch
+        collect_garbage: Delete vectors whose ids the current chunks no longer produce
+    
+    Returns:
+        The Chroma vector store
+    """
+    batch_size = batch_size or Config.VECTOR_STORE_BATCH_SIZE
     
     logger.info("=" * 60)
     logger.info("Building Vector Store with LangChain Chroma")
     logger.info("=" * 60)
     
-    # Load chunks with embeddings
-    chunks_file = Config.CHUNKS_DATA_DIR / "chunks_with_embeddings.json"
-    logger.info(f"\nLoading chunks from {chunks_file}...")
-    
-    with open(chunks_file, 'r', encoding='utf-8') as f:
-        chunks = json.load(f)
-    
+    chunks, vectors = _load_chunks()
     logger.info(f"Loaded {len(chunks)} chunks")
     
-    # Initialize embeddings
+    # Initialize embeddings (used for chunks without a vector and for queries)
     logger.info("\nInitializing OpenAI embeddings...")
     embeddings = OpenAIEmbeddings(
         model=Config.EMBEDDING_MODEL,
-        openai_api_key=Config.OPENAI_API_KEY
+        openai_api_key=Config.OPENAI_API_KEY,
+        base_url=Config.OPENAI_BASE_URL,
+        check_embedding_ctx_length=Config.EMBEDDING_CHECK_CTX_LENGTH,
+        timeout=get_timeout("embeddings"),
+        http_client=get_http_client("embeddings")
     )
     
-    # Convert chunks to LangChain Documents
-    logger.info("Converting chunks to documents...")
-    documents = []
-    for chunk in chunks:
-        # Convert metadata values to strings
-        metadata = {}
-        for key, value in chunk['metadata'].items():
-            metadata[key] = str(value)
-        
-        doc = Document(
-            page_content=chunk['content'],
-            metadata=metadata
-        )
-        documents.append(doc)
-    
-    logger.info(f"Created {len(documents)} documents")
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        logger.info(f"Embedding {len(missing)} chunks without a stored vector...")
+        tracked = UsageTrackingEmbeddings(embeddings, Config.EMBEDDING_MODEL)
+        new_vectors = tracked.embed_documents([chunks[i]['content'] for i in missing])
+        for i, vector in zip(missing, new_vectors):
+            vectors[i] = vector
+    logger.info(f"Reusing {len(chunks) - len(missing)} stored embeddings")
     
-    # Create Chroma vector store
+    # Create the chromadb collection
     logger.info(f"\nCreating Chroma vector store at {Config.VECTOR_STORE_PATH}...")
-    
-    vectorstore = Chroma.from_documents(
-        documents=documents,
-        embedding=embeddings,
-        collection_name=Config.COLLECTION_NAME,
-        persist_directory=str(Config.VECTOR_STORE_PATH)
+    client = chromadb.PersistentClient(path=str(Config.VECTOR_STORE_PATH))
+    collection = client.get_or_create_collection(
+        name=Config.COLLECTION_NAME,
+        embedding_function=None
     )
     
+    # Bulk-upsert the vectors directly, batch by batch
+    batch_size = min(batch_size, client.get_max_batch_size())
+    ids = [make_chunk_id(chunk['metadata'], chunk['content']) for chunk in chunks]
+    total = len(chunks)
+    for start in range(0, total, batch_size):
+        end = min(start + batch_size, total)
+        batch = chunks[start:end]
+        collection.upsert(
+            ids=ids[start:end],
+            embeddings=np.asarray(vectors[start:end], dtype=np.float32),
+            metadatas=[
+                # Convert metadata values to strings
+                {key: str(value) for key, value in chunk['metadata'].items()}
+                for chunk in batch
+            ],
+            documents=[chunk['content'] for chunk in batch]
+        )
+        logger.info(f"Upserted {end}/{total} chunks ({end / total:.0%})")
+        if progress is not None:
+            progress(end, total)
+    
+    if collect_garbage:
+        _collect_garbage(collection, set(ids), batch_size)
+    
+    # Record a new index version so answer caches drop stale entries
+    index_version = f"chroma:{datetime.now().isoformat()}"
+    version_file = Config.VECTOR_STORE_PATH / Config.INDEX_VERSION_FILE
+    version_file.write_text(index_version, encoding='utf-8')
+    
     logger.info(f"[OK] Vector store created successfully!")
     logger.info(f"Collection: {Config.COLLECTION_NAME}")
     logger.info(f"Location: {Config.VECTOR_STORE_PATH}")
-    logger.info(f"Total documents: {len(documents)}")
+    logger.info(f"Total documents: {collection.count()}")
     
     logger.info("\n" + "=" * 60)
     logger.info("[SUCCESS] Vector store build complete!")
     logger.info("=" * 60)
     
-    return vectorstore
+    # LangChain wrapper over the same client, for queries
+    return Chroma(
+        client=client,
+        collection_name=Config.COLLECTION_NAME,
+        embedding_function=embeddings
+    )
+
+
+def _collect_garbage(collection, keep_ids: Set[str], batch_size: int) -> int:
+    """Delete vectors whose ids are not among the current chunk ids.
+    
+    Removes chunks of deleted or changed text as well as the copies left
+    by builds that stored chunks under random ids.
+    
+    Args:
+        collection: Chroma collection
+        keep_ids: Ids of the current chunks
+        batch_size: Ids per get and delete request
+    
+    Returns:
+        Number of deleted vectors
+    """
+    stale = []
+    offset = 0
+    while True:
+        page = collection.get(include=[], limit=batch_size, offset=offset)['ids']
+        stale.extend(id_ for id_ in page if id_ not in keep_ids)
+        if len(page) < batch_size:
+            break
+        offset += batch_size
+    
+    for start in range(0, len(stale), batch_size):
+        collection.delete(ids=stale[start:start + batch_size])
+    logger.info(f"Removed {len(stale)} stale vectors")
+    return len(stale)
+
+
+def _load_chunks() -> Tuple[List[Dict[str, Any]], List[Optional[Sequence[float]]]]:
+    """Load chunks and their stored vectors (None where a chunk has none).
+    
+    Prefers the memory-mapped binary store over JSON; store rows are
+    returned as views and only copied batch by batch during the insert.
+    """
+    if EmbeddingStore.exists():
+        logger.info(f"\nOpening embedding store {Config.EMBEDDING_STORE_DIR}...")
+        store = EmbeddingStore()
+        chunks = store.get_chunks()
+        if store.header.get('model') != Config.EMBEDDING_MODEL:
+            logger.warning(
+                f"Stored embeddings were made with {store.header.get('model')}, "
+                f"not {Config.EMBEDDING_MODEL}; re-embedding all chunks"
+            )
+            return chunks, [None] * len(chunks)
+        return chunks, [store.matrix[record['row']] for record in store.records]
+    
+    chunks_file = Config.CHUNKS_WITH_EMBEDDINGS_FILE
+    logger.info(f"\nLoading chunks from {chunks_file}...")
+    with open(chunks_file, 'r', encoding='utf-8') as f:
+        chunks = json.load(f)
+    return chunks, [chunk.pop('embedding', None) for chunk in chunks]
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Build the Chroma vector store from stored embeddings")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Chunks per upsert (default VECTOR_STORE_BATCH_SIZE)")
+    parser.add_argument("--no-gc", action="store_true",
+                        help="Keep vectors whose chunks are no longer produced")
+    args = parser.parse_args()
+    build_vector_store(batch_size=args.batch_size, collect_garbage=not args.no_gc)
 
 
 if __name__ == "__main__":
     try:
-        build_vector_store()
+        main()
     except Exception as e:
         logger.error(f"[ERROR] Failed to build vector store: {e}")
         import traceback
@@ -1,13 +1,17 @@
 """Embedding generation module using OpenAI embeddings."""
 
+import json
 import logging
-import ssl
-import certifi
-import httpx
+from pathlib import Path
 from typing import List, Dict, Any
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
 
+from src.data_preparation.manifest import chunk_hash
+from src.embeddings.embedding_store import EmbeddingStore
 from src.utils.config import Config
+from src.utils.usage import UsageTrackingEmbeddings
+from src.utils.http_client import get_http_clients, get_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +19,22 @@ logger = logging.getLogger(__name__)
 class EmbeddingGenerator:
     """Generates embeddings for text chunks using OpenAI."""
     
-    def __init__(self, model_name: str = None, api_key: str = None):
+    def __init__(
+        self,
+        model_name: str = None,
+        api_key: str = None,
+        http_client=None,
+        http_async_client=None
+    ):
         """Initialize the embedding generator.
         
         Args:
             model_name: Name of the OpenAI embedding model (default from Config)
             api_key: OpenAI API key (default from Config)
+            http_client: httpx.Client for embedding requests
+                        (default: the shared pooled client)
+            http_async_client: httpx.AsyncClient for async embedding requests
+                              (default: the shared pooled client)
         """
         self.model_name = model_name or Config.EMBEDDING_MODEL
         self.api_key = api_key or Config.OPENAI_API_KEY
@@ -28,16 +42,21 @@ class EmbeddingGenerator:
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY in .env file.")
         
-        # Create custom HTTP client with SSL verification disabled (for development)
-        # Note: In production, you should fix SSL certificate issues properly
-        http_client = httpx.Client(verify=False)
+        # Reuse the process-wide pooled transport (see src/utils/http_client.py)
+        shared_client, shared_async_client = get_http_clients("embeddings")
         
         # Initialize OpenAI embeddings
         self.embeddings = OpenAIEmbeddings(
             model=self.model_name,
             openai_api_key=self.api_key,
-            http_client=http_client
+            base_url=Config.OPENAI_BASE_URL,
+            check_embedding_ctx_length=Config.EMBEDDING_CHECK_CTX_LENGTH,
+            timeout=get_timeout("embeddings"),
+            http_client=http_client or shared_client,
+            http_async_client=http_async_client or shared_async_client
         )
+        # Count the tokens of every text embedded during ingestion
+        self.embeddings = UsageTrackingEmbeddings(self.embeddings, self.model_name)
         
         logger.info(f"Initialized embedding generator with model: {self.model_name}")
     
@@ -103,6 +122,100 @@ class EmbeddingGenerator:
         logger.info(f"Added embeddings to {len(chunks_with_embeddings)} chunks")
         return chunks_with_embeddings
     
+    def save_embedding_store(
+        self,
+        chunks_with_embeddings: List[Dict[str, Any]],
+        directory: Path = None,
+        dtype: str = None
+    ) -> EmbeddingStore:
+        """Save chunks with embeddings in the compact binary store format.
+        
+        Args:
+            chunks_with_embeddings: Chunks with 'embedding' keys
+            directory: Store directory (default Config.EMBEDDING_STORE_DIR)
+            dtype: 'float32' or 'float16' (default Config.EMBEDDING_STORE_DTYPE)
+            
+        Returns:
+            The written embedding store
+        """
+        return EmbeddingStore.write(
+            chunks_with_embeddings,
+            directory=directory,
+            dtype=dtype,
+            model=self.model_name
+        )
+    
+    def update_embedding_store(
+        self,
+        chunks: List[Dict[str, Any]],
+        directory: Path = None,
+        dtype: str = None,
+        reuse: bool = True
+    ) -> EmbeddingStore:
+        """Write the embedding store for the current chunks, embedding only what changed.
+        
+        Vectors of chunks whose content hash is already in the existing store
+        (or in chunks_with_embeddings.json when there is no store yet) are
+        reused; only new or changed chunks are sent to the embedding API.
+        Chunks that are no longer produced are dropped from the store.
+        
+        Args:
+            chunks: Current chunks with 'content' and 'metadata' keys
+            directory: Store directory (default Config.EMBEDDING_STORE_DIR)
+            dtype: 'float32' or 'float16' (default Config.EMBEDDING_STORE_DTYPE)
+            reuse: Reuse existing vectors; False re-embeds every chunk
+            
+        Returns:
+            The written embedding store
+        """
+        existing = self._load_existing_embeddings(directory) if reuse else {}
+        
+        hashes = [chunk_hash(chunk) for chunk in chunks]
+        missing = {}
+        for hash_, chunk in zip(hashes, chunks):
+            if hash_ not in existing and hash_ not in missing:
+                missing[hash_] = chunk['content']
+        
+        vectors = dict(existing)
+        if missing:
+            vectors.update(zip(missing, self.generate_embeddings(list(missing.values()))))
+        
+        chunks_with_embeddings = []
+        for hash_, chunk in zip(hashes, chunks):
+            chunk_copy = chunk.copy()
+            chunk_copy['embedding'] = vectors[hash_]
+            chunks_with_embeddings.append(chunk_copy)
+        
+        removed = len(set(existing) - set(hashes))
+        logger.info(
+            f"Embedding store update: {len(chunks) - len(missing)} chunks reused, "
+            f"{len(missing)} embedded, {removed} removed"
+        )
+        return self.save_embedding_store(chunks_with_embeddings, directory=directory, dtype=dtype)
+    
+    def _load_existing_embeddings(self, directory: Path = None) -> Dict[str, Any]:
+        """Map content hashes to the vectors already computed with this model."""
+        if EmbeddingStore.exists(directory):
+            store = EmbeddingStore(directory)
+            if store.header.get('model') != self.model_name:
+                logger.info(f"Embedding model changed from {store.header.get('model')}, re-embedding all chunks")
+                return {}
+            # Copy the rows: the store files are replaced while they are still mapped
+            return {
+                chunk_hash(chunk): np.array(chunk['embedding'], dtype=np.float32)
+                for chunk in store.iter_chunks_with_embeddings()
+            }
+        
+        if directory is None and Config.CHUNKS_WITH_EMBEDDINGS_FILE.exists():
+            with open(Config.CHUNKS_WITH_EMBEDDINGS_FILE, 'r', encoding='utf-8') as f:
+                chunks = json.load(f)
+            return {
+                chunk_hash(chunk): chunk['embedding']
+                for chunk in chunks
+                if chunk.get('embedding') is not None
+            }
+        return {}
+    
     def get_embedding_dimension(self) -> int:
         """Get the dimension of the embedding vectors.
         
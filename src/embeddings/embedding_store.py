@@ -0,0 +1,409 @@
+"""Compact binary on-disk format for chunk embeddings.
+
+A store is a directory holding three files:
+
+- ``embeddings-<version>.npy``: the embedding matrix as raw float32 or
+  float16 rows in NumPy ``.npy`` layout (a small self-describing header
+  followed by the data), so it can be memory-mapped without parsing or copying.
+- ``chunks-<version>.jsonl``: the content and metadata of each chunk, one
+  JSON line per matrix row, read by byte offset only when a chunk is needed.
+- ``index.json``: a small header (dtype, shape, model, normalization, the
+  names of the two data files) and the id/offset table mapping each chunk
+  id to its matrix row and to the offset and length of its line in the
+  chunks file.
+
+Every write puts the data in new versioned files and then atomically
+replaces ``index.json``, which points at them, so the files always belong
+to the same write. Version 1 stores, which keep the chunks in the index
+itself, can still be read.
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator
+
+import numpy as np
+
+from src.data_preparation.manifest import content_hash
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+SUPPORTED_DTYPES = ("float32", "float16")
+
+
+def make_chunk_id(metadata: Dict[str, Any], content: str = None) -> str:
+    """Build the stable id of a chunk, used in the id/offset table and the vector store.
+
+    The id is 'source::chunk_id::content_hash', so it is the same on every
+    build for the same text and changes whenever the text does. Without a
+    content hash in the metadata or the content, the id is 'source::chunk_id'.
+
+    Args:
+        metadata: Chunk metadata with 'source', 'chunk_id' and, for chunks
+                  from the chunker, 'content_hash' keys
+        content: Chunk text, hashed if the metadata has no 'content_hash'
+
+    Returns:
+        Chunk id string
+    """
+    chunk_id = f"{metadata.get('source', '')}::{metadata.get('chunk_id', '')}"
+    hash_ = metadata.get('content_hash') or (content_hash(content) if content is not None else None)
+    return f"{chunk_id}::{hash_}" if hash_ else chunk_id
+
+
+class EmbeddingStore:
+    """Memory-mapped embedding matrix with its id/offset table."""
+
+    MATRIX_FILE = "embeddings.npy"
+    MATRIX_PATTERN = "embeddings*.npy"
+    CHUNKS_PATTERN = "chunks-*.jsonl"
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory: Path = None, mmap: bool = True):
+        """Open an existing embedding store.
+
+        Args:
+            directory: Store directory (default Config.EMBEDDING_STORE_DIR)
+            mmap: Memory-map the matrix instead of reading it into memory
+        """
+        self.directory = Path(directory or Config.EMBEDDING_STORE_DIR)
+        index_file = self.directory / self.INDEX_FILE
+
+        # A concurrent write may remove the files named by the index just read;
+        # the index it swapped in names the new ones
+        for attempt in range(2):
+            if not index_file.exists():
+                raise FileNotFoundError(f"Embedding store not found: {self.directory}")
+
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+
+            if index.get('format_version') not in READABLE_VERSIONS:
+                raise ValueError(
+                    f"Unsupported embedding store version {index.get('format_version')} "
+                    f"in {self.directory}"
+                )
+
+            self.matrix_file = self.directory / index.get('matrix_file', self.MATRIX_FILE)
+            self.chunks_file = self.directory / index['chunks_file'] if 'chunks_file' in index else None
+            try:
+                self.matrix = np.load(self.matrix_file, mmap_mode='r' if mmap else None)
+                self._chunk_data = self._map_chunks(self.chunks_file)
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise FileNotFoundError(f"Embedding store not found: {self.directory}")
+
+        self.header = {key: value for key, value in index.items() if key != 'records'}
+        self.records = index['records']
+
+        expected_shape = (self.header['rows'], self.header['dim'])
+        if self.matrix.shape != expected_shape:
+            raise ValueError(
+                f"Embedding matrix shape {self.matrix.shape} does not match "
+                f"header {expected_shape} in {self.directory}"
+            )
+
+        logger.info(
+            f"Opened embedding store {self.directory} "
+            f"({self.count()} x {self.dimension}, {self.header['dtype']})"
+        )
+
+    @staticmethod
+    def _map_chunks(chunks_file: Path):
+        """Memory-map the chunks file; it stays readable if a later write removes it."""
+        if chunks_file is None:
+            return None
+        with open(chunks_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def exists(cls, directory: Path = None) -> bool:
+        """Check whether a complete store exists in a directory.
+
+        Args:
+            directory: Store directory (default Config.EMBEDDING_STORE_DIR)
+
+        Returns:
+            True if the index and a matrix file are present
+        """
+        directory = Path(directory or Config.EMBEDDING_STORE_DIR)
+        return (directory / cls.INDEX_FILE).exists() and any(directory.glob(cls.MATRIX_PATTERN))
+
+    @classmethod
+    def write(
+        cls,
+        chunks: List[Dict[str, Any]],
+        directory: Path = None,
+        dtype: str = None,
+        normalize: bool = True,
+        model: str = None
+    ) -> "EmbeddingStore":
+        """Write chunks with embeddings to a new store.
+
+        The matrix and chunks go to new versioned files and index.json,
+        which names them, is then replaced atomically, so readers see either
+        the old store or the new one, never a mix. Data files of earlier
+        writes are removed afterwards.
+
+        Args:
+            chunks: List of chunk dictionaries with 'content', 'metadata'
+                   and 'embedding' keys
+            directory: Store directory (default Config.EMBEDDING_STORE_DIR)
+            dtype: 'float32' or 'float16' (default Config.EMBEDDING_STORE_DTYPE)
+            normalize: Store L2-normalized rows
+            model: Embedding model name recorded in the header
+
+        Returns:
+            The newly written store, opened with mmap
+        """
+        directory = Path(directory or Config.EMBEDDING_STORE_DIR)
+        dtype = dtype or Config.EMBEDDING_STORE_DTYPE
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}.")
+
+        directory.mkdir(parents=True, exist_ok=True)
+
+        matrix = np.asarray([chunk['embedding'] for chunk in chunks], dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(chunks), -1)
+        if normalize:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+
+        version = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        matrix_name = f"embeddings-{version}.npy"
+        chunks_name = f"chunks-{version}.jsonl"
+
+        records = []
+        offset = 0
+        chunks_tmp = directory / (chunks_name + ".tmp")
+        with open(chunks_tmp, 'wb') as f:
+            for row, chunk in enumerate(chunks):
+                line = json.dumps(
+                    {'content': chunk['content'], 'metadata': chunk['metadata']},
+                    ensure_ascii=False
+                ).encode('utf-8') + b"\n"
+                f.write(line)
+                records.append({
+                    'id': make_chunk_id(chunk['metadata'], chunk['content']),
+                    'row': row,
+                    'offset': offset,
+                    'length': len(line)
+                })
+                offset += len(line)
+        os.replace(chunks_tmp, directory / chunks_name)
+
+        index = {
+            'format_version': FORMAT_VERSION,
+            'matrix_file': matrix_name,
+            'chunks_file': chunks_name,
+            'dtype': dtype,
+            'rows': matrix.shape[0],
+            'dim': matrix.shape[1],
+            'normalized': normalize,
+            'model': model or Config.EMBEDDING_MODEL,
+            'created_at': datetime.now().isoformat(),
+            'records': records
+        }
+
+        matrix_tmp = directory / (matrix_name + ".tmp")
+        index_tmp = directory / (cls.INDEX_FILE + ".tmp")
+        with open(matrix_tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=dtype))
+        os.replace(matrix_tmp, directory / matrix_name)
+        with open(index_tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        # Switching the index is the single step that publishes the new store
+        os.replace(index_tmp, directory / cls.INDEX_FILE)
+
+        for pattern, current in ((cls.MATRIX_PATTERN, matrix_name), (cls.CHUNKS_PATTERN, chunks_name)):
+            for old_file in directory.glob(pattern):
+                if old_file.name != current:
+                    try:
+                        old_file.unlink(missing_ok=True)
+                    except OSError as e:
+                        # Still open in a reader on platforms that lock open files
+                        logger.warning(f"Could not remove old store file {old_file}: {e}")
+
+        logger.info(
+            f"Wrote {len(records)} embeddings ({matrix.shape[1]}-dim, {dtype}) "
+            f"to {directory}"
+        )
+        return cls(directory)
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the stored embedding vectors."""
+        return self.header['dim']
+
+    @property
+    def normalized(self) -> bool:
+        """Whether rows were L2-normalized when written."""
+        return bool(self.header.get('normalized', False))
+
+    @property
+    def ids(self) -> List[str]:
+        """Chunk ids in row order."""
+        return [record['id'] for record in self.records]
+
+    def count(self) -> int:
+        """Return the number of stored embeddings."""
+        return self.header['rows']
+
+    def get_chunk(self, row: int) -> Dict[str, Any]:
+        """Read one stored chunk by its matrix row.
+
+        Args:
+            row: Matrix row of the chunk
+
+        Returns:
+            Chunk dictionary with 'content' and 'metadata' keys
+        """
+        record = self.records[row]
+        if self._chunk_data is None:
+            return {'content': record['content'], 'metadata': record['metadata']}
+        line = self._chunk_data[record['offset']:record['offset'] + record['length']]
+        return json.loads(line)
+
+    def get_chunks(self) -> List[Dict[str, Any]]:
+        """Return the stored chunks without their embeddings.
+
+        Returns:
+            List of chunk dictionaries with 'content' and 'metadata' keys
+        """
+        return [self.get_chunk(row) for row in range(len(self.records))]
+
+    def iter_chunks_with_embeddings(self) -> Iterator[Dict[str, Any]]:
+        """Yield stored chunks with their embedding rows.
+
+        Yields:
+            Chunk dictionaries whose 'embedding' is a float32 NumPy array
+        """
+        for record in self.records:
+            chunk = self.get_chunk(record['row'])
+            chunk['embedding'] = np.asarray(self.matrix[record['row']], dtype=np.float32)
+            yield chunk
+
+
+def convert_json_to_store(
+    json_file: Path = None,
+    directory: Path = None,
+    dtype: str = None
+) -> EmbeddingStore:
+    """Convert a chunks_with_embeddings.json file into a binary store.
+
+    Args:
+        json_file: Source JSON file (default Config.CHUNKS_WITH_EMBEDDINGS_FILE)
+        directory: Target store directory (default Config.EMBEDDING_STORE_DIR)
+        dtype: 'float32' or 'float16' (default Config.EMBEDDING_STORE_DTYPE)
+
+    Returns:
+        The written store
+    """
+    json_file = Path(json_file or Config.CHUNKS_WITH_EMBEDDINGS_FILE)
+    logger.info(f"Converting {json_file} to binary embedding store...")
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        chunks = json.load(f)
+
+    return EmbeddingStore.write(chunks, directory=directory, dtype=dtype)
+
+
+def benchmark_load(
+    json_file: Path = None,
+    directory: Path = None,
+    repeats: int = 5
+) -> Dict[str, Any]:
+    """Compare load time of the JSON file against the memory-mapped store.
+
+    Each measurement loads the data and materializes a float32 matrix, which
+    is what the retriever needs before it can answer a query.
+
+    Args:
+        json_file: JSON file (default Config.CHUNKS_WITH_EMBEDDINGS_FILE)
+        directory: Store directory (default Config.EMBEDDING_STORE_DIR)
+        repeats: Number of timed loads for each format
+
+    Returns:
+        Dictionary with file sizes and best load times in milliseconds
+    """
+    json_file = Path(json_file or Config.CHUNKS_WITH_EMBEDDINGS_FILE)
+    directory = Path(directory or Config.EMBEDDING_STORE_DIR)
+
+    def load_json():
+        with open(json_file, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        return np.asarray([chunk['embedding'] for chunk in chunks], dtype=np.float32)
+
+    def load_store():
+        store = EmbeddingStore(directory)
+        return np.asarray(store.matrix, dtype=np.float32)
+
+    def best_of(load):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            load()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    store = EmbeddingStore(directory)
+    store_bytes = sum(
+        path.stat().st_size
+        for path in (store.matrix_file, store.chunks_file, directory / EmbeddingStore.INDEX_FILE)
+        if path is not None
+    )
+    results = {
+        'json_bytes': json_file.stat().st_size,
+        'store_bytes': store_bytes,
+        'json_load_ms': best_of(load_json),
+        'store_load_ms': best_of(load_store),
+    }
+    results['speedup'] = results['json_load_ms'] / max(results['store_load_ms'], 1e-9)
+    return results
+
+
+def main():
+    """Command-line entry point for converting and benchmarking stores."""
+    parser = argparse.ArgumentParser(description="Binary embedding store tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert JSON embeddings to a binary store")
+    convert_parser.add_argument("--json", type=Path, default=None, help="Source JSON file")
+    convert_parser.add_argument("--out", type=Path, default=None, help="Target store directory")
+    convert_parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, default=None)
+
+    bench_parser = subparsers.add_parser("bench", help="Benchmark JSON vs binary load time")
+    bench_parser.add_argument("--json", type=Path, default=None, help="JSON file")
+    bench_parser.add_argument("--store", type=Path, default=None, help="Store directory")
+    bench_parser.add_argument("--repeats", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        store = convert_json_to_store(args.json, args.out, args.dtype)
+        print(f"✓ Wrote {store.count()} embeddings to {store.directory}")
+    else:
+        results = benchmark_load(args.json, args.store, args.repeats)
+        print(f"JSON:   {results['json_bytes']:>12,} bytes  {results['json_load_ms']:8.2f} ms")
+        print(f"Binary: {results['store_bytes']:>12,} bytes  {results['store_load_ms']:8.2f} ms")
+        print(f"Speedup: {results['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
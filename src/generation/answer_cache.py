@@ -0,0 +1,192 @@
+"""Semantic answer cache that reuses answers for near-duplicate questions."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """In-memory cache of answers keyed by query embedding similarity.
+
+    Each entry stores the query embedding, the raw LLM answer, the retrieved
+    chunks and sources it was grounded on, and the index version of the
+    vector store at the time. A lookup returns the most similar live entry
+    whose cosine similarity reaches the configured threshold. Entries expire
+    after a TTL and the least recently used entry is evicted when full.
+    """
+
+    def __init__(
+        self,
+        threshold: float = None,
+        max_entries: int = None,
+        ttl_seconds: float = None
+    ):
+        """Initialize the semantic answer cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+                      (default Config.SEMANTIC_CACHE_THRESHOLD)
+            max_entries: Maximum number of cached answers
+                        (default Config.SEMANTIC_CACHE_MAX_ENTRIES)
+            ttl_seconds: Entry lifetime in seconds (default Config.SEMANTIC_CACHE_TTL)
+        """
+        self.threshold = threshold if threshold is not None else Config.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries or Config.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.SEMANTIC_CACHE_TTL
+
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._ids = count()
+        self._lock = threading.Lock()
+
+        # Stacked embeddings of live entries, rebuilt lazily after changes
+        self._matrix = None
+        self._matrix_ids: List[int] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Return a unit-length float32 copy of an embedding."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now: float):
+        """Drop entries older than the TTL."""
+        if self.ttl_seconds <= 0:
+            return
+        expired = [
+            entry_id for entry_id, entry in self._entries.items()
+            if now - entry['created_at'] > self.ttl_seconds
+        ]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        if expired:
+            self.expirations += len(expired)
+            self._matrix = None
+
+    def _stacked(self) -> Optional[np.ndarray]:
+        """Return the matrix of cached embeddings, rebuilding it if stale."""
+        if self._matrix is None and self._entries:
+            self._matrix_ids = list(self._entries.keys())
+            self._matrix = np.stack([
+                self._entries[entry_id]['embedding'] for entry_id in self._matrix_ids
+            ])
+        return self._matrix
+
+    def lookup(
+        self,
+        query_embedding: List[float],
+        index_version: str,
+        top_k: int
+    ) -> Optional[Dict[str, Any]]:
+        """Find a cached answer for a semantically equivalent query.
+
+        Args:
+            query_embedding: Embedding of the new query
+            index_version: Current vector store index version
+            top_k: Number of chunks the answer must have been generated with
+
+        Returns:
+            Cached entry with 'answer', 'retrieved_chunks', 'sources', 'query'
+            and 'similarity' keys, or None on a miss
+        """
+        query = self._normalize(query_embedding)
+
+        with self._lock:
+            self._expire(time.time())
+            matrix = self._stacked()
+
+            if matrix is not None:
+                similarities = matrix @ query
+                for position in np.argsort(-similarities):
+                    similarity = float(similarities[position])
+                    if similarity < self.threshold:
+                        break
+                    entry_id = self._matrix_ids[position]
+                    entry = self._entries[entry_id]
+                    if entry['index_version'] == index_version and entry['top_k'] == top_k:
+                        self._entries.move_to_end(entry_id)
+                        self.hits += 1
+                        return {
+                            'answer': entry['answer'],
+                            'retrieved_chunks': entry['retrieved_chunks'],
+                            'sources': entry['sources'],
+                            'query': entry['query'],
+                            'similarity': similarity
+                        }
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        query: str,
+        query_embedding: List[float],
+        answer: str,
+        retrieved_chunks: List[Dict[str, Any]],
+        sources: List[str],
+        index_version: str,
+        top_k: int
+    ):
+        """Cache a freshly generated answer.
+
+        Args:
+            query: Query the answer was generated for
+            query_embedding: Embedding of the query
+            answer: Raw LLM answer, without source references
+            retrieved_chunks: Chunks used as context
+            sources: Unique source documents
+            index_version: Vector store index version used for retrieval
+            top_k: Number of chunks retrieved
+        """
+        with self._lock:
+            self._entries[next(self._ids)] = {
+                'query': query,
+                'embedding': self._normalize(query_embedding),
+                'answer': answer,
+                'retrieved_chunks': retrieved_chunks,
+                'sources': sources,
+                'index_version': index_version,
+                'top_k': top_k,
+                'created_at': time.time()
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit-rate metrics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, expirations, size and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Remove all cached answers."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
@@ -1,18 +1,125 @@
 """RAG answer generation module using OpenAI LLM."""
 
+import asyncio
 import logging
-import httpx
-from typing import List, Dict, Any, Optional
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, Iterable, Iterator, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages.ai import add_usage
 
 from src.retrieval.retriever import DocumentRetriever
+from src.generation.answer_cache import SemanticAnswerCache
+from src.generation.completion_cache import CompletionCache
+from src.generation.context_builder import ContextBuilder
 from src.generation.prompt_templates import PromptTemplates
 from src.utils.config import Config
-from src.utils.logger import interaction_logger
+from src.utils.http_client import get_http_clients, get_timeout
+from src.utils.resilience import ResilientCaller, collect_call_stats, current_call_stats
+from src.utils.timing import Timings, collect_timings, current_timings, span
+from src.utils.usage import (
+    collect_usage,
+    count_message_tokens,
+    count_tokens,
+    current_usage,
+    record_usage
+)
+from src.utils.logger import get_interaction_logger
+from src.utils.metrics import (
+    CACHE_LOOKUPS,
+    REQUEST_ERRORS,
+    REQUESTS,
+    REQUESTS_IN_FLIGHT,
+    STAGE_LATENCY,
+    start_configured_exporters
+)
+from src.utils.profiling import profiled
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a query iterable (None could be a query)
+_END_OF_QUERIES = object()
+
+
+def _call_stats() -> Dict[str, int]:
+    """Retry/hedge counts for the upstream calls made for the current request."""
+    stats = current_call_stats()
+    return stats.as_dict() if stats is not None else {
+        'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0
+    }
+
+
+def _timings() -> Dict[str, float]:
+    """Per-stage milliseconds recorded so far for the current request."""
+    timings = current_timings()
+    return timings.as_dict() if timings is not None else {}
+
+
+def _usage() -> Dict[str, Any]:
+    """Tokens and estimated cost of the upstream calls made for the current request."""
+    usage = current_usage()
+    return usage.as_dict() if usage is not None else {}
+
+
+@contextmanager
+def _track_request(mode: str) -> Iterator[Timings]:
+    """Collect the call stats, token usage and timings of one question.
+    
+    The question is counted as in flight while it is being answered, and
+    failures are counted by exception type.
+    """
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        with collect_call_stats(), collect_usage(), collect_timings() as timings:
+            yield timings
+    except Exception as e:
+        REQUEST_ERRORS.inc(mode=mode, error=type(e).__name__)
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+
+
+def _record_result(result: Dict[str, Any], mode: str):
+    """Update the request and stage latency metrics for a finished answer."""
+    REQUESTS.inc(mode=mode, cache=result['cache'] or 'none')
+    for stage, ms in result['timings'].items():
+        STAGE_LATENCY.observe(ms / 1000, stage=stage)
+
+
+class AnswerStream:
+    """Iterable of answer text fragments produced by AnswerGenerator.stream_answer.
+    
+    Supports ``for`` iteration for stream_answer and ``async for`` iteration
+    for astream_answer.
+    
+    Attributes:
+        result: Full result dictionary (same shape as generate_answer),
+               available once the stream has been consumed
+        time_to_first_token: Seconds from the request until the first fragment
+        total_time: Seconds from the request until the stream ended
+    """
+    
+    def __init__(self):
+        """Initialize an empty stream; AnswerGenerator attaches the tokens."""
+        self._tokens: Optional[Iterator[str]] = None
+        self._atokens: Optional[AsyncIterator[str]] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+    
+    def __iter__(self) -> Iterator[str]:
+        if self._tokens is None:
+            raise TypeError("Use 'async for' to iterate a stream created by astream_answer")
+        return self._tokens
+    
+    def __aiter__(self) -> AsyncIterator[str]:
+        if self._atokens is None:
+            raise TypeError("Use 'for' to iterate a stream created by stream_answer")
+        return self._atokens
+
 
 class AnswerGenerator:
     """Generates answers using RAG (Retrieval-Augmented Generation)."""
@@ -22,7 +129,12 @@ class AnswerGenerator:
         retriever: DocumentRetriever = None,
         llm_model: str = None,
         api_key: str = None,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        answer_cache: SemanticAnswerCache = None,
+        completion_cache: CompletionCache = None,
+        context_builder: ContextBuilder = None,
+        http_client=None,
+        http_async_client=None
     ):
         """Initialize the answer generator.
         
@@ -31,33 +143,72 @@ class AnswerGenerator:
             llm_model: Name of the OpenAI model (default from Config)
             api_key: OpenAI API key (default from Config)
             temperature: LLM temperature for response generation
+            answer_cache: Semantic answer cache (created from Config if None
+                         and SEMANTIC_CACHE_ENABLED is set)
+            completion_cache: On-disk prompt-to-completion cache (created from
+                             Config if None and COMPLETION_CACHE_ENABLED is set)
+            context_builder: Packs retrieved chunks into the prompt within
+                            the token budget (created from Config if None)
+            http_client: httpx.Client for chat requests
+                        (default: the shared pooled client)
+            http_async_client: httpx.AsyncClient for async chat requests
+                              (default: the shared pooled client)
         """
         self.retriever = retriever or DocumentRetriever()
         self.llm_model = llm_model or Config.LLM_MODEL
         self.api_key = api_key or Config.OPENAI_API_KEY
+        self.temperature = temperature
         
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY in .env file.")
         
-        # Create custom HTTP client with SSL verification disabled (for development)
-        http_client = httpx.Client(verify=False)
+        # Reuse the process-wide pooled transport (see src/utils/http_client.py)
+        shared_client, shared_async_client = get_http_clients("chat")
+        self.http_client = http_client or shared_client
+        self.http_async_client = http_async_client or shared_async_client
         
         # Initialize LLM
         self.llm = ChatOpenAI(
             model=self.llm_model,
             temperature=temperature,
             openai_api_key=self.api_key,
-            http_client=http_client
+            base_url=Config.OPENAI_BASE_URL,
+            timeout=get_timeout("chat"),
+            max_retries=0,  # Retries are handled by llm_caller
+            http_client=self.http_client,
+            http_async_client=self.http_async_client
         )
         
+        # Retries, per-attempt deadlines, hedging and circuit breaking
+        self.llm_caller = ResilientCaller("chat", attempt_timeout=Config.LLM_ATTEMPT_TIMEOUT)
+        
+        # Semantic cache for near-duplicate questions
+        if answer_cache is None and Config.SEMANTIC_CACHE_ENABLED:
+            answer_cache = SemanticAnswerCache()
+        self.answer_cache = answer_cache
+        
+        # Exact cache of completions for identical rendered prompts
+        if completion_cache is None and Config.COMPLETION_CACHE_ENABLED:
+            completion_cache = CompletionCache()
+        if completion_cache is not None:
+            completion_cache.invalidate_other_versions(self.retriever.index_version)
+        self.completion_cache = completion_cache
+        
+        self.context_builder = context_builder or ContextBuilder()
+        
+        # Expose metrics if METRICS_PORT or METRICS_TEXTFILE is configured
+        start_configured_exporters()
+        
         logger.info(f"Initialized answer generator with model: {self.llm_model}")
     
+    @profiled("generate_answer", label_arg="query")
     def generate_answer(
         self,
         query: str,
         top_k: int = None,
         include_sources: bool = True,
-        log_interaction: bool = True
+        log_interaction: bool = True,
+        retrieved_chunks: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """Generate an answer for a user query using RAG.
         
@@ -66,85 +217,701 @@ class AnswerGenerator:
             top_k: Number of documents to retrieve (default from Config)
             include_sources: Whether to include source references in response
             log_interaction: Whether to log this interaction
+            retrieved_chunks: Chunks already retrieved for this query, e.g. by
+                             DocumentRetriever.retrieve_many (skips retrieval)
             
         Returns:
-            Dictionary with 'answer', 'retrieved_chunks', and 'sources' keys
+            Dictionary with 'answer', 'retrieved_chunks', 'sources', 'query',
+            'cache' ('semantic' or 'completion' when the answer was reused,
+            otherwise None), 'resilience' (attempt, retry and hedge counts
+            for the upstream calls made), 'usage' (prompt, completion and
+            embedding tokens with the estimated cost) and 'timings'
+            (milliseconds spent in each stage, plus 'total') keys
         """
         logger.info(f"Generating answer for query: '{query[:50]}...'")
         
-        try:
-            # Step 1: Retrieve relevant documents
-            retrieved_chunks = self.retriever.retrieve(query, top_k)
+        k = top_k or self.retriever.top_k
+        
+        with _track_request("generate"):
+            try:
+                # Steps 0-3: cache lookup, retrieval and prompt construction
+                prepared = self._prepare(query, k, retrieved_chunks)
+
+                if prepared['cached'] is not None:
+                    result = self._cached_result(
+                        query, prepared['cached'], include_sources, log_interaction, k
+                    )
+                    result['timings'] = _timings()
+                    _record_result(result, "generate")
+                    return result
+
+                if not prepared['retrieved_chunks']:
+                    logger.warning("No relevant documents found for query")
+                    result = self._no_results_result(query)
+                    _record_result(result, "generate")
+                    return result
+
+                # Step 4: Generate answer using LLM (unless the prompt is cached)
+                answer = self._lookup_completion(prepared)
+                cache_hit = 'completion' if answer is not None else None
+
+                if answer is None:
+                    with span("llm"):
+                        response = self.llm_caller.call(self.llm.invoke, prepared['messages'])
+                    answer = response.content
+                    self._record_llm_usage(prepared['messages'], answer, response.usage_metadata)
+                    self._store_completion(prepared, answer)
+
+                # Step 5: Format complete response with sources and log it
+                result = self._finalize(
+                    query, answer, prepared, include_sources, log_interaction, k, cache_hit
+                )
+                result['timings'] = _timings()
+                _record_result(result, "generate")
+
+                logger.info(f"Successfully generated answer ({len(answer)} characters)")
+                return result
+
+            except Exception as e:
+                logger.error(f"Error generating answer: {e}")
+                get_interaction_logger().log_error(str(e), query)
+                raise
+    
+    def stream_answer(
+        self,
+        query: str,
+        top_k: int = None,
+        include_sources: bool = True,
+        log_interaction: bool = True
+    ) -> "AnswerStream":
+        """Generate an answer for a user query, yielding tokens as they arrive.
+        
+        The returned stream can be iterated directly (or passed to
+        ``st.write_stream``). Sources, the interaction log entry and the
+        timing measurements are finalized when the stream is exhausted and
+        are then available as ``stream.result``.
+        
+        Args:
+            query: User's question
+            top_k: Number of documents to retrieve (default from Config)
+            include_sources: Whether to append source references to the stream
+            log_interaction: Whether to log this interaction
             
-            if not retrieved_chunks:
-                logger.warning("No relevant documents found for query")
-                return {
-                    'answer': "I apologize, but I couldn't find relevant information in our policy documents to answer your question. Please contact our customer care at 1800-XXX-XXXX for assistance.",
-                    'retrieved_chunks': [],
-                    'sources': []
-                }
+        Returns:
+            AnswerStream yielding answer text fragments
+        """
+        stream = AnswerStream()
+        stream._tokens = self._stream_tokens(
+            stream, query, top_k, include_sources, log_interaction
+        )
+        return stream
+    
+    def _stream_tokens(
+        self,
+        stream: "AnswerStream",
+        query: str,
+        top_k: int,
+        include_sources: bool,
+        log_interaction: bool
+    ) -> Iterator[str]:
+        """Produce the token stream behind stream_answer."""
+        logger.info(f"Streaming answer for query: '{query[:50]}...'")
+        
+        k = top_k or self.retriever.top_k
+        start_time = time.perf_counter()
+        
+        with _track_request("stream") as timings:
+            try:
+                prepared = self._prepare(query, k, None)
+
+                if prepared['cached'] is not None or not prepared['retrieved_chunks']:
+                    if prepared['cached'] is not None:
+                        result = self._cached_result(
+                            query, prepared['cached'], include_sources, log_interaction, k
+                        )
+                    else:
+                        logger.warning("No relevant documents found for query")
+                        result = self._no_results_result(query)
+                    stream.time_to_first_token = time.perf_counter() - start_time
+                    yield result['answer']
+                    stream.total_time = time.perf_counter() - start_time
+                    result['timings'] = _timings()
+                    _record_result(result, "stream")
+                    stream.result = result
+                    return
+
+                answer = self._lookup_completion(prepared)
+                cache_hit = 'completion' if answer is not None else None
+
+                if answer is not None:
+                    stream.time_to_first_token = time.perf_counter() - start_time
+                    yield answer
+                else:
+                    parts = []
+                    usage = None
+                    llm_start = time.perf_counter()
+                    for message_chunk in self.llm_caller.stream(self.llm.stream, prepared['messages']):
+                        if message_chunk.usage_metadata:
+                            usage = add_usage(usage, message_chunk.usage_metadata)
+                        token = message_chunk.content
+                        if not token:
+                            continue
+                        if stream.time_to_first_token is None:
+                            stream.time_to_first_token = time.perf_counter() - start_time
+                        parts.append(token)
+                        yield token
+                    # Includes the time the consumer spent between tokens
+                    timings.add("llm", time.perf_counter() - llm_start)
+                    answer = "".join(parts)
+                    self._record_llm_usage(prepared['messages'], answer, usage)
+                    self._store_completion(prepared, answer)
+
+                if include_sources:
+                    yield PromptTemplates.format_source_references(prepared['retrieved_chunks'])
+
+                stream.total_time = time.perf_counter() - start_time
+                logger.info(
+                    f"Streamed answer ({len(answer)} characters): "
+                    f"time to first token {stream.time_to_first_token or 0:.3f}s, "
+                    f"total {stream.total_time:.3f}s"
+                )
+
+                stream.result = self._finalize(
+                    query, answer, prepared, include_sources, log_interaction, k, cache_hit,
+                    metadata={
+                        'streamed': True,
+                        'time_to_first_token': stream.time_to_first_token,
+                        'total_time': stream.total_time
+                    }
+                )
+                stream.result['timings'] = _timings()
+                _record_result(stream.result, "stream")
+
+            except Exception as e:
+                logger.error(f"Error streaming answer: {e}")
+                get_interaction_logger().log_error(str(e), query)
+                raise
+    
+    async def agenerate_answer(
+        self,
+        query: str,
+        top_k: int = None,
+        include_sources: bool = True,
+        log_interaction: bool = True,
+        retrieved_chunks: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Asynchronously generate an answer for a user query using RAG.
+        
+        Uses async embeddings and ``ChatOpenAI.ainvoke`` on shared
+        ``httpx.AsyncClient`` instances. Cache and interaction log writes run
+        in worker threads so the event loop is never blocked on disk I/O.
+        
+        Args:
+            query: User's question
+            top_k: Number of documents to retrieve (default from Config)
+            include_sources: Whether to include source references in response
+            log_interaction: Whether to log this interaction
+            retrieved_chunks: Chunks already retrieved for this query
             
-            # Step 2: Format context from retrieved chunks
-            context = self.retriever.format_retrieved_chunks(
-                retrieved_chunks,
-                include_scores=False
-            )
+        Returns:
+            Result dictionary in the same shape as generate_answer
+        """
+        logger.info(f"Generating answer for query: '{query[:50]}...'")
+        
+        k = top_k or self.retriever.top_k
+        
+        with _track_request("agenerate"):
+            try:
+                prepared = await self._aprepare(query, k, retrieved_chunks)
+
+                if prepared['cached'] is not None:
+                    result = await asyncio.to_thread(
+                        self._cached_result,
+                        query, prepared['cached'], include_sources, log_interaction, k
+                    )
+                    result['timings'] = _timings()
+                    _record_result(result, "agenerate")
+                    return result
+
+                if not prepared['retrieved_chunks']:
+                    logger.warning("No relevant documents found for query")
+                    result = self._no_results_result(query)
+                    _record_result(result, "agenerate")
+                    return result
+
+                answer = await asyncio.to_thread(self._lookup_completion, prepared)
+                cache_hit = 'completion' if answer is not None else None
+
+                if answer is None:
+                    with span("llm"):
+                        response = await self.llm_caller.acall(self.llm.ainvoke, prepared['messages'])
+                    answer = response.content
+                    self._record_llm_usage(prepared['messages'], answer, response.usage_metadata)
+                    await asyncio.to_thread(self._store_completion, prepared, answer)
+
+                result = await asyncio.to_thread(
+                    self._finalize,
+                    query, answer, prepared, include_sources, log_interaction, k, cache_hit
+                )
+                result['timings'] = _timings()
+                _record_result(result, "agenerate")
+
+                logger.info(f"Successfully generated answer ({len(answer)} characters)")
+                return result
+
+            except Exception as e:
+                logger.error(f"Error generating answer: {e}")
+                await asyncio.to_thread(get_interaction_logger().log_error, str(e), query)
+                raise
+    
+    def astream_answer(
+        self,
+        query: str,
+        top_k: int = None,
+        include_sources: bool = True,
+        log_interaction: bool = True
+    ) -> "AnswerStream":
+        """Asynchronously generate an answer, yielding tokens as they arrive.
+        
+        Iterate the returned stream with ``async for``; ``stream.result`` and
+        the timings are available once it is exhausted.
+        
+        Args:
+            query: User's question
+            top_k: Number of documents to retrieve (default from Config)
+            include_sources: Whether to append source references to the stream
+            log_interaction: Whether to log this interaction
             
-            # Step 3: Create prompt
-            prompt = PromptTemplates.format_rag_prompt(
+        Returns:
+            AnswerStream supporting async iteration
+        """
+        stream = AnswerStream()
+        stream._atokens = self._astream_tokens(
+            stream, query, top_k, include_sources, log_interaction
+        )
+        return stream
+    
+    async def _astream_tokens(
+        self,
+        stream: "AnswerStream",
+        query: str,
+        top_k: int,
+        include_sources: bool,
+        log_interaction: bool
+    ) -> AsyncIterator[str]:
+        """Produce the async token stream behind astream_answer."""
+        logger.info(f"Streaming answer for query: '{query[:50]}...'")
+        
+        k = top_k or self.retriever.top_k
+        start_time = time.perf_counter()
+        
+        with _track_request("astream") as timings:
+            try:
+                prepared = await self._aprepare(query, k, None)
+
+                if prepared['cached'] is not None or not prepared['retrieved_chunks']:
+                    if prepared['cached'] is not None:
+                        result = await asyncio.to_thread(
+                            self._cached_result,
+                            query, prepared['cached'], include_sources, log_interaction, k
+                        )
+                    else:
+                        logger.warning("No relevant documents found for query")
+                        result = self._no_results_result(query)
+                    stream.time_to_first_token = time.perf_counter() - start_time
+                    yield result['answer']
+                    stream.total_time = time.perf_counter() - start_time
+                    result['timings'] = _timings()
+                    _record_result(result, "astream")
+                    stream.result = result
+                    return
+
+                answer = await asyncio.to_thread(self._lookup_completion, prepared)
+                cache_hit = 'completion' if answer is not None else None
+
+                if answer is not None:
+                    stream.time_to_first_token = time.perf_counter() - start_time
+                    yield answer
+                else:
+                    parts = []
+                    usage = None
+                    llm_start = time.perf_counter()
+                    async for message_chunk in self.llm_caller.astream(self.llm.astream, prepared['messages']):
+                        if message_chunk.usage_metadata:
+                            usage = add_usage(usage, message_chunk.usage_metadata)
+                        token = message_chunk.content
+                        if not token:
+                            continue
+                        if stream.time_to_first_token is None:
+                            stream.time_to_first_token = time.perf_counter() - start_time
+                        parts.append(token)
+                        yield token
+                    timings.add("llm", time.perf_counter() - llm_start)
+                    answer = "".join(parts)
+                    self._record_llm_usage(prepared['messages'], answer, usage)
+                    await asyncio.to_thread(self._store_completion, prepared, answer)
+
+                if include_sources:
+                    yield PromptTemplates.format_source_references(prepared['retrieved_chunks'])
+
+                stream.total_time = time.perf_counter() - start_time
+                logger.info(
+                    f"Streamed answer ({len(answer)} characters): "
+                    f"time to first token {stream.time_to_first_token or 0:.3f}s, "
+                    f"total {stream.total_time:.3f}s"
+                )
+
+                stream.result = await asyncio.to_thread(
+                    self._finalize,
+                    query, answer, prepared, include_sources, log_interaction, k, cache_hit,
+                    {
+                        'streamed': True,
+                        'time_to_first_token': stream.time_to_first_token,
+                        'total_time': stream.total_time
+                    }
+                )
+                stream.result['timings'] = _timings()
+                _record_result(stream.result, "astream")
+
+            except Exception as e:
+                logger.error(f"Error streaming answer: {e}")
+                await asyncio.to_thread(get_interaction_logger().log_error, str(e), query)
+                raise
+    
+    def _prepare(
+        self,
+        query: str,
+        k: int,
+        retrieved_chunks: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run every step before the LLM call.
+        
+        Args:
+            query: User's question
+            k: Number of documents to retrieve
+            retrieved_chunks: Pre-retrieved chunks, or None to retrieve
+            
+        Returns:
+            Dictionary with 'cached' (semantic cache entry or None),
+            'query_embedding', 'retrieved_chunks', 'prompt' and 'messages'
+        """
+        prepared = {
+            'cached': None,
+            'query_embedding': None,
+            'retrieved_chunks': retrieved_chunks,
+            'prompt': None,
+            'messages': None
+        }
+        
+        # Step 0: Reuse the answer of a near-duplicate question if cached
+        if self.answer_cache is not None and retrieved_chunks is None:
+            prepared['query_embedding'] = self.retriever.embed_query(query)
+            with span("semantic_cache"):
+                prepared['cached'] = self.answer_cache.lookup(
+                    prepared['query_embedding'],
+                    self.retriever.index_version,
+                    k
+                )
+            CACHE_LOOKUPS.inc(
+                cache='semantic', result='miss' if prepared['cached'] is None else 'hit'
+            )
+            if prepared['cached'] is not None:
+                return prepared
+        
+        # Step 1: Retrieve relevant documents (unless already batched)
+        if retrieved_chunks is None:
+            prepared['retrieved_chunks'] = self.retriever.retrieve(
+                query, k, query_embedding=prepared['query_embedding']
+            )
+        
+        if prepared['retrieved_chunks']:
+            self._build_messages(query, prepared)
+        return prepared
+    
+    async def _aprepare(
+        self,
+        query: str,
+        k: int,
+        retrieved_chunks: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Async counterpart of _prepare using async embedding and retrieval."""
+        prepared = {
+            'cached': None,
+            'query_embedding': None,
+            'retrieved_chunks': retrieved_chunks,
+            'prompt': None,
+            'messages': None
+        }
+        
+        if self.answer_cache is not None and retrieved_chunks is None:
+            prepared['query_embedding'] = await self.retriever.aembed_query(query)
+            with span("semantic_cache"):
+                prepared['cached'] = self.answer_cache.lookup(
+                    prepared['query_embedding'],
+                    self.retriever.index_version,
+                    k
+                )
+            CACHE_LOOKUPS.inc(
+                cache='semantic', result='miss' if prepared['cached'] is None else 'hit'
+            )
+            if prepared['cached'] is not None:
+                return prepared
+        
+        if retrieved_chunks is None:
+            prepared['retrieved_chunks'] = await self.retriever.aretrieve(
+                query, k, query_embedding=prepared['query_embedding']
+            )
+        
+        if prepared['retrieved_chunks']:
+            self._build_messages(query, prepared)
+        return prepared
+    
+    def _build_messages(self, query: str, prepared: Dict[str, Any]):
+        """Format the retrieved context and build the LLM prompt and messages."""
+        # Step 2: Pack retrieved chunks into the context token budget
+        with span("context_build"):
+            packed = self.context_builder.build(prepared['retrieved_chunks'])
+        prepared['context_stats'] = {
+            key: value for key, value in packed.items() if key != 'context'
+        }
+        logger.debug(
+            f"Packed context: {packed['context_tokens']} tokens "
+            f"({packed['tokens_saved']} saved, {packed['chunks_merged']} merged, "
+            f"{packed['chunks_dropped']} dropped)"
+        )
+        
+        # Step 3: Create prompt
+        with span("prompt_build"):
+            prepared['prompt'] = PromptTemplates.format_rag_prompt(
                 query=query,
-                context=context,
+                context=packed['context'],
                 include_system=False
             )
-            
-            # Step 4: Generate answer using LLM
-            messages = [
+            prepared['messages'] = [
                 SystemMessage(content=PromptTemplates.SYSTEM_PROMPT),
-                HumanMessage(content=prompt)
+                HumanMessage(content=prepared['prompt'])
             ]
+    
+    def _completion_key(self, prepared: Dict[str, Any]) -> str:
+        """Key of the rendered prompt in the completion cache."""
+        return CompletionCache.make_key(
+            PromptTemplates.SYSTEM_PROMPT,
+            prepared['prompt'],
+            self.llm_model,
+            self.temperature
+        )
+    
+    def _lookup_completion(self, prepared: Dict[str, Any]) -> Optional[str]:
+        """Return a cached completion for the rendered prompt, if any."""
+        if self.completion_cache is None:
+            return None
+        with span("completion_cache"):
+            answer = self.completion_cache.get(
+                self._completion_key(prepared), self.retriever.index_version
+            )
+        CACHE_LOOKUPS.inc(cache='completion', result='miss' if answer is None else 'hit')
+        if answer is not None:
+            logger.info("Completion cache hit for rendered prompt")
+        return answer
+    
+    def _record_llm_usage(
+        self,
+        messages: List[Any],
+        answer: str,
+        usage_metadata: Optional[Dict[str, Any]]
+    ):
+        """Record the chat tokens of a completion.
+        
+        Uses the counts reported by the provider, or tiktoken counts of the
+        messages and answer when the response carries none (e.g. streams).
+        """
+        if usage_metadata:
+            record_usage(
+                self.llm_model,
+                prompt_tokens=usage_metadata.get('input_tokens', 0),
+                completion_tokens=usage_metadata.get('output_tokens', 0)
+            )
+        else:
+            record_usage(
+                self.llm_model,
+                estimated=True,
+                prompt_tokens=count_message_tokens(messages, self.llm_model),
+                completion_tokens=count_tokens(answer, self.llm_model)
+            )
+    
+    def _store_completion(self, prepared: Dict[str, Any], answer: str):
+        """Cache a fresh completion for the rendered prompt."""
+        if self.completion_cache is not None:
+            with span("completion_cache"):
+                self.completion_cache.put(
+                    self._completion_key(prepared), answer, self.retriever.index_version
+                )
+    
+    def _finalize(
+        self,
+        query: str,
+        answer: str,
+        prepared: Dict[str, Any],
+        include_sources: bool,
+        log_interaction: bool,
+        top_k: int,
+        cache_hit: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Attach sources, update the semantic cache and log the interaction.
+        
+        Args:
+            query: User's question
+            answer: Raw LLM answer
+            prepared: Output of _prepare
+            include_sources: Whether to include source references in response
+            log_interaction: Whether to log this interaction
+            top_k: Number of documents retrieved
+            cache_hit: 'completion' if the answer came from the completion cache
+            metadata: Extra metadata for the interaction log
             
-            response = self.llm.invoke(messages)
-            answer = response.content
-            
-            # Step 5: Format complete response with sources
-            if include_sources:
-                complete_answer = PromptTemplates.format_complete_response(
+        Returns:
+            Result dictionary returned by generate_answer
+        """
+        retrieved_chunks = prepared['retrieved_chunks']
+        
+        if include_sources:
+            complete_answer = PromptTemplates.format_complete_response(
+                answer=answer,
+                retrieved_chunks=retrieved_chunks,
+                include_sources=True
+            )
+        else:
+            complete_answer = answer
+        
+        # Extract unique sources
+        sources = list(set([
+            chunk['metadata']['source']
+            for chunk in retrieved_chunks
+        ]))
+        
+        result = {
+            'answer': complete_answer,
+            'retrieved_chunks': retrieved_chunks,
+            'sources': sources,
+            'query': query,
+            'cache': cache_hit,
+            'resilience': _call_stats(),
+            'usage': _usage(),
+            'timings': {}
+        }
+        
+        if prepared['query_embedding'] is not None:
+            with span("semantic_cache"):
+                self.answer_cache.store(
+                    query=query,
+                    query_embedding=prepared['query_embedding'],
                     answer=answer,
                     retrieved_chunks=retrieved_chunks,
-                    include_sources=True
+                    sources=sources,
+                    index_version=self.retriever.index_version,
+                    top_k=top_k
                 )
-            else:
-                complete_answer = answer
-            
-            # Extract unique sources
-            sources = list(set([
-                chunk['metadata']['source']
-                for chunk in retrieved_chunks
-            ]))
-            
-            result = {
-                'answer': complete_answer,
-                'retrieved_chunks': retrieved_chunks,
-                'sources': sources,
-                'query': query
+        
+        # Log interaction (with the timings measured up to this point)
+        result['timings'] = _timings()
+        if log_interaction:
+            log_metadata = {
+                'model': self.llm_model,
+                'top_k': top_k,
+                'cache': cache_hit,
+                # Identifies the chunk store that compact chunk references point into
+                'index_version': self.retriever.index_version
             }
-            
-            # Log interaction
-            if log_interaction:
-                interaction_logger.log_interaction(
+            log_metadata.update(prepared.get('context_stats') or {})
+            log_metadata['resilience'] = result['resilience']
+            log_metadata['usage'] = result['usage']
+            log_metadata['timings'] = result['timings']
+            log_metadata.update(metadata or {})
+            with span("logging"):
+                get_interaction_logger().log_interaction(
                     query=query,
                     retrieved_chunks=retrieved_chunks,
                     generated_response=complete_answer,
-                    metadata={'model': self.llm_model, 'top_k': top_k or Config.TOP_K}
+                    metadata=log_metadata
                 )
+        
+        return result
+    
+    @staticmethod
+    def _no_results_result(query: str) -> Dict[str, Any]:
+        """Result returned when retrieval finds no relevant chunks."""
+        return {
+            'answer': "I apologize, but I couldn't find relevant information in our policy documents to answer your question. Please contact our customer care at 1800-XXX-XXXX for assistance.",
+            'retrieved_chunks': [],
+            'sources': [],
+            'query': query,
+            'cache': None,
+            'resilience': _call_stats(),
+            'usage': _usage(),
+            'timings': _timings()
+        }
+    
+    def _cached_result(
+        self,
+        query: str,
+        cached: Dict[str, Any],
+        include_sources: bool,
+        log_interaction: bool,
+        top_k: int
+    ) -> Dict[str, Any]:
+        """Build a result from a semantic cache hit without calling the LLM.
+        
+        Args:
+            query: User's question
+            cached: Entry returned by SemanticAnswerCache.lookup
+            include_sources: Whether to include source references in response
+            log_interaction: Whether to log this interaction
+            top_k: Number of documents the cached answer was generated with
             
-            logger.info(f"Successfully generated answer ({len(answer)} characters)")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            interaction_logger.log_error(str(e), query)
-            raise
+        Returns:
+            Result dictionary in the same shape as generate_answer
+        """
+        logger.info(
+            f"Semantic cache hit (similarity {cached['similarity']:.3f}) "
+            f"for query: '{query[:50]}...'"
+        )
+        
+        complete_answer = PromptTemplates.format_complete_response(
+            answer=cached['answer'],
+            retrieved_chunks=cached['retrieved_chunks'],
+            include_sources=include_sources
+        )
+        
+        if log_interaction:
+            with span("logging"):
+                get_interaction_logger().log_interaction(
+                    query=query,
+                    retrieved_chunks=cached['retrieved_chunks'],
+                    generated_response=complete_answer,
+                    metadata={
+                        'model': self.llm_model,
+                        'top_k': top_k,
+                        'cache': 'semantic',
+                        'index_version': self.retriever.index_version,
+                        'resilience': _call_stats(),
+                        'usage': _usage(),
+                        'timings': _timings(),
+                        'cached_query': cached['query'],
+                        'similarity': cached['similarity']
+                    }
+                )
+        
+        return {
+            'answer': complete_answer,
+            'retrieved_chunks': cached['retrieved_chunks'],
+            'sources': cached['sources'],
+            'query': query,
+            'cache': 'semantic',
+            'resilience': _call_stats(),
+            'usage': _usage(),
+            'timings': _timings()
+        }
     
     def generate_answer_simple(self, query: str) -> str:
         """Generate a simple answer (just the text) for a query.
@@ -157,3 +924,92 @@ class AnswerGenerator:
         """
         result = self.generate_answer(query)
         return result['answer']
+    
+    def iter_answers(
+        self,
+        queries: Iterable[str],
+        max_concurrency: int = None,
+        top_k: int = None,
+        include_sources: bool = True,
+        log_interaction: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """Answer many queries concurrently, yielding results in input order.
+        
+        At most ``max_concurrency`` questions are generated at the same time
+        and only a small window of results is buffered, so arbitrarily large
+        query iterables can be streamed through. A failing query does not
+        stop the batch: its result has an 'error' key instead of an answer.
+        
+        Args:
+            queries: Iterable of user questions
+            max_concurrency: Maximum in-flight questions (default Config.BATCH_CONCURRENCY)
+            top_k: Number of documents to retrieve per question
+            include_sources: Whether to include source references in responses
+            log_interaction: Whether to log each interaction
+            
+        Yields:
+            Result dictionaries (as from generate_answer) plus 'latency' in
+            seconds, or {'query', 'error', 'latency'} for failed questions
+        """
+        max_concurrency = max(1, max_concurrency or Config.BATCH_CONCURRENCY)
+        
+        def answer_one(query: str) -> Dict[str, Any]:
+            start_time = time.perf_counter()
+            try:
+                result = self.generate_answer(
+                    query,
+                    top_k=top_k,
+                    include_sources=include_sources,
+                    log_interaction=log_interaction
+                )
+            except Exception as e:
+                result = {'query': query, 'error': str(e)}
+            result['latency'] = time.perf_counter() - start_time
+            return result
+        
+        query_iter = iter(queries)
+        # Queue a few more than the worker count so workers never idle while
+        # the head-of-line result is being consumed
+        window = max_concurrency * 2
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            pending = deque()
+            for query in query_iter:
+                pending.append(executor.submit(answer_one, query))
+                if len(pending) >= window:
+                    break
+            
+            while pending:
+                result = pending.popleft().result()
+                next_query = next(query_iter, _END_OF_QUERIES)
+                if next_query is not _END_OF_QUERIES:
+                    pending.append(executor.submit(answer_one, next_query))
+                yield result
+    
+    def generate_answers(
+        self,
+        queries: Iterable[str],
+        max_concurrency: int = None,
+        top_k: int = None,
+        include_sources: bool = True,
+        log_interaction: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Answer many queries concurrently.
+        
+        Args:
+            queries: Iterable of user questions
+            max_concurrency: Maximum in-flight questions (default Config.BATCH_CONCURRENCY)
+            top_k: Number of documents to retrieve per question
+            include_sources: Whether to include source references in responses
+            log_interaction: Whether to log each interaction
+            
+        Returns:
+            List of results in the same order as queries (see iter_answers)
+        """
+        return list(self.iter_answers(
+            queries,
+            max_concurrency=max_concurrency,
+            top_k=top_k,
+            include_sources=include_sources,
+            log_interaction=log_interaction
+        ))
@@ -0,0 +1,353 @@
+"""Bulk question answering from JSONL/CSV files with checkpointed resume.
+
+Usage:
+    python -m src.generation.batch questions.jsonl -o answers.jsonl --concurrency 8
+
+Input rows may be JSONL objects with a 'query' or 'question' field (the
+format of tests/test_queries.py), bare JSON strings, or CSV rows with a
+'query' or 'question' column. The output JSONL starts with a header
+holding a fingerprint of the input, followed by one result line per
+question in input order. The output file doubles as the checkpoint:
+rerunning the same command skips questions already answered and retries
+the ones that failed, whose new results are appended (the last line for an
+index wins). Once a resumed run completes, the file is rewritten with one
+line per index in input order. Resuming against a different input file is
+refused.
+
+Results are flushed after every record and fsynced following the
+interaction log policy (Config.LOG_FSYNC and Config.LOG_FSYNC_INTERVAL).
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Set, Tuple
+
+from src.utils.config import Config
+from src.utils.logger import FSYNC_POLICIES
+from src.utils.usage import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+QUERY_FIELDS = ("query", "question")
+
+# Key of the header record holding the input fingerprint
+HEADER_KEY = "input_fingerprint"
+
+
+def read_queries(input_file: Path) -> Iterator[str]:
+    """Stream questions from a JSONL or CSV file.
+
+    Args:
+        input_file: Path to a .jsonl/.json or .csv file, optionally gzipped
+                    (e.g. a rotated interaction log segment)
+
+    Yields:
+        Question strings in file order
+    """
+    input_file = Path(input_file)
+    compressed = input_file.suffix.lower() == ".gz"
+    file_format = Path(input_file.stem).suffix.lower() if compressed else input_file.suffix.lower()
+    opener = gzip.open if compressed else open
+
+    with opener(input_file, 'rt', encoding='utf-8', newline='') as f:
+        if file_format == ".csv":
+            reader = csv.DictReader(f)
+            field = next((name for name in QUERY_FIELDS if name in (reader.fieldnames or [])), None)
+            if field is None:
+                raise ValueError(f"CSV file {input_file} needs a 'query' or 'question' column")
+            for row in reader:
+                yield row[field]
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, str):
+                    yield record
+                    continue
+                field = next((name for name in QUERY_FIELDS if name in record), None)
+                if field is None:
+                    raise ValueError(
+                        f"Line {line_number} of {input_file} has no 'query' or 'question' field"
+                    )
+                yield record[field]
+
+
+def input_fingerprint(input_file: Path) -> str:
+    """SHA-256 of an input file's bytes, identifying the questions it holds."""
+    digest = hashlib.sha256()
+    with open(input_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(output_file: Path) -> Tuple[Optional[str], Set[int]]:
+    """Read the header and finished questions of an output file, dropping a torn last line.
+
+    Questions whose latest result has an error are not finished, so they
+    are answered again on resume.
+
+    Args:
+        output_file: Output JSONL file from a previous run
+
+    Returns:
+        The input fingerprint from the header (None if the file has no
+        header) and the indices of successfully answered questions
+    """
+    output_file = Path(output_file)
+    if not output_file.exists():
+        return None, set()
+
+    fingerprint = None
+    latest_errors: Dict[int, bool] = {}
+    valid_bytes = 0
+    with open(output_file, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid_bytes += len(line)
+            if HEADER_KEY in record:
+                fingerprint = record[HEADER_KEY]
+            elif 'index' in record:
+                latest_errors[record['index']] = bool(record.get('error'))
+
+    # Truncate a partially written line left by a crash
+    if valid_bytes < output_file.stat().st_size:
+        with open(output_file, 'r+b') as f:
+            f.truncate(valid_bytes)
+        logger.warning(f"Truncated incomplete trailing record in {output_file}")
+
+    return fingerprint, {index for index, failed in latest_errors.items() if not failed}
+
+
+def rewrite_in_order(output_file: Path, header: Dict[str, Any]):
+    """Rewrite an output file with the header and the latest result per index, in index order.
+
+    The new file is written next to the old one and swapped in with
+    os.replace, so a crash leaves either the old or the new file.
+
+    Args:
+        output_file: Output JSONL file of a completed run
+        header: Header record to write first
+    """
+    output_file = Path(output_file)
+    latest: Dict[int, bytes] = {}
+    with open(output_file, 'rb') as f:
+        for line in f:
+            record = json.loads(line)
+            if 'index' in record:
+                latest[record['index']] = line
+
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    with open(tmp_file, 'wb') as f:
+        f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b"\n")
+        for index in sorted(latest):
+            f.write(latest[index])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+
+def format_record(index: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Select the fields written for one answered question.
+
+    Args:
+        index: Position of the question in the input
+        result: Result from AnswerGenerator.iter_answers
+
+    Returns:
+        JSON-serializable output record
+    """
+    return {
+        'index': index,
+        'query': result.get('query'),
+        'answer': result.get('answer'),
+        'sources': result.get('sources', []),
+        'cache': result.get('cache'),
+        'latency': round(result.get('latency', 0.0), 4),
+        'usage': result.get('usage'),
+        'error': result.get('error')
+    }
+
+
+def run_batch(
+    input_file: Path,
+    output_file: Path,
+    max_concurrency: int = None,
+    top_k: int = None,
+    include_sources: bool = True,
+    log_interaction: bool = True,
+    resume: bool = True,
+    answer_generator=None,
+    fsync: str = None,
+    fsync_interval: float = None
+) -> Dict[str, Any]:
+    """Answer every question in an input file and write results in order.
+
+    Args:
+        input_file: JSONL or CSV file of questions
+        output_file: JSONL file receiving one result per question
+        max_concurrency: Maximum in-flight questions (default Config.BATCH_CONCURRENCY)
+        top_k: Number of documents to retrieve per question
+        include_sources: Whether to include source references in answers
+        log_interaction: Whether to log each interaction
+        resume: Skip questions already present in output_file
+        answer_generator: AnswerGenerator to use (created if None)
+        fsync: 'always', 'interval' or 'never' (default Config.LOG_FSYNC)
+        fsync_interval: Seconds between fsyncs with the 'interval' policy
+                        (default Config.LOG_FSYNC_INTERVAL)
+
+    Returns:
+        Summary with 'answered', 'skipped', 'errors', 'elapsed',
+        'queries_per_second' and 'usage' (tokens and cost of this run per model)
+
+    Raises:
+        ValueError: If resuming into an output file written for another input
+                    or the fsync policy is unknown
+    """
+    fsync = (fsync or Config.LOG_FSYNC).lower()
+    fsync_interval = Config.LOG_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy '{fsync}'. Use one of {FSYNC_POLICIES}.")
+
+    if answer_generator is None:
+        from src.generation.answer_generator import AnswerGenerator
+        answer_generator = AnswerGenerator()
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    fingerprint = input_fingerprint(input_file)
+    previous_fingerprint, completed = load_checkpoint(output_file) if resume else (None, set())
+    resuming = resume and output_file.exists() and output_file.stat().st_size > 0
+    if resuming:
+        if previous_fingerprint is None:
+            logger.warning(f"{output_file} has no input fingerprint; assuming it matches {input_file}")
+        elif previous_fingerprint != fingerprint:
+            raise ValueError(
+                f"{output_file} was written for a different input than {input_file}; "
+                f"use another output file or --restart"
+            )
+        logger.info(f"Resuming with {len(completed)} completed questions in {output_file}")
+
+    # Indices of the queued questions, in the order iter_answers yields them
+    queued_indices = deque()
+
+    def remaining_queries():
+        for index, query in enumerate(read_queries(input_file)):
+            if index not in completed:
+                queued_indices.append(index)
+                yield query
+
+    answered = 0
+    errors = 0
+    usage = TokenUsage()
+    start_time = time.perf_counter()
+    last_fsync = time.monotonic()
+    header = {HEADER_KEY: fingerprint, 'input_file': str(input_file)}
+
+    with open(output_file, 'a' if resuming else 'w', encoding='utf-8') as out:
+        if not resuming:
+            out.write(json.dumps(header, ensure_ascii=False) + "\n")
+        results = answer_generator.iter_answers(
+            remaining_queries(),
+            max_concurrency=max_concurrency,
+            top_k=top_k,
+            include_sources=include_sources,
+            log_interaction=log_interaction
+        )
+        for result in results:
+            index = queued_indices.popleft()
+            out.write(json.dumps(format_record(index, result), ensure_ascii=False) + "\n")
+            # Flush every record so the file is an accurate checkpoint if the
+            # process dies; fsync, which also survives power loss, is batched
+            out.flush()
+            if fsync == "always" or (
+                fsync == "interval" and time.monotonic() - last_fsync >= fsync_interval
+            ):
+                os.fsync(out.fileno())
+                last_fsync = time.monotonic()
+
+            answered += 1
+            usage.merge(result.get('usage'))
+            if result.get('error'):
+                errors += 1
+            if answered % 50 == 0:
+                rate = answered / (time.perf_counter() - start_time)
+                logger.info(f"Answered {answered} questions ({rate:.2f} queries/s)")
+        if fsync != "never":
+            os.fsync(out.fileno())
+
+    if resuming:
+        # Retried failures were appended after later indices
+        rewrite_in_order(output_file, header)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        'answered': answered,
+        'skipped': len(completed),
+        'errors': errors,
+        'elapsed': elapsed,
+        'queries_per_second': answered / elapsed if elapsed > 0 else 0.0,
+        'usage': usage.as_dict()
+    }
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Answer a file of questions in bulk")
+    parser.add_argument("input", type=Path, help="JSONL or CSV file of questions")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Output JSONL file")
+    parser.add_argument("-c", "--concurrency", type=int, default=Config.BATCH_CONCURRENCY,
+                        help="Maximum questions answered at the same time")
+    parser.add_argument("--top-k", type=int, default=None, help="Chunks to retrieve per question")
+    parser.add_argument("--no-sources", action="store_true", help="Omit source references")
+    parser.add_argument("--no-log", action="store_true", help="Do not write interaction logs")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore existing output and start from the first question")
+    args = parser.parse_args()
+
+    summary = run_batch(
+        args.input,
+        args.output,
+        max_concurrency=args.concurrency,
+        top_k=args.top_k,
+        include_sources=not args.no_sources,
+        log_interaction=not args.no_log,
+        resume=not args.restart
+    )
+
+    print(
+        f"\n✓ Answered {summary['answered']} questions "
+        f"({summary['skipped']} skipped from checkpoint, {summary['errors']} errors) "
+        f"in {summary['elapsed']:.1f}s - {summary['queries_per_second']:.2f} queries/s"
+    )
+    for model, counts in summary['usage']['models'].items():
+        print(
+            f"  {model}: {counts['prompt_tokens']} prompt, "
+            f"{counts['completion_tokens']} completion, "
+            f"{counts['embedding_tokens']} embedding tokens"
+        )
+    if summary['usage']['cost_usd'] is not None:
+        print(f"  Estimated cost: ${summary['usage']['cost_usd']:.4f}")
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
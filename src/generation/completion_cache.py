@@ -0,0 +1,159 @@
+"""Persistent exact-match cache of LLM completions keyed on the rendered prompt."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionCache:
+    """Content-addressed SQLite cache of raw LLM answers.
+
+    Entries are keyed by a hash of the system prompt, the rendered user
+    prompt, the model and the temperature. Each row records the vector store
+    index version it was produced against; rows from any other version are
+    treated as stale, so rebuilding the vector store invalidates the cache.
+    """
+
+    def __init__(self, cache_path: Path = None, max_entries: int = None):
+        """Initialize the completion cache.
+
+        Args:
+            cache_path: SQLite file (default Config.COMPLETION_CACHE_PATH)
+            max_entries: Maximum cached completions
+                        (default Config.COMPLETION_CACHE_MAX_ENTRIES)
+        """
+        self.cache_path = Path(cache_path or Config.COMPLETION_CACHE_PATH)
+        self.max_entries = max_entries or Config.COMPLETION_CACHE_MAX_ENTRIES
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, index_version TEXT NOT NULL, "
+            "answer TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_completions_created_at "
+            "ON completions (created_at)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float
+    ) -> str:
+        """Hash the inputs that fully determine a completion.
+
+        Args:
+            system_prompt: System message content
+            user_prompt: Rendered user prompt including retrieved context
+            model: LLM model name
+            temperature: Sampling temperature
+
+        Returns:
+            Hex digest identifying the completion
+        """
+        payload = json.dumps(
+            [system_prompt, user_prompt, model, float(temperature)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def invalidate_other_versions(self, index_version: str) -> int:
+        """Delete completions produced against a different vector store build.
+
+        Args:
+            index_version: Current vector store index version
+
+        Returns:
+            Number of rows removed
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM completions WHERE index_version != ?",
+                (index_version,)
+            ).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"Invalidated {removed} cached completions from an older index")
+        return removed
+
+    def get(self, key: str, index_version: str) -> Optional[str]:
+        """Look up a cached raw answer.
+
+        Args:
+            key: Key from make_key
+            index_version: Current vector store index version
+
+        Returns:
+            Cached answer text, or None on a miss or stale entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM completions WHERE key = ? AND index_version = ?",
+                (key, index_version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, answer: str, index_version: str):
+        """Store a raw answer.
+
+        Args:
+            key: Key from make_key
+            answer: Raw LLM answer, without source references
+            index_version: Vector store index version used for the prompt
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, index_version, answer, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, index_version, answer, time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM completions WHERE key IN ("
+                "SELECT key FROM completions ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored completions.
+
+        Returns:
+            Dictionary with hits, misses, entries and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Remove all cached completions."""
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
@@ -0,0 +1,192 @@
+"""Token-budgeted context packing for the RAG prompt."""
+
+import logging
+from typing import List, Dict, Any, Optional
+
+import tiktoken
+
+from src.data_preparation.chunker import ApproximateEncoder
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ContextBuilder:
+    """Packs retrieved chunks into the prompt context within a token budget.
+
+    Chunks are taken in retrieval order. A chunk whose chunk_id is adjacent
+    to an already selected chunk from the same source is merged into it, and
+    the text the two chunks share because of the chunker overlap is written
+    only once. Chunks that no longer fit in the budget are dropped.
+    """
+
+    # Shortest suffix/prefix match treated as chunker overlap rather than coincidence
+    MIN_OVERLAP_CHARS = 20
+
+    def __init__(
+        self,
+        max_tokens: int = None,
+        encoding_name: str = "cl100k_base",
+        merge_adjacent: bool = None
+    ):
+        """Initialize the context builder.
+
+        Args:
+            max_tokens: Token budget for the context (default Config.CONTEXT_MAX_TOKENS)
+            encoding_name: Name of the tiktoken encoding to use
+            merge_adjacent: Merge neighbouring chunks of the same source
+                            (default Config.CONTEXT_MERGE_ADJACENT)
+        """
+        self.max_tokens = max_tokens or Config.CONTEXT_MAX_TOKENS
+        self.merge_adjacent = (
+            Config.CONTEXT_MERGE_ADJACENT if merge_adjacent is None else merge_adjacent
+        )
+        # Overlap is at most CHUNK_OVERLAP tokens, roughly 4 characters each
+        self.max_overlap_chars = Config.CHUNK_OVERLAP * 8
+
+        try:
+            self.encoder = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            logger.warning(
+                f"Could not load encoding {encoding_name}, estimating tokens from length: {e}"
+            )
+            self.encoder = ApproximateEncoder()
+
+    def count_tokens(self, text: str) -> int:
+        """Count the number of tokens in a text string.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Number of tokens
+        """
+        return len(self.encoder.encode(text))
+
+    @staticmethod
+    def format_block(index: int, source: str, content: str) -> str:
+        """Render one context block, matching DocumentRetriever.format_retrieved_chunks."""
+        return f"[Document {index} - {source}]\n{content}\n"
+
+    @staticmethod
+    def _chunk_position(chunk: Dict[str, Any]) -> Optional[int]:
+        """Return the chunk_id as an int, or None if it is missing."""
+        try:
+            return int(chunk['metadata'].get('chunk_id'))
+        except (TypeError, ValueError):
+            return None
+
+    def merge_overlap(self, first: str, second: str) -> str:
+        """Join two consecutive chunks, writing their shared overlap once.
+
+        Args:
+            first: Text of the earlier chunk
+            second: Text of the following chunk
+
+        Returns:
+            Combined text
+        """
+        limit = min(len(first), len(second), self.max_overlap_chars)
+        for size in range(limit, self.MIN_OVERLAP_CHARS - 1, -1):
+            if first.endswith(second[:size]):
+                return first + second[size:]
+        return f"{first}\n{second}"
+
+    def _find_neighbour(self, blocks: List[Dict[str, Any]], source: str, position: int):
+        """Find a selected block the chunk at position directly precedes or follows."""
+        for block in blocks:
+            if block['source'] != source or block['first'] is None:
+                continue
+            if position == block['last'] + 1:
+                return block, 'after'
+            if position == block['first'] - 1:
+                return block, 'before'
+        return None, None
+
+    def build(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pack retrieved chunks into a context string.
+
+        Args:
+            chunks: Retrieved chunks in relevance order
+
+        Returns:
+            Dictionary with 'context', 'chunks_used', 'chunks_merged',
+            'chunks_dropped', 'context_tokens', 'original_tokens' and
+            'tokens_saved' (relative to concatenating every chunk verbatim)
+        """
+        blocks = []
+        seen = set()
+        used_tokens = 0
+        merged = 0
+        dropped = 0
+
+        for chunk in chunks:
+            source = chunk['metadata'].get('source', 'Unknown')
+            position = self._chunk_position(chunk)
+            if position is not None:
+                if (source, position) in seen:
+                    merged += 1
+                    continue
+
+            block, side = (None, None)
+            if self.merge_adjacent and position is not None:
+                block, side = self._find_neighbour(blocks, source, position)
+
+            if block is not None:
+                if side == 'after':
+                    text = self.merge_overlap(block['text'], chunk['content'])
+                else:
+                    text = self.merge_overlap(chunk['content'], block['text'])
+                tokens = self.count_tokens(self.format_block(len(blocks), source, text))
+                if used_tokens - block['tokens'] + tokens > self.max_tokens:
+                    dropped += 1
+                    continue
+                used_tokens += tokens - block['tokens']
+                block.update(text=text, tokens=tokens)
+                block['first'] = min(block['first'], position)
+                block['last'] = max(block['last'], position)
+                merged += 1
+            else:
+                text = chunk['content']
+                tokens = self.count_tokens(self.format_block(len(blocks) + 1, source, text))
+                if used_tokens + tokens > self.max_tokens:
+                    if blocks:
+                        dropped += 1
+                        continue
+                    # Always keep the best chunk, truncated to the budget
+                    header_tokens = self.count_tokens(self.format_block(1, source, ""))
+                    keep = max(0, self.max_tokens - header_tokens)
+                    text = self.encoder.decode(self.encoder.encode(text)[:keep])
+                    tokens = self.count_tokens(self.format_block(1, source, text))
+                used_tokens += tokens
+                blocks.append({
+                    'source': source,
+                    'first': position,
+                    'last': position,
+                    'text': text,
+                    'tokens': tokens
+                })
+
+            if position is not None:
+                seen.add((source, position))
+
+        context = "\n".join(
+            self.format_block(i, block['source'], block['text'])
+            for i, block in enumerate(blocks, 1)
+        )
+        original = "\n".join(
+            self.format_block(i, chunk['metadata'].get('source', 'Unknown'), chunk['content'])
+            for i, chunk in enumerate(chunks, 1)
+        )
+
+        context_tokens = self.count_tokens(context)
+        original_tokens = self.count_tokens(original)
+        return {
+            'context': context,
+            'chunks_used': len(chunks) - dropped,
+            'chunks_merged': merged,
+            'chunks_dropped': dropped,
+            'context_tokens': context_tokens,
+            'original_tokens': original_tokens,
+            'tokens_saved': max(0, original_tokens - context_tokens)
+        }
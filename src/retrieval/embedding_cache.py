@@ -0,0 +1,288 @@
+"""Two-tier (in-memory LRU + SQLite) cache for query embeddings."""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different repeats share a cache entry.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        Case-folded text with whitespace collapsed
+    """
+    return " ".join(text.split()).casefold()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that caches vectors in memory and on disk.
+
+    Lookups go to an in-memory LRU first, then to a persistent SQLite table,
+    and only then to the wrapped embeddings model. Entries are keyed by the
+    normalized text and the embedding model name; rows written for a
+    different model are purged when the cache is opened.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str = None,
+        cache_path: Path = None,
+        max_memory_entries: int = None,
+        max_disk_entries: int = None
+    ):
+        """Initialize the embedding cache.
+
+        Args:
+            embeddings: Underlying embeddings model (e.g. OpenAIEmbeddings)
+            model: Embedding model name used in cache keys (default from Config)
+            cache_path: SQLite file for the persistent tier
+                       (default Config.EMBEDDING_CACHE_PATH)
+            max_memory_entries: Maximum entries kept in the LRU tier
+            max_disk_entries: Maximum rows kept in the SQLite tier
+        """
+        self.embeddings = embeddings
+        self.model = model or Config.EMBEDDING_MODEL
+        self.cache_path = cache_path or Config.EMBEDDING_CACHE_PATH
+        self.max_memory_entries = max_memory_entries or Config.EMBEDDING_CACHE_SIZE
+        self.max_disk_entries = max_disk_entries or Config.EMBEDDING_CACHE_MAX_ENTRIES
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if self.cache_path:
+            self._open_disk_cache(Path(self.cache_path))
+
+        logger.info(
+            f"Initialized embedding cache for model '{self.model}' "
+            f"(memory={self.max_memory_entries}, disk={self.cache_path})"
+        )
+
+    def _open_disk_cache(self, path: Path):
+        """Open the SQLite tier and drop rows produced by other models."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+            "vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+            "ON embeddings (last_used)"
+        )
+        purged = self._conn.execute(
+            "DELETE FROM embeddings WHERE model != ?", (self.model,)
+        ).rowcount
+        self._conn.commit()
+        if purged:
+            logger.info(f"Invalidated {purged} cached embeddings from other models")
+
+    def _key(self, text: str) -> str:
+        """Build the cache key for a text under the current model."""
+        payload = f"{self.model}\x00{normalize_query(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        """Look a key up in memory, then on disk, updating hit counters."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                    self._conn.commit()
+                    vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def _remember(self, key: str, vector: List[float]):
+        """Insert into the LRU tier, evicting the least recently used entry."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _put_many(self, items: Dict[str, List[float]]):
+        """Store freshly computed vectors in both tiers."""
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+
+            if self._conn is None:
+                return
+
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (key, self.model, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                    for key, vector in items.items()
+                ]
+            )
+            # Trim the oldest rows once the disk tier exceeds its limit
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+            self._conn.commit()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, serving repeats from the cache.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._put_many({key: vector})
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, requesting only cache misses in one batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[List[float]]] = [self._get(key) for key in keys]
+
+        # Embed each distinct missing text once
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), computed))
+            self._put_many(fresh)
+            vectors = [
+                vector if vector is not None else fresh[key]
+                for key, vector in zip(keys, vectors)
+            ]
+
+        return vectors
+
+    async def _aget(self, key: str) -> Optional[List[float]]:
+        """Async lookup: memory hits stay on the loop, disk reads go to a thread."""
+        if key in self._memory:
+            return self._get(key)
+        return await asyncio.to_thread(self._get, key)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronously embed a query, serving repeats from the cache.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        key = self._key(text)
+        vector = await self._aget(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self._put_many, {key: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronously embed several texts, requesting only cache misses.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        keys = [self._key(text) for text in texts]
+        vectors = [await self._aget(key) for key in keys]
+
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = await self.embeddings.aembed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), computed))
+            await asyncio.to_thread(self._put_many, fresh)
+            vectors = [
+                vector if vector is not None else fresh[key]
+                for key, vector in zip(keys, vectors)
+            ]
+
+        return vectors
+
+    def stats(self) -> Dict[str, float]:
+        """Return cache hit/miss counters and tier sizes.
+
+        Returns:
+            Dictionary with hit, miss, size and hit-rate statistics
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute(
+                    "SELECT COUNT(*) FROM embeddings"
+                ).fetchone()[0]
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+    def clear(self):
+        """Remove all entries from both cache tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
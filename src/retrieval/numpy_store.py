@@ -0,0 +1,259 @@
+"""In-process exact-search vector store backed by a NumPy matrix."""
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from src.embeddings.embedding_store import EmbeddingStore
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyVectorStore:
+    """Exact nearest-neighbour search over a pre-normalized embedding matrix.
+
+    All chunk embeddings are held in one contiguous float32 matrix whose rows
+    are L2-normalized (when the binary store is written, otherwise at load
+    time), so a query is answered with a single matrix-vector product
+    followed by an ``argpartition`` top-k selection.
+    """
+
+    def __init__(self, chunks_file: Path = None, store_dir: Path = None):
+        """Initialize the store from the binary embedding store or JSON file.
+
+        The memory-mapped binary store is preferred when it exists; a float32
+        normalized store is used in place without copying. Otherwise the
+        chunks-with-embeddings JSON file is parsed.
+
+        Args:
+            chunks_file: Path to the JSON file produced by the embedding stage.
+                        Defaults to Config.CHUNKS_WITH_EMBEDDINGS_FILE.
+                        Passing it explicitly skips the binary store.
+            store_dir: Binary embedding store directory
+                      (default Config.EMBEDDING_STORE_DIR)
+        """
+        if chunks_file is None and EmbeddingStore.exists(store_dir):
+            embedding_store = EmbeddingStore(store_dir)
+            self.chunks_file = embedding_store.directory
+            self._load_store(embedding_store)
+        else:
+            self.chunks_file = Path(chunks_file or Config.CHUNKS_WITH_EMBEDDINGS_FILE)
+
+            if not self.chunks_file.exists():
+                raise FileNotFoundError(f"Chunks file not found: {self.chunks_file}")
+
+            with open(self.chunks_file, 'r', encoding='utf-8') as f:
+                chunks = json.load(f)
+
+            self._load_chunks(chunks)
+
+        logger.info(
+            f"Loaded {self.count()} vectors of dimension {self.dimension} "
+            f"from {self.chunks_file}"
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict[str, Any]]) -> "NumpyVectorStore":
+        """Build a store directly from in-memory chunks with embeddings.
+
+        Args:
+            chunks: List of chunk dictionaries with 'content', 'metadata'
+                   and 'embedding' keys
+
+        Returns:
+            Initialized NumpyVectorStore
+        """
+        store = cls.__new__(cls)
+        store.chunks_file = None
+        store._load_chunks(chunks)
+        return store
+
+    def _load_store(self, embedding_store: EmbeddingStore):
+        """Use a binary embedding store's matrix, copying only when required.
+
+        Chunk content stays in the store and is read only for returned hits.
+        """
+        self.embedding_store = embedding_store
+        self.documents = None
+
+        matrix = embedding_store.matrix
+        if matrix.dtype == np.float32 and embedding_store.normalized:
+            # Zero-copy: search directly against the memory-mapped rows
+            self.matrix = matrix
+        else:
+            # float16 rows are widened once so searches run through BLAS
+            self.matrix = self._normalize(matrix)
+
+    def _load_chunks(self, chunks: List[Dict[str, Any]]):
+        """Split chunks into document records and a normalized matrix."""
+        self.embedding_store = None
+        self.documents = [self._make_document(chunk) for chunk in chunks]
+
+        matrix = np.asarray(
+            [chunk['embedding'] for chunk in chunks],
+            dtype=np.float32
+        )
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(chunks), -1)
+        self.matrix = self._normalize(matrix)
+
+    @staticmethod
+    def _make_document(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract content and string-valued metadata from a chunk record."""
+        # Match the metadata shape returned by the Chroma backend
+        metadata = {key: str(value) for key, value in chunk['metadata'].items()}
+        return {
+            'content': chunk['content'],
+            'metadata': metadata
+        }
+
+    def _get_document(self, index: int) -> Dict[str, Any]:
+        """Return the document for a matrix row."""
+        if self.documents is None:
+            return self._make_document(self.embedding_store.get_chunk(index))
+        return self.documents[index]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Return a C-contiguous float32 copy of vectors with unit-length rows."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the stored embedding vectors."""
+        return self.matrix.shape[1]
+
+    def count(self) -> int:
+        """Return the number of vectors in the store."""
+        return self.matrix.shape[0]
+
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int
+    ) -> List[Tuple[int, float]]:
+        """Find the k nearest stored vectors to a query embedding.
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+
+        Returns:
+            List of (row index, distance) tuples sorted by ascending distance.
+            Distance is the squared L2 distance between unit vectors
+            (``2 - 2 * cosine``), matching Chroma's default metric.
+        """
+        n = self.count()
+        k = min(k, n)
+        if k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32))
+        scores = self.matrix @ query
+
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top])]
+
+        distances = 2.0 - 2.0 * scores[top]
+        return [
+            (int(index), max(float(distance), 0.0))
+            for index, distance in zip(top, distances)
+        ]
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        k: int
+    ) -> List[List[Tuple[int, float]]]:
+        """Find the k nearest stored vectors for several queries at once.
+
+        All queries are scored with one matrix-matrix product.
+
+        Args:
+            query_embeddings: Query embedding vectors
+            k: Number of results per query
+
+        Returns:
+            One list of (row index, distance) tuples per query, in input order
+        """
+        n = self.count()
+        k = min(k, n)
+        if k <= 0 or len(query_embeddings) == 0:
+            return [[] for _ in query_embeddings]
+
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ self.matrix.T
+
+        if k < n:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(n), (scores.shape[0], 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        distances = 2.0 - 2.0 * np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [
+                (int(index), max(float(distance), 0.0))
+                for index, distance in zip(row_indices, row_distances)
+            ]
+            for row_indices, row_distances in zip(top, distances)
+        ]
+
+    def _format_results(self, hits: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """Convert (row index, distance) hits to retriever output dictionaries."""
+        results = []
+        for index, distance in hits:
+            document = self._get_document(index)
+            results.append({
+                'content': document['content'],
+                'metadata': dict(document['metadata']),
+                'distance': distance,
+            })
+        return results
+
+    def similarity_search_by_vector_with_score(
+        self,
+        query_embedding: List[float],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """Search by vector and return chunks in the retriever output format.
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+
+        Returns:
+            List of dictionaries with 'content', 'metadata' and 'distance' keys
+        """
+        return self._format_results(self.search(query_embedding, k))
+
+    def similarity_search_many_by_vector_with_score(
+        self,
+        query_embeddings: List[List[float]],
+        k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Search several query vectors and return chunks per query.
+
+        Args:
+            query_embeddings: Query embedding vectors
+            k: Number of results per query
+
+        Returns:
+            One list of retriever output dictionaries per query, in input order
+        """
+        return [
+            self._format_results(hits)
+            for hits in self.search_many(query_embeddings, k)
+        ]
@@ -1,23 +1,37 @@
-"""Simplified document retriever using LangChain's Chroma."""
+"""Simplified document retriever using LangChain's Chroma or an in-process NumPy store."""
 
+import asyncio
 import logging
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import chromadb
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
 
+from src.embeddings.embedding_store import EmbeddingStore
+from src.retrieval.embedding_cache import CachedEmbeddings
+from src.retrieval.numpy_store import NumpyVectorStore
 from src.utils.config import Config
+from src.utils.http_client import get_http_clients, get_timeout
+from src.utils.resilience import ResilientEmbeddings
+from src.utils.metrics import RETRIEVAL_DISTANCE, RETRIEVED_CHUNKS
+from src.utils.timing import span
+from src.utils.usage import UsageTrackingEmbeddings
 
 logger = logging.getLogger(__name__)
 
 
 class DocumentRetriever:
-    """Retrieves relevant document chunks using LangChain Chroma."""
+    """Retrieves relevant document chunks using LangChain Chroma or NumPy exact search."""
     
     def __init__(
         self,
         persist_directory: str = None,
         collection_name: str = None,
-        top_k: int = None
+        top_k: int = None,
+        store_type: str = None,
+        http_client=None,
+        http_async_client=None
     ):
         """Initialize the document retriever.
         
@@ -25,38 +39,84 @@ class DocumentRetriever:
             persist_directory: Directory where ChromaDB is persisted
             collection_name: Name of the collection
             top_k: Number of documents to retrieve
+            store_type: Vector store backend, 'chromadb' or 'numpy'
+                       (default from Config.VECTOR_STORE_TYPE)
+            http_client: httpx.Client for embedding requests
+                        (default: the shared pooled client)
+            http_async_client: httpx.AsyncClient for async embedding requests
+                              (default: the shared pooled client)
         """
         self.persist_directory = persist_directory or str(Config.VECTOR_STORE_PATH)
         self.collection_name = collection_name or Config.COLLECTION_NAME
         self.top_k = top_k or Config.TOP_K
+        self.store_type = (store_type or Config.VECTOR_STORE_TYPE).lower()
+        
+        if self.store_type not in ("chromadb", "numpy"):
+            raise ValueError(
+                f"Unsupported VECTOR_STORE_TYPE '{self.store_type}'. "
+                f"Use 'chromadb' or 'numpy'."
+            )
         
         try:
-            # Initialize embeddings with SSL bypass
-            import httpx
-            http_client = httpx.Client(verify=False)
+            # Initialize embeddings on the shared pooled HTTP transport
+            shared_client, shared_async_client = get_http_clients("embeddings")
+            self.http_client = http_client or shared_client
+            self.http_async_client = http_async_client or shared_async_client
             
             self.embeddings = OpenAIEmbeddings(
                 model=Config.EMBEDDING_MODEL,
                 openai_api_key=Config.OPENAI_API_KEY,
-                http_client=http_client
+                base_url=Config.OPENAI_BASE_URL,
+                check_embedding_ctx_length=Config.EMBEDDING_CHECK_CTX_LENGTH,
+                timeout=get_timeout("embeddings"),
+                max_retries=0,  # Retries are handled by ResilientEmbeddings
+                http_client=self.http_client,
+                http_async_client=self.http_async_client
             )
+            self.embeddings = ResilientEmbeddings(self.embeddings)
             
-            # Initialize Chroma vector store
-            self.vectorstore = Chroma(
-                collection_name=self.collection_name,
-                persist_directory=self.persist_directory,
-                embedding_function=self.embeddings
-            )
+            # Count the tokens of queries actually sent to the provider
+            self.embeddings = UsageTrackingEmbeddings(self.embeddings, Config.EMBEDDING_MODEL)
             
-            # Create retriever
-            self.retriever = self.vectorstore.as_retriever(
-                search_kwargs={"k": self.top_k}
-            )
+            # Serve repeated queries from the memory/SQLite embedding cache
+            if Config.EMBEDDING_CACHE_ENABLED:
+                self.embeddings = CachedEmbeddings(self.embeddings)
             
-            logger.info(
-                f"Initialized retriever with collection '{self.collection_name}' "
-                f"from {self.persist_directory}"
-            )
+            if self.store_type == "numpy":
+                # Load all embeddings into one in-process matrix
+                self.vectorstore = NumpyVectorStore()
+                self.retriever = None
+                
+                logger.info(
+                    f"Initialized NumPy retriever with {self.vectorstore.count()} "
+                    f"chunks from {self.vectorstore.chunks_file}"
+                )
+            else:
+                # Hold the chromadb collection for batched queries and counts
+                self.client = chromadb.PersistentClient(path=self.persist_directory)
+                self.collection = self.client.get_or_create_collection(
+                    name=self.collection_name,
+                    embedding_function=None
+                )
+                
+                # Initialize Chroma vector store on the same client
+                self.vectorstore = Chroma(
+                    client=self.client,
+                    collection_name=self.collection_name,
+                    embedding_function=self.embeddings
+                )
+                
+                # Create retriever
+                self.retriever = self.vectorstore.as_retriever(
+                    search_kwargs={"k": self.top_k}
+                )
+                
+                logger.info(
+                    f"Initialized retriever with collection '{self.collection_name}' "
+                    f"from {self.persist_directory}"
+                )
+            
+            self.index_version = self._read_index_version()
         except Exception as e:
             logger.error(f"Failed to initialize retriever: {e}")
             raise RuntimeError(
@@ -67,13 +127,47 @@ class DocumentRetriever:
     def retrieve(
         self,
         query: str,
-        top_k: int = None
+        top_k: int = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """Retrieve relevant document chunks for a query.
         
         Args:
             query: User's question
             top_k: Number of documents to retrieve (overrides default)
+            query_embedding: Precomputed embedding of the query (skips embedding)
+            
+        Returns:
+            List of retrieved document chunks with metadata and scores
+        """
+        k = top_k or self.top_k
+        
+        logger.info(f"Retrieving top {k} documents for query: '{query[:50]}...'")
+        
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        
+        retrieved_chunks = self.retrieve_by_vector(query_embedding, k)
+        
+        logger.info(f"Retrieved {len(retrieved_chunks)} chunks")
+        return retrieved_chunks
+    
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """Asynchronously retrieve relevant document chunks for a query.
+        
+        The query is embedded with the async embeddings client. NumPy search
+        runs inline (it is sub-millisecond); Chroma search runs in a worker
+        thread so the event loop is never blocked on SQLite.
+        
+        Args:
+            query: User's question
+            top_k: Number of documents to retrieve (overrides default)
+            query_embedding: Precomputed embedding of the query (skips embedding)
             
         Returns:
             List of retrieved document chunks with metadata and scores
@@ -82,22 +176,195 @@ class DocumentRetriever:
         
         logger.info(f"Retrieving top {k} documents for query: '{query[:50]}...'")
         
-        # Use similarity_search_with_score for scores
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        if query_embedding is None:
+            query_embedding = await self.aembed_query(query)
         
-        # Format results
-        retrieved_chunks = []
-        for doc, score in results:
-            chunk = {
-                'content': doc.page_content,
-                'metadata': doc.metadata,
-                'distance': score,  # ChromaDB returns L2 distance (lower is better)
-            }
-            retrieved_chunks.append(chunk)
+        if self.store_type == "numpy":
+            retrieved_chunks = self.retrieve_by_vector(query_embedding, k)
+        else:
+            retrieved_chunks = await asyncio.to_thread(
+                self.retrieve_by_vector, query_embedding, k
+            )
         
         logger.info(f"Retrieved {len(retrieved_chunks)} chunks")
         return retrieved_chunks
     
+    async def aembed_query(self, query: str) -> List[float]:
+        """Asynchronously embed a query with the (cached) embeddings model.
+        
+        Args:
+            query: User's question
+            
+        Returns:
+            Query embedding vector
+        """
+        with span("embed_query"):
+            return await self.embeddings.aembed_query(query)
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the retriever's (cached) embeddings model.
+        
+        Args:
+            query: User's question
+            
+        Returns:
+            Query embedding vector
+        """
+        with span("embed_query"):
+            return self.embeddings.embed_query(query)
+    
+    def retrieve_by_vector(
+        self,
+        query_embedding: List[float],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """Search the vector store with an already computed query embedding.
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of documents to retrieve
+            
+        Returns:
+            List of retrieved document chunks with metadata and scores
+        """
+        with span("vector_search"):
+            if self.store_type == "numpy":
+                # Single matrix-vector product over the normalized embeddings
+                retrieved_chunks = self.vectorstore.similarity_search_by_vector_with_score(
+                    query_embedding, k
+                )
+            else:
+                results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                    query_embedding, k=k
+                )
+                
+                # Format results
+                retrieved_chunks = []
+                for doc, score in results:
+                    chunk = {
+                        'content': doc.page_content,
+                        'metadata': doc.metadata,
+                        'distance': score,  # ChromaDB returns L2 distance (lower is better)
+                    }
+                    retrieved_chunks.append(chunk)
+        
+        self._record_retrieval(retrieved_chunks)
+        return retrieved_chunks
+    
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Retrieve relevant document chunks for several queries at once.
+        
+        All queries are embedded with a single embedding request and scored
+        in one batched search, instead of one round trip per query.
+        
+        Args:
+            queries: List of user questions
+            top_k: Number of documents to retrieve per query (overrides default)
+            
+        Returns:
+            One list of retrieved chunks per query, in the same order as queries
+        """
+        k = top_k or self.top_k
+        queries = list(queries)
+        
+        if not queries:
+            return []
+        
+        logger.info(f"Retrieving top {k} documents for {len(queries)} queries")
+        
+        query_embeddings = self.embeddings.embed_documents(queries)
+        
+        if self.store_type == "numpy":
+            # One matrix-matrix product scores every query
+            results = self.vectorstore.similarity_search_many_by_vector_with_score(
+                query_embeddings, k
+            )
+        else:
+            # One batched Chroma query with all embeddings
+            response = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=k,
+                include=["documents", "metadatas", "distances"]
+            )
+            results = []
+            for documents, metadatas, distances in zip(
+                response['documents'],
+                response['metadatas'],
+                response['distances']
+            ):
+                results.append([
+                    {
+                        'content': content,
+                        'metadata': metadata or {},
+                        'distance': distance,
+                    }
+                    for content, metadata, distance in zip(documents, metadatas, distances)
+                ])
+        
+        for chunks in results:
+            self._record_retrieval(chunks)
+        
+        logger.info(f"Retrieved {sum(len(chunks) for chunks in results)} chunks in total")
+        return results
+    
+    @staticmethod
+    def _record_retrieval(chunks: List[Dict[str, Any]]):
+        """Update the retrieval metrics for the chunks returned for one query."""
+        RETRIEVED_CHUNKS.observe(len(chunks))
+        for chunk in chunks:
+            RETRIEVAL_DISTANCE.observe(chunk['distance'])
+    
+    def _read_index_version(self) -> str:
+        """Identify the current build of the vector store.
+        
+        Caches keyed on retrieved content use this to discard entries that
+        were produced against an older index.
+        
+        Returns:
+            Version string that changes whenever the store is rebuilt
+        """
+        if self.store_type == "numpy":
+            source = self.vectorstore.chunks_file
+            if source is None:
+                return "numpy:memory"
+            source = Path(source)
+            if source.is_dir():
+                source = source / EmbeddingStore.INDEX_FILE
+            return f"numpy:{source.stat().st_mtime_ns}"
+        
+        marker = Path(self.persist_directory) / Config.INDEX_VERSION_FILE
+        if marker.exists():
+            return marker.read_text(encoding='utf-8').strip()
+        
+        database = Path(self.persist_directory) / "chroma.sqlite3"
+        if database.exists():
+            return f"chroma:{database.stat().st_mtime_ns}"
+        return "chroma:unknown"
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return query embedding cache statistics.
+        
+        Returns:
+            Cache counters, or an empty dict when caching is disabled
+        """
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.stats()
+        return {}
+    
+    def count(self) -> int:
+        """Return the number of chunks in the underlying vector store.
+        
+        Returns:
+            Number of stored document chunks
+        """
+        if self.store_type == "numpy":
+            return self.vectorstore.count()
+        return self.collection.count()
+    
     def format_retrieved_chunks(
         self,
         chunks: List[Dict[str, Any]],
@@ -109,10 +109,13 @@ def main():
             if not Config.OPENAI_API_KEY:
                 st.error("⚠️ Please provide an OpenAI API key first!")
             else:
-                with st.spinner("Rebuilding vector store... This may take a minute."):
+                with st.spinner("Rebuilding vector store from stored embeddings..."):
                     try:
                         from src.embeddings import build_vector_store
-                        build_vector_store()
+                        progress_bar = st.progress(0.0)
+                        build_vector_store(progress=lambda done, total: progress_bar.progress(
+                            done / total, text=f"Inserted {done}/{total} chunks"
+                        ))
                         st.success("✅ Vector store rebuilt successfully!")
                         st.info("Please refresh the page to use the new vector store.")
                         # Clear cache to force reload
@@ -148,12 +151,20 @@ def main():
         try:
             answer_gen = initialize_answer_generator()
             if answer_gen:
-                # Get count from LangChain Chroma vectorstore
-                total_chunks = answer_gen.retriever.vectorstore._collection.count()
+                # Get count from the configured vector store backend
+                total_chunks = answer_gen.retriever.count()
                 st.success("Vector store loaded")
                 st.metric("Total document chunks", total_chunks)
                 st.metric("LLM Model", Config.LLM_MODEL)
                 st.metric("Embedding Model", Config.EMBEDDING_MODEL)
+                
+                cache_stats = answer_gen.retriever.cache_stats()
+                if cache_stats:
+                    st.metric("Embedding Cache Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+                
+                if answer_gen.answer_cache is not None:
+                    answer_stats = answer_gen.answer_cache.stats()
+                    st.metric("Answer Cache Hit Rate", f"{answer_stats['hit_rate']:.0%}")
         except Exception as e:
             st.error(f"System not initialized: {e}")
     
@@ -214,39 +225,51 @@ def main():
     
     # Process query
     if submit_button and query.strip():
-        with st.spinner("🤔 Searching our policy documents and generating answer..."):
-            try:
-                # Generate answer
-                result = answer_gen.generate_answer(
-                    query=query,
-                    top_k=top_k,
-                    include_sources=show_sources
-                )
-                
-                # Display answer
+        try:
+            # Stream the answer token by token as the LLM produces it
+            st.markdown("---")
+            st.markdown("### ✅ Answer")
+            stream = answer_gen.stream_answer(
+                query=query,
+                top_k=top_k,
+                include_sources=show_sources
+            )
+            st.write_stream(stream)
+            result = stream.result
+            
+            st.caption(
+                f"First token in {stream.time_to_first_token or 0:.2f}s · "
+                f"completed in {stream.total_time or 0:.2f}s"
+            )
+            
+            # Display per-stage latency breakdown (debug mode)
+            if show_retrieved_chunks and result.get('timings'):
                 st.markdown("---")
-                st.markdown("### ✅ Answer")
-                st.markdown(result['answer'])
-                
-                # Display retrieved chunks (debug mode)
-                if show_retrieved_chunks and result['retrieved_chunks']:
-                    st.markdown("---")
-                    st.markdown("### 📄 Retrieved Document Chunks")
-                    for i, chunk in enumerate(result['retrieved_chunks'], 1):
-                        with st.expander(
-                            f"Chunk {i}: {chunk['metadata']['source']} "
-                            f"(Distance: {chunk['distance']:.4f})"
-                        ):
-                            st.markdown(f"**Source:** {chunk['metadata']['source']}")
-                            st.markdown(f"**Distance:** {chunk['distance']:.4f} (lower is better)")
-                            st.markdown(f"**Token Count:** {chunk['metadata']['token_count']}")
-                            st.markdown("**Content:**")
-                            st.markdown(f'<div class="chunk-box">{chunk["content"]}</div>', 
-                                      unsafe_allow_html=True)
-                
-            except Exception as e:
-                st.error(f"❌ Error generating answer: {e}")
-                st.info("Please try rephrasing your question or contact support.")
+                st.markdown("### ⏱️ Stage Timings")
+                st.table([
+                    {"Stage": stage, "Time (ms)": f"{ms:.1f}"}
+                    for stage, ms in result['timings'].items()
+                ])
+
+            # Display retrieved chunks (debug mode)
+            if show_retrieved_chunks and result['retrieved_chunks']:
+                st.markdown("---")
+                st.markdown("### 📄 Retrieved Document Chunks")
+                for i, chunk in enumerate(result['retrieved_chunks'], 1):
+                    with st.expander(
+                        f"Chunk {i}: {chunk['metadata']['source']} "
+                        f"(Distance: {chunk['distance']:.4f})"
+                    ):
+                        st.markdown(f"**Source:** {chunk['metadata']['source']}")
+                        st.markdown(f"**Distance:** {chunk['distance']:.4f} (lower is better)")
+                        st.markdown(f"**Token Count:** {chunk['metadata']['token_count']}")
+                        st.markdown("**Content:**")
+                        st.markdown(f'<div class="chunk-box">{chunk["content"]}</div>', 
+                                  unsafe_allow_html=True)
+            
+        except Exception as e:
+            st.error(f"❌ Error generating answer: {e}")
+            st.info("Please try rephrasing your question or contact support.")
     
     elif submit_button:
         st.warning("⚠️ Please enter a question before submitting.")
@@ -1,9 +1,17 @@
 """Utilities module for configuration and logging."""
 
 from src.utils.config import Config
-from src.utils.logger import interaction_logger
+from src.utils.logger import get_interaction_logger
 
 __all__ = [
     "Config",
+    "get_interaction_logger",
     "interaction_logger",
 ]
+
+
+def __getattr__(name: str):
+    """Create the shared ``interaction_logger`` only when it is first accessed."""
+    if name == "interaction_logger":
+        return get_interaction_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -18,16 +18,54 @@ class Config:
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
     CHUNKS_DATA_DIR = DATA_DIR / "chunks"
     LOGS_DIR = PROJECT_ROOT / "logs"
+    CACHE_DIR = PROJECT_ROOT / os.getenv("CACHE_DIR", "cache")
     VECTOR_STORE_PATH = PROJECT_ROOT / os.getenv("VECTOR_STORE_PATH", "chroma_db")
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
     LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # e.g. the local mock server
+    # Token-based input splitting needs the tiktoken vocabulary; off by default for custom endpoints
+    EMBEDDING_CHECK_CTX_LENGTH = os.getenv(
+        "EMBEDDING_CHECK_CTX_LENGTH", "false" if OPENAI_BASE_URL else "true"
+    ).lower() == "true"
+    
+    # HTTP Transport Configuration (one pooled transport shared by all OpenAI clients)
+    HTTP_VERIFY_SSL = os.getenv("HTTP_VERIFY_SSL", "false").lower() == "true"
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"  # Requires the 'h2' package
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120"))  # Seconds an idle connection is kept
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))  # Seconds
+    EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "30"))  # Seconds per embeddings request
+    CHAT_TIMEOUT = float(os.getenv("CHAT_TIMEOUT", "120"))  # Seconds per chat completion request
+    
+    # Upstream Resilience Configuration (retries, deadlines, hedging, circuit breaker)
+    UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))  # Retries after the first attempt
+    UPSTREAM_RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", "0.5"))  # Seconds
+    UPSTREAM_RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", "8"))  # Seconds
+    LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "60"))  # Deadline per chat attempt
+    EMBEDDING_ATTEMPT_TIMEOUT = float(os.getenv("EMBEDDING_ATTEMPT_TIMEOUT", "10"))  # Deadline per embedding attempt
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))  # Hedge after this latency percentile
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "2"))  # Seconds; floor for the hedge delay
+    CIRCUIT_BREAKER_FAILURES = int(os.getenv("CIRCUIT_BREAKER_FAILURES", "5"))  # Consecutive failures to open
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", "30"))  # Seconds open
+    UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "32"))  # Threads per upstream for deadline/hedged calls
     
     # Vector Store Configuration
-    VECTOR_STORE_TYPE = os.getenv("VECTOR_STORE_TYPE", "chromadb")
+    VECTOR_STORE_TYPE = os.getenv("VECTOR_STORE_TYPE", "chromadb")  # "chromadb" or "numpy"
     COLLECTION_NAME = "telecom_policies"
+    CHUNKS_WITH_EMBEDDINGS_FILE = CHUNKS_DATA_DIR / "chunks_with_embeddings.json"
+    EMBEDDING_STORE_DIR = CHUNKS_DATA_DIR / "embedding_store"  # Binary mmap store
+    EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float32")  # or "float16"
+    INGESTION_MANIFEST_FILE = CHUNKS_DATA_DIR / "manifest.json"  # File and chunk hashes of the last ingestion
+    INDEX_VERSION_FILE = "index_version.txt"  # Written into VECTOR_STORE_PATH on each build
+    VECTOR_STORE_BATCH_SIZE = int(os.getenv("VECTOR_STORE_BATCH_SIZE", "500"))  # Chunks per bulk insert
+    
+    # Batch Answering Configuration
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))  # In-flight questions
     
     # Chunking Configuration (as per project requirements)
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))  # 500 tokens
@@ -36,6 +74,28 @@ class Config:
     # Retrieval Configuration
     TOP_K = int(os.getenv("TOP_K", "5"))  # Number of chunks to retrieve
     
+    # Context Packing Configuration
+    CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))  # Token budget for retrieved context
+    CONTEXT_MERGE_ADJACENT = os.getenv("CONTEXT_MERGE_ADJACENT", "true").lower() == "true"
+    
+    # Query Embedding Cache Configuration
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))  # In-memory LRU entries
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))  # SQLite rows
+    EMBEDDING_CACHE_PATH = CACHE_DIR / "query_embeddings.sqlite"
+    
+    # Semantic Answer Cache Configuration (opt-in: questions that differ only in
+    # an entity, e.g. a country or plan name, can embed very close together)
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))  # Min cosine similarity
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+    SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))  # Seconds
+    
+    # Completion Cache Configuration (exact rendered-prompt matches, on disk)
+    COMPLETION_CACHE_ENABLED = os.getenv("COMPLETION_CACHE_ENABLED", "true").lower() == "true"
+    COMPLETION_CACHE_MAX_ENTRIES = int(os.getenv("COMPLETION_CACHE_MAX_ENTRIES", "10000"))
+    COMPLETION_CACHE_PATH = CACHE_DIR / "completions.sqlite"
+    
     # Document files
     DOCUMENT_FILES = [
         "billing_policy.txt",
@@ -48,6 +108,29 @@ class Config:
     # Logging Configuration
     LOG_FILE = LOGS_DIR / "interactions.log"
     LOG_LEVEL = "INFO"
+    LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"  # Write interactions.jsonl from a background thread
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "100"))  # Records per write
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))  # Seconds a record may wait
+    LOG_FSYNC = os.getenv("LOG_FSYNC", "interval")  # "always" (every batch), "interval" or "never"
+    LOG_FSYNC_INTERVAL = float(os.getenv("LOG_FSYNC_INTERVAL", "5"))  # Seconds between fsyncs
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Queued records before logging blocks
+    LOG_COMPACT = os.getenv("LOG_COMPACT", "false").lower() == "true"  # Log chunk ids instead of chunk text
+    LOG_ROTATE_BYTES = int(os.getenv("LOG_ROTATE_BYTES", str(50 * 1024 * 1024)))  # 0 = no size rotation
+    LOG_ROTATE_INTERVAL = float(os.getenv("LOG_ROTATE_INTERVAL", "86400"))  # Seconds per segment (0 = off)
+    LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true"  # gzip rotated segments
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))  # Rotated interactions.log files kept
+    LOG_ANALYTICS_CHUNK_SIZE = int(os.getenv("LOG_ANALYTICS_CHUNK_SIZE", "50000"))  # Records per DataFrame chunk
+    LOG_ANALYTICS_MAX_QUERIES = int(os.getenv("LOG_ANALYTICS_MAX_QUERIES", "10000"))  # Distinct queries tracked for top queries
+    
+    # Profiling Configuration (see src/utils/profiling.py)
+    PROFILE_MODE = os.getenv("RAG_PROFILE", "")  # "cpu" (cProfile), "mem" (tracemalloc) or "" (off)
+    PROFILES_DIR = LOGS_DIR / "profiles"
+    PROFILE_TOP_N = int(os.getenv("RAG_PROFILE_TOP_N", "25"))  # Allocation sites per memory report
+    
+    # Metrics Configuration (Prometheus text format)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Serve /metrics on this port (0 = off)
+    METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")  # Path for the textfile collector ("" = off)
+    METRICS_TEXTFILE_INTERVAL = float(os.getenv("METRICS_TEXTFILE_INTERVAL", "15"))  # Seconds between writes
     
     @classmethod
     def validate(cls):
@@ -58,6 +141,7 @@ class Config:
         cls.PROCESSED_DATA_DIR.mkdir(exist_ok=True)
         cls.CHUNKS_DATA_DIR.mkdir(exist_ok=True)
         cls.LOGS_DIR.mkdir(exist_ok=True)
+        cls.CACHE_DIR.mkdir(exist_ok=True)
         
         # Validate OpenAI API key
         if not cls.OPENAI_API_KEY:
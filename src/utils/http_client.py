@@ -0,0 +1,225 @@
+"""Process-wide pooled HTTP transport shared by all OpenAI clients."""
+
+import asyncio
+import atexit
+import importlib.util
+import logging
+import threading
+import weakref
+from typing import Dict, Tuple
+
+import httpx
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Endpoints with their own timeout settings
+ENDPOINTS = ("embeddings", "chat")
+
+_lock = threading.Lock()
+_transport: httpx.HTTPTransport = None
+_async_transport: "LoopBoundTransport" = None
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+class LoopBoundTransport(httpx.AsyncBaseTransport):
+    """Async transport that keeps one connection pool per event loop.
+
+    Pooled connections belong to the event loop that opened them, and
+    asyncio.run starts a new loop on every call, so reusing a connection
+    from a finished loop fails with "Event loop is closed". Each request is
+    sent through a pool owned by the running loop. A pool is closed when
+    its loop shuts down its async generators, which asyncio.run does before
+    closing the loop; pools of loops closed without that are dropped.
+    """
+
+    def __init__(self, **transport_kwargs):
+        """Initialize the transport.
+
+        Args:
+            **transport_kwargs: Arguments for each loop's httpx.AsyncHTTPTransport
+        """
+        self._transport_kwargs = transport_kwargs
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # Suspended generators whose cleanup closes each loop's pool
+        self._finalizers = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    async def _close_at_shutdown(self, loop: asyncio.AbstractEventLoop, pool: httpx.AsyncHTTPTransport):
+        """Suspend until the loop shuts down its async generators, then close the pool."""
+        try:
+            yield
+        finally:
+            with self._lock:
+                if self._pools.get(loop) is pool:
+                    del self._pools[loop]
+            await pool.aclose()
+
+    async def _pool(self) -> httpx.AsyncHTTPTransport:
+        """Return the pool of the running loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for closed_loop in [other for other in self._pools if other.is_closed()]:
+                del self._pools[closed_loop]
+            pool = self._pools.get(loop)
+            if pool is not None:
+                return pool
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+            finalizer = self._finalizers[loop] = self._close_at_shutdown(loop, pool)
+        await finalizer.asend(None)
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        pool = await self._pool()
+        return await pool.handle_async_request(request)
+
+    async def aclose(self):
+        """Close the pool of the running loop."""
+        with self._lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+    def close(self):
+        """Close the pools of idle open loops and drop all others."""
+        with self._lock:
+            pools = list(self._pools.items())
+            self._pools.clear()
+        for loop, pool in pools:
+            if loop.is_closed() or loop.is_running():
+                continue
+            try:
+                loop.run_until_complete(pool.aclose())
+            except Exception as e:
+                logger.debug(f"Could not close async connection pool: {e}")
+
+
+def _http2_enabled() -> bool:
+    """Return whether HTTP/2 is requested and the h2 package is available."""
+    if not Config.HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    """Connection pool limits from Config."""
+    return httpx.Limits(
+        max_connections=Config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def get_timeout(endpoint: str) -> httpx.Timeout:
+    """Build the timeout for an endpoint.
+
+    Args:
+        endpoint: 'embeddings' or 'chat'
+
+    The timeout is capped at the endpoint's attempt deadline, so a request
+    abandoned by ResilientCaller after its deadline stops within the same
+    time instead of running on in a background thread.
+
+    Returns:
+        httpx.Timeout with the endpoint's read/write/pool timeout and the
+        shared connect timeout
+    """
+    if endpoint not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint '{endpoint}'. Use one of {ENDPOINTS}.")
+    if endpoint == "embeddings":
+        seconds, attempt_timeout = Config.EMBEDDING_TIMEOUT, Config.EMBEDDING_ATTEMPT_TIMEOUT
+    else:
+        seconds, attempt_timeout = Config.CHAT_TIMEOUT, Config.LLM_ATTEMPT_TIMEOUT
+    if attempt_timeout:
+        seconds = min(seconds, attempt_timeout)
+    return httpx.Timeout(seconds, connect=Config.HTTP_CONNECT_TIMEOUT)
+
+
+def get_http_client(endpoint: str) -> httpx.Client:
+    """Return the shared sync client for an endpoint.
+
+    Clients for different endpoints differ only in their timeouts; they all
+    send requests through one pooled transport, so connections, TLS sessions
+    and keep-alive are shared across the process.
+
+    Args:
+        endpoint: 'embeddings' or 'chat'
+
+    Returns:
+        Long-lived httpx.Client (do not close it)
+    """
+    global _transport
+    with _lock:
+        if endpoint not in _clients:
+            if _transport is None:
+                _transport = httpx.HTTPTransport(
+                    verify=Config.HTTP_VERIFY_SSL,
+                    http2=_http2_enabled(),
+                    limits=_limits()
+                )
+            _clients[endpoint] = httpx.Client(
+                transport=_transport,
+                timeout=get_timeout(endpoint)
+            )
+        return _clients[endpoint]
+
+
+def get_async_http_client(endpoint: str) -> httpx.AsyncClient:
+    """Return the shared async client for an endpoint.
+
+    The client can be used from any event loop: its transport keeps a
+    separate connection pool per loop (see LoopBoundTransport).
+
+    Args:
+        endpoint: 'embeddings' or 'chat'
+
+    Returns:
+        Long-lived httpx.AsyncClient (do not close it)
+    """
+    global _async_transport
+    with _lock:
+        if endpoint not in _async_clients:
+            if _async_transport is None:
+                _async_transport = LoopBoundTransport(
+                    verify=Config.HTTP_VERIFY_SSL,
+                    http2=_http2_enabled(),
+                    limits=_limits()
+                )
+            _async_clients[endpoint] = httpx.AsyncClient(
+                transport=_async_transport,
+                timeout=get_timeout(endpoint)
+            )
+        return _async_clients[endpoint]
+
+
+def get_http_clients(endpoint: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Return the shared (sync, async) client pair for an endpoint."""
+    return get_http_client(endpoint), get_async_http_client(endpoint)
+
+
+def close_http_clients():
+    """Close the shared transports and forget all clients.
+
+    Connection pools of event loops that have already closed cannot be
+    awaited; their sockets are released when the pools are dropped.
+    """
+    global _transport, _async_transport
+    with _lock:
+        if _transport is not None:
+            _transport.close()
+        if _async_transport is not None:
+            _async_transport.close()
+        _transport = None
+        _async_transport = None
+        _clients.clear()
+        _async_clients.clear()
+
+
+atexit.register(close_http_clients)
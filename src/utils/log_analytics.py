@@ -0,0 +1,513 @@
+"""Streaming analytics over the interaction logs.
+
+Reads ``interactions.jsonl`` together with its rotated (and gzipped)
+segments line by line, turns every ``chunk_size`` records into a pandas
+DataFrame and folds it into running aggregates, so memory stays bounded
+however many interactions were logged. Query frequencies are kept for at
+most ``LOG_ANALYTICS_MAX_QUERIES`` distinct queries with the Space-Saving
+heavy-hitters algorithm. The flattened rows can also be
+exported to Parquet or Feather (requires ``pyarrow``) and summarized from
+there much faster than re-parsing JSON.
+
+Usage:
+    python -m src.utils.log_analytics                      # logs/interactions.jsonl and its segments
+    python -m src.utils.log_analytics logs/ --top 20
+    python -m src.utils.log_analytics --export logs/interactions.parquet
+    python -m src.utils.log_analytics logs/interactions.parquet
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import Config
+from src.utils.logger import log_segments
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_SUFFIXES = (".parquet", ".feather", ".arrow")
+
+# Columns of the flattened interaction rows, in export order
+COLUMNS = (
+    "timestamp", "query", "num_chunks", "sources", "top_distance",
+    "response_chars", "model", "cache", "latency_ms", "llm_ms",
+    "total_tokens", "cost_usd",
+)
+
+# Upper bounds (ms) of the latency buckets used for per-hour percentiles
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, float("inf"))
+
+
+def default_log_path() -> Path:
+    """The live JSON lines log written by the interaction logger."""
+    return Config.LOG_FILE.parent / "interactions.jsonl"
+
+
+def resolve_inputs(paths: Iterable[Path]) -> List[Path]:
+    """Expand log paths into the files to read, oldest first.
+
+    A JSON lines log expands to its rotated segments followed by the live
+    file; a directory stands for its interactions.jsonl. Columnar files and
+    individual segments are read as given.
+
+    Args:
+        paths: Log files or directories
+
+    Returns:
+        Existing files in reading order
+    """
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            path = path / "interactions.jsonl"
+        if path.suffix == ".jsonl":
+            files.extend(log_segments(path))
+        if path.exists():
+            files.append(path)
+        elif path.suffix != ".jsonl":
+            raise FileNotFoundError(f"Log file not found: {path}")
+    return files
+
+
+def iter_records(files: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    """Stream interaction records from plain or gzipped JSON lines files.
+
+    Blank and malformed lines (e.g. a partial last line of a log that is
+    still being written) are skipped.
+
+    Args:
+        files: JSON lines files, optionally gzipped
+
+    Yields:
+        Parsed interaction records
+    """
+    for path in files:
+        opener = gzip.open if path.suffix == ".gz" else open
+        skipped = 0
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    skipped += 1
+                    continue
+                if isinstance(record, dict) and record.get("type") != "error":
+                    yield record
+        if skipped:
+            logger.warning(f"Skipped {skipped} malformed lines in {path}")
+
+
+def flatten_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an interaction record to one flat analytics row.
+
+    Handles compact and full chunk records; records written before chunk
+    sources and distances were logged simply have none.
+
+    Args:
+        record: Parsed line from interactions.jsonl
+
+    Returns:
+        Row with the keys in COLUMNS
+    """
+    metadata = record.get("metadata") or {}
+    timings = metadata.get("timings") or {}
+    usage = metadata.get("usage") or {}
+    chunks = record.get("retrieved_chunks") or []
+
+    sources = []
+    distances = []
+    for chunk in chunks:
+        source = chunk.get("source") or (chunk.get("metadata") or {}).get("source")
+        if source:
+            sources.append(source)
+        distance = chunk.get("distance")
+        if isinstance(distance, (int, float)):
+            distances.append(distance)
+
+    cache = metadata.get("cache")
+    return {
+        "timestamp": record.get("timestamp"),
+        "query": record.get("query") or "",
+        "num_chunks": len(chunks),
+        "sources": sources,
+        "top_distance": min(distances) if distances else None,
+        "response_chars": len(record.get("generated_response") or ""),
+        "model": metadata.get("model"),
+        "cache": str(cache) if cache not in (None, False) else "none",
+        "latency_ms": timings.get("total"),
+        "llm_ms": timings.get("llm"),
+        "total_tokens": usage.get("total_tokens"),
+        "cost_usd": usage.get("cost_usd"),
+    }
+
+
+def _to_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build a typed DataFrame from flattened rows."""
+    frame = pd.DataFrame(rows, columns=list(COLUMNS))
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], errors="coerce", format="ISO8601")
+    for column in ("top_distance", "latency_ms", "llm_ms", "total_tokens", "cost_usd"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    frame["num_chunks"] = frame["num_chunks"].astype("int64")
+    frame["response_chars"] = frame["response_chars"].astype("int64")
+    return frame
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for columnar files."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Parquet/Feather support needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _iter_columnar_frames(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a Parquet or Feather export back as DataFrames."""
+    pa = _import_pyarrow()
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
+
+
+def iter_frames(paths: Iterable[Path] = None, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """Stream interaction logs as DataFrames of at most chunk_size rows.
+
+    Args:
+        paths: Log files or directories (default: the live log and its segments)
+        chunk_size: Rows per DataFrame (default Config.LOG_ANALYTICS_CHUNK_SIZE)
+
+    Yields:
+        DataFrames with the columns in COLUMNS
+    """
+    chunk_size = chunk_size or Config.LOG_ANALYTICS_CHUNK_SIZE
+    files = resolve_inputs(paths or [default_log_path()])
+
+    rows = []
+    for path in files:
+        if path.suffix in COLUMNAR_SUFFIXES:
+            yield from _iter_columnar_frames(path, chunk_size)
+            continue
+        for record in iter_records([path]):
+            rows.append(flatten_record(record))
+            if len(rows) >= chunk_size:
+                yield _to_frame(rows)
+                rows = []
+    if rows:
+        yield _to_frame(rows)
+
+
+class SpaceSavingCounter:
+    """Approximate counts of the most frequent items in bounded memory.
+
+    A batched Space-Saving summary: at most ``capacity`` items are tracked
+    after each update. When the least frequent ones are evicted, the
+    largest evicted count becomes the floor added to items seen for the
+    first time afterwards, so a tracked count never underestimates and
+    overestimates by at most ``error``. Any item whose true count exceeds
+    ``error`` is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.error = 0
+
+    def update(self, counts: Dict[str, int]):
+        """Add a batch of item counts and evict down to capacity.
+
+        Args:
+            counts: Occurrences of each item in the batch
+        """
+        for item, count in counts.items():
+            self.counts[item] = self.counts.get(item, self.error) + int(count)
+        if len(self.counts) > self.capacity:
+            ranked = sorted(self.counts.items(), key=lambda entry: entry[1], reverse=True)
+            self.error = max(self.error, ranked[self.capacity][1])
+            self.counts = dict(ranked[:self.capacity])
+
+    def most_common(self, n: int = None) -> List[tuple]:
+        """The n items with the highest counts as (item, count) pairs."""
+        return Counter(self.counts).most_common(n)
+
+
+class LogSummary:
+    """Running aggregates over DataFrames of interaction rows."""
+
+    def __init__(self, max_queries: int = None):
+        """Initialize empty aggregates.
+
+        Args:
+            max_queries: Distinct queries tracked for the top-queries list
+                        (default Config.LOG_ANALYTICS_MAX_QUERIES)
+        """
+        self.records = 0
+        self.empty_retrievals = 0
+        self.first: Optional[pd.Timestamp] = None
+        self.last: Optional[pd.Timestamp] = None
+        self.queries = SpaceSavingCounter(max_queries or Config.LOG_ANALYTICS_MAX_QUERIES)
+        self.sources = Counter()
+        self.cache = Counter()
+        self.tokens = 0.0
+        self.cost_usd = 0.0
+        # hour -> [requests, timed requests, latency sum, latency max, bucket counts]
+        self.hours: Dict[pd.Timestamp, list] = {}
+
+    def update(self, frame: pd.DataFrame):
+        """Fold one DataFrame of rows into the aggregates.
+
+        Args:
+            frame: Rows as produced by iter_frames
+        """
+        if frame.empty:
+            return
+        self.records += len(frame)
+        self.empty_retrievals += int((frame["num_chunks"] == 0).sum())
+        self.tokens += float(frame["total_tokens"].sum())
+        self.cost_usd += float(frame["cost_usd"].sum())
+
+        queries = frame["query"].fillna("").str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+        self.queries.update(queries[queries != ""].value_counts().to_dict())
+        self.sources.update(frame["sources"].explode().dropna().value_counts().to_dict())
+        self.cache.update(frame["cache"].fillna("none").value_counts().to_dict())
+
+        timestamps = frame["timestamp"].dropna()
+        if timestamps.empty:
+            return
+        first, last = timestamps.min(), timestamps.max()
+        self.first = first if self.first is None else min(self.first, first)
+        self.last = last if self.last is None else max(self.last, last)
+
+        hours = frame["timestamp"].dt.floor("h")
+        for hour, requests in hours.value_counts().items():
+            self._hour(hour)[0] += int(requests)
+
+        timed = pd.DataFrame({"hour": hours, "ms": frame["latency_ms"]}).dropna()
+        timed["bucket"] = np.searchsorted(LATENCY_BUCKETS_MS, timed["ms"].to_numpy(), side="left")
+        for hour, group in timed.groupby("hour"):
+            stats = self._hour(hour)
+            stats[1] += len(group)
+            stats[2] += float(group["ms"].sum())
+            stats[3] = max(stats[3], float(group["ms"].max()))
+            stats[4] += np.bincount(group["bucket"], minlength=len(LATENCY_BUCKETS_MS))
+
+    def _hour(self, hour: pd.Timestamp) -> list:
+        """Aggregates of one hour, created on first use."""
+        if hour not in self.hours:
+            self.hours[hour] = [0, 0, 0.0, 0.0, np.zeros(len(LATENCY_BUCKETS_MS), dtype=np.int64)]
+        return self.hours[hour]
+
+    @staticmethod
+    def _bucket_quantile(buckets: np.ndarray, q: float, maximum: float) -> float:
+        """Upper bound of the latency bucket containing the q-quantile."""
+        rank = q * buckets.sum()
+        index = int(np.searchsorted(np.cumsum(buckets), rank, side="left"))
+        return min(LATENCY_BUCKETS_MS[index], maximum)
+
+    def latency_by_hour(self) -> pd.DataFrame:
+        """Requests and latency per hour.
+
+        Percentiles are the upper bounds of LATENCY_BUCKETS_MS, so they are
+        approximate; mean and max are exact.
+
+        Returns:
+            DataFrame indexed by hour with requests, mean_ms, p50_ms, p95_ms and max_ms
+        """
+        rows = []
+        for hour in sorted(self.hours):
+            requests, timed, total_ms, max_ms, buckets = self.hours[hour]
+            rows.append({
+                "hour": hour,
+                "requests": requests,
+                "mean_ms": total_ms / timed if timed else np.nan,
+                "p50_ms": self._bucket_quantile(buckets, 0.50, max_ms) if timed else np.nan,
+                "p95_ms": self._bucket_quantile(buckets, 0.95, max_ms) if timed else np.nan,
+                "max_ms": max_ms if timed else np.nan,
+            })
+        return pd.DataFrame(rows, columns=["hour", "requests", "mean_ms", "p50_ms", "p95_ms", "max_ms"]).set_index("hour")
+
+    def report(self, top_n: int = 10) -> Dict[str, Any]:
+        """Summary of everything aggregated so far.
+
+        Args:
+            top_n: Number of top queries and sources to include
+
+        Returns:
+            Dictionary with record counts, time range, empty-retrieval rate,
+            top queries, the most a top query count may be overestimated
+            by (0 when exact), source hit distribution, cache outcomes,
+            token and cost totals and the latency_by_hour DataFrame
+        """
+        source_hits = sum(self.sources.values())
+        return {
+            "records": self.records,
+            "first": self.first,
+            "last": self.last,
+            "empty_retrievals": self.empty_retrievals,
+            "empty_retrieval_rate": self.empty_retrievals / self.records if self.records else 0.0,
+            "top_queries": self.queries.most_common(top_n),
+            "top_queries_error": self.queries.error,
+            "sources": [
+                (source, hits, hits / source_hits)
+                for source, hits in self.sources.most_common(top_n)
+            ],
+            "cache": dict(self.cache),
+            "total_tokens": int(self.tokens),
+            "cost_usd": self.cost_usd,
+            "latency_by_hour": self.latency_by_hour(),
+        }
+
+
+def summarize(paths: Iterable[Path] = None, chunk_size: int = None, max_queries: int = None) -> LogSummary:
+    """Aggregate interaction logs in bounded memory.
+
+    Args:
+        paths: Log files, directories or columnar exports (default: the live log and its segments)
+        chunk_size: Rows per DataFrame (default Config.LOG_ANALYTICS_CHUNK_SIZE)
+        max_queries: Distinct queries tracked (default Config.LOG_ANALYTICS_MAX_QUERIES)
+
+    Returns:
+        LogSummary over every record read
+    """
+    summary = LogSummary(max_queries)
+    for frame in iter_frames(paths, chunk_size):
+        summary.update(frame)
+    return summary
+
+
+def export_columnar(output: Path, paths: Iterable[Path] = None, chunk_size: int = None) -> int:
+    """Write the flattened rows to a Parquet (.parquet) or Feather (.feather/.arrow) file.
+
+    Rows are written one DataFrame chunk at a time, so the export also runs
+    in bounded memory.
+
+    Args:
+        output: Output file; its suffix selects the format
+        paths: Log files or directories (default: the live log and its segments)
+        chunk_size: Rows per DataFrame and per row group/record batch
+
+    Returns:
+        Number of rows written
+    """
+    output = Path(output)
+    if output.suffix not in COLUMNAR_SUFFIXES:
+        raise ValueError(f"Unsupported export format '{output.suffix}'. Use one of {COLUMNAR_SUFFIXES}.")
+    pa = _import_pyarrow()
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us")),
+        ("query", pa.string()),
+        ("num_chunks", pa.int64()),
+        ("sources", pa.list_(pa.string())),
+        ("top_distance", pa.float64()),
+        ("response_chars", pa.int64()),
+        ("model", pa.string()),
+        ("cache", pa.string()),
+        ("latency_ms", pa.float64()),
+        ("llm_ms", pa.float64()),
+        ("total_tokens", pa.float64()),
+        ("cost_usd", pa.float64()),
+    ])
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(f"{output.name}.tmp")
+    if output.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(tmp_output, schema)
+    else:
+        writer = pa.ipc.new_file(str(tmp_output), schema)
+
+    rows = 0
+    try:
+        for frame in iter_frames(paths, chunk_size):
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(frame)
+    finally:
+        writer.close()
+    tmp_output.replace(output)
+    logger.info(f"Exported {rows} interactions to {output}")
+    return rows
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a summary report as text for the terminal."""
+    lines = [f"Interactions: {report['records']}"]
+    if report["first"] is not None:
+        lines.append(f"Period: {report['first']} - {report['last']}")
+    lines.append(
+        f"Empty retrievals: {report['empty_retrievals']} "
+        f"({report['empty_retrieval_rate']:.1%})"
+    )
+    if report["total_tokens"]:
+        lines.append(f"Tokens: {report['total_tokens']} (${report['cost_usd']:.4f})")
+    if report["cache"]:
+        lines.append("Cache: " + ", ".join(f"{name}={count}" for name, count in sorted(report["cache"].items())))
+
+    lines.append("\nTop queries:")
+    if report["top_queries_error"]:
+        lines.append(f"  (approximate: counts may be up to {report['top_queries_error']} too high)")
+    for query, count in report["top_queries"]:
+        lines.append(f"  {count:>8}  {query[:100]}")
+
+    lines.append("\nSource hits:")
+    for source, hits, share in report["sources"]:
+        lines.append(f"  {hits:>8}  {share:6.1%}  {source}")
+
+    latency = report["latency_by_hour"]
+    lines.append("\nLatency by hour (ms):")
+    if latency.empty:
+        lines.append("  (no timestamped records)")
+    else:
+        lines.append(latency.to_string(float_format=lambda value: f"{value:.0f}"))
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Summarize interaction logs")
+    parser.add_argument("paths", type=Path, nargs="*",
+                        help="Logs, log directories or Parquet/Feather exports "
+                             "(default: logs/interactions.jsonl and its rotated segments)")
+    parser.add_argument("--top", type=int, default=10, help="Top queries and sources to show")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Records per DataFrame chunk")
+    parser.add_argument("--export", type=Path, default=None,
+                        help="Write the flattened rows to this .parquet or .feather file instead")
+    args = parser.parse_args()
+
+    if args.export:
+        try:
+            rows = export_columnar(args.export, args.paths, args.chunk_size)
+        except ImportError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+        print(f"✓ Exported {rows} interactions to {args.export}")
+        return 0
+
+    summary = summarize(args.paths, args.chunk_size)
+    print(format_report(summary.report(args.top)))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,32 +1,369 @@
 """Logging utilities for the RAG Customer Support system."""
 
+import atexit
+import gzip
 import logging
+import logging.handlers
 import json
+import os
+import queue
+import shutil
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Optional
 
 from src.utils.config import Config
+from src.utils.metrics import LOG_QUEUE_DEPTH, LOG_RECORDS, LOG_WRITE_LATENCY
+
+# fsync policies for the JSON lines file
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+def log_segments(path: Path) -> List[Path]:
+    """Rotated segments of a JSON lines log, oldest first.
+    
+    Args:
+        path: Live log file, e.g. logs/interactions.jsonl
+    
+    Returns:
+        Segment paths (plain or gzipped), excluding the live file itself
+    """
+    path = Path(path)
+    
+    def rotation_order(segment: Path):
+        # interactions-20240101-120000[-1].jsonl[.gz] -> (20240101, 120000[, 1])
+        stamp = segment.name[len(path.stem) + 1:].split(".", 1)[0]
+        return tuple(int(part) for part in stamp.split("-") if part.isdigit()), segment.name
+    
+    segments = [
+        segment for segment in path.parent.glob(f"{path.stem}-*{path.suffix}*")
+        if not segment.name.endswith(".tmp")
+    ]
+    return sorted(segments, key=rotation_order)
+
+
+class _FlushRequest:
+    """Queue marker asking the writer to write everything queued before it."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class JsonlWriter:
+    """Appends JSON records to a file from a background thread, in batches.
+    
+    Records are queued without being serialized; the writer thread turns
+    each one into a JSON line exactly once and writes a whole batch with a
+    single write call. The file is opened once and kept open.
+    
+    A batch is written when ``batch_size`` records are queued or
+    ``flush_interval`` seconds have passed since the first one. After each
+    batch the file is fsynced according to ``fsync``:
+    
+    - 'always': after every batch
+    - 'interval': at most once every ``fsync_interval`` seconds
+    - 'never': leave it to the operating system
+    
+    The file is rotated once it reaches ``rotate_bytes`` or when the current
+    ``rotate_interval`` period (e.g. the UTC day) ends. Closed segments are
+    renamed to ``<stem>-<YYYYmmdd-HHMMSS><suffix>`` and, with ``compress``,
+    gzipped.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = None,
+        flush_interval: float = None,
+        fsync: str = None,
+        fsync_interval: float = None,
+        max_queue_size: int = None,
+        background: bool = None,
+        rotate_bytes: int = None,
+        rotate_interval: float = None,
+        compress: bool = None
+    ):
+        """Initialize the writer and start its thread.
+        
+        Args:
+            path: JSON lines file to append to
+            batch_size: Records per write (default Config.LOG_BATCH_SIZE)
+            flush_interval: Longest a record waits before being written
+                            (default Config.LOG_FLUSH_INTERVAL)
+            fsync: 'always', 'interval' or 'never' (default Config.LOG_FSYNC)
+            fsync_interval: Seconds between fsyncs with the 'interval' policy
+                            (default Config.LOG_FSYNC_INTERVAL)
+            max_queue_size: Queued records before write() blocks
+                            (default Config.LOG_QUEUE_SIZE)
+            background: Write from a background thread; if False every
+                        record is written synchronously (default Config.LOG_ASYNC)
+            rotate_bytes: Rotate once the file reaches this size, 0 to disable
+                          (default Config.LOG_ROTATE_BYTES)
+            rotate_interval: Rotate when this many seconds' period ends, 0 to
+                             disable (default Config.LOG_ROTATE_INTERVAL)
+            compress: gzip rotated segments (default Config.LOG_COMPRESS)
+        """
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size or Config.LOG_BATCH_SIZE)
+        self.flush_interval = Config.LOG_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.fsync = (fsync or Config.LOG_FSYNC).lower()
+        self.fsync_interval = Config.LOG_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+        self.background = Config.LOG_ASYNC if background is None else background
+        self.rotate_bytes = Config.LOG_ROTATE_BYTES if rotate_bytes is None else rotate_bytes
+        self.rotate_interval = Config.LOG_ROTATE_INTERVAL if rotate_interval is None else rotate_interval
+        self.compress = Config.LOG_COMPRESS if compress is None else compress
+        
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown LOG_FSYNC '{self.fsync}'. Use one of {FSYNC_POLICIES}.")
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._open()
+        
+        # Segments left uncompressed by an interrupted rotation
+        if self.compress:
+            for segment in self.segments():
+                if segment.suffix != ".gz":
+                    self._compress(segment)
+        
+        self._queue: queue.Queue = queue.Queue(max_queue_size or Config.LOG_QUEUE_SIZE)
+        self._thread = None
+        if self.background:
+            self._thread = threading.Thread(
+                target=self._run, name="interaction-log-writer", daemon=True
+            )
+            self._thread.start()
+    
+    def write(self, record: Dict[str, Any]):
+        """Queue a record for writing (or write it now if not in background mode).
+        
+        Blocks only when the queue is full, i.e. the disk cannot keep up.
+        
+        Args:
+            record: JSON-serializable record
+        """
+        if self._closed:
+            raise ValueError(f"Writer for {self.path} is closed")
+        if not self.background:
+            self._write_batch([record])
+            return
+        self._queue.put(record)
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every record queued so far has been written.
+        
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+        
+        Returns:
+            True if the records were written within the timeout
+        """
+        if not self.background or self._closed:
+            return True
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+    
+    def close(self, timeout: float = 10.0):
+        """Write every queued record, fsync and close the file.
+        
+        Args:
+            timeout: Seconds to wait for the writer thread to drain the queue
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                if self._unsynced:
+                    self._sync_locked()
+                self._file.close()
+    
+    def _run(self):
+        """Writer thread: collect batches from the queue and write them."""
+        while True:
+            try:
+                # Wake up while idle to fsync the last batch on the interval policy
+                item = self._queue.get(timeout=self.fsync_interval if self._unsynced else None)
+            except queue.Empty:
+                self._sync()
+                continue
+            batch = []
+            flushes = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _FlushRequest):
+                    flushes.append(item)
+                else:
+                    batch.append(item)
+                if stop or flushes or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if stop:
+                # Drain whatever was queued concurrently with close()
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _FlushRequest):
+                        flushes.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+            
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logging.getLogger(__name__).error(
+                        f"Failed to write {len(batch)} interaction records to {self.path}: {e}"
+                    )
+            LOG_QUEUE_DEPTH.set(self._queue.qsize())
+            for request in flushes:
+                request.done.set()
+            if stop:
+                return
+    
+    def segments(self) -> List[Path]:
+        """Rotated segments of this log, oldest first (excluding the live file)."""
+        return log_segments(self.path)
+    
+    def _open(self):
+        """Open the live file and note the rotation period it belongs to."""
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        started = time.time()
+        if self._file.tell() > 0:
+            started = min(started, os.stat(self.path).st_mtime)
+        self._period = self._period_of(started)
+    
+    def _period_of(self, timestamp: float) -> Optional[int]:
+        """Index of the rotate_interval period containing a timestamp."""
+        if not self.rotate_interval:
+            return None
+        return int(timestamp // self.rotate_interval)
+    
+    def _should_rotate(self, incoming: int) -> bool:
+        """Whether the live file must be rotated before appending incoming bytes."""
+        size = self._file.tell()
+        if size == 0:
+            return False
+        if self.rotate_bytes and size + incoming > self.rotate_bytes:
+            return True
+        return self._period is not None and self._period_of(time.time()) != self._period
+    
+    def _rotate_locked(self):
+        """Close the live file, move it aside as a segment and start a new one."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        segment = self.path.with_name(f"{self.path.stem}-{stamp}{self.path.suffix}")
+        counter = 1
+        while segment.exists() or Path(f"{segment}.gz").exists():
+            segment = self.path.with_name(f"{self.path.stem}-{stamp}-{counter}{self.path.suffix}")
+            counter += 1
+        os.replace(self.path, segment)
+        self._open()
+        
+        if self.compress:
+            self._compress(segment)
+    
+    @staticmethod
+    def _compress(segment: Path):
+        """gzip a closed segment, replacing it only once the archive is complete."""
+        target = Path(f"{segment}.gz")
+        tmp_target = Path(f"{target}.tmp")
+        try:
+            with open(segment, 'rb') as src, gzip.open(tmp_target, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_target, target)
+            segment.unlink()
+        except OSError as e:
+            logging.getLogger(__name__).error(f"Failed to compress {segment}: {e}")
+    
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        """Serialize records and append them with one write."""
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock:
+            if self._should_rotate(len(data)):
+                self._rotate_locked()
+            self._file.write(data)
+            self._file.flush()
+            self._unsynced = self.fsync != "never"
+            if self.fsync == "always" or (
+                self.fsync == "interval"
+                and time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._sync_locked()
+    
+    def _sync(self):
+        """fsync the file if written data has not been synced yet."""
+        with self._lock:
+            if self._unsynced and not self._file.closed:
+                self._sync_locked()
+    
+    def _sync_locked(self):
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
 
 
 class InteractionLogger:
     """Logger for user interactions with the RAG system."""
     
-    def __init__(self, log_file: Path = None):
+    def __init__(self, log_file: Path = None, writer: JsonlWriter = None, compact: bool = None):
         """Initialize the interaction logger.
         
         Args:
             log_file: Path to the log file. Defaults to Config.LOG_FILE.
+            writer: Writer for interactions.jsonl (created next to log_file if None)
+            compact: Log chunk references instead of chunk text
+                     (default Config.LOG_COMPACT); see rehydrate_interaction
         """
         self.log_file = log_file or Config.LOG_FILE
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.compact = Config.LOG_COMPACT if compact is None else compact
+        
+        # Full records go to the JSON lines file through a background writer
+        self.json_log_file = self.log_file.parent / "interactions.jsonl"
+        self.writer = writer or JsonlWriter(self.json_log_file)
         
         # Set up logging
         self.logger = logging.getLogger("RAGInteractionLogger")
         self.logger.setLevel(getattr(logging, Config.LOG_LEVEL))
         
-        # File handler for JSON logs
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        # File handler for the summary log, rotated by size
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.log_file,
+            maxBytes=Config.LOG_ROTATE_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding='utf-8'
+        )
         file_handler.setLevel(logging.INFO)
         
         # Console handler
@@ -41,9 +378,11 @@ class InteractionLogger:
         console_handler.setFormatter(formatter)
         
         # Add handlers if not already added
+        self._handlers = []
         if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            self._handlers = [file_handler, console_handler]
+            for handler in self._handlers:
+                self.logger.addHandler(handler)
     
     def log_interaction(
         self,
@@ -54,34 +393,51 @@ class InteractionLogger:
     ):
         """Log a complete user interaction.
         
+        The full record is queued for the background writer, which serializes
+        it once; only a one-line summary goes through ``logging``. In compact
+        mode each chunk is logged as its id, source, chunk_id and distance;
+        rehydrate_interaction restores the text from the chunk store.
+        
         Args:
             query: The user's query
             retrieved_chunks: List of retrieved document chunks with metadata
             generated_response: The generated response from the LLM
             metadata: Additional metadata about the interaction
         """
+        start_time = time.perf_counter()
         interaction_data = {
             "timestamp": datetime.now().isoformat(),
             "query": query,
-            "retrieved_chunks": [
-                {
-                    "content": chunk.get("content", ""),
-                    "source": chunk.get("source", ""),
-                    "score": chunk.get("score", 0.0)
-                }
-                for chunk in retrieved_chunks
-            ],
+            "retrieved_chunks": [self._chunk_record(chunk) for chunk in retrieved_chunks],
             "generated_response": generated_response,
             "metadata": metadata or {}
         }
         
-        # Log as JSON
-        self.logger.info(json.dumps(interaction_data, ensure_ascii=False))
+        self.writer.write(interaction_data)
+        
+        self.logger.info(
+            f"Interaction: query={query[:80]!r} chunks={len(retrieved_chunks)} "
+            f"response_chars={len(generated_response)}"
+        )
         
-        # Also append to a JSON lines file for easy parsing
-        json_log_file = self.log_file.parent / "interactions.jsonl"
-        with open(json_log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(interaction_data, ensure_ascii=False) + '\n')
+        LOG_RECORDS.inc(kind="interaction")
+        LOG_WRITE_LATENCY.observe(time.perf_counter() - start_time)
+    
+    def _chunk_record(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Reference (and, unless compact, the text) of one retrieved chunk."""
+        # Imported here: src.embeddings imports src.utils on package import
+        from src.embeddings.embedding_store import make_chunk_id
+        
+        metadata = chunk.get("metadata") or {}
+        record = {
+            "id": make_chunk_id(metadata, chunk.get("content")),
+            "source": metadata.get("source", ""),
+            "chunk_id": metadata.get("chunk_id"),
+            "distance": chunk.get("distance")
+        }
+        if not self.compact:
+            record["content"] = chunk.get("content", "")
+        return record
     
     def log_error(self, error_message: str, query: str = None):
         """Log an error during interaction.
@@ -97,7 +453,126 @@ class InteractionLogger:
             "error": error_message
         }
         self.logger.error(json.dumps(error_data, ensure_ascii=False))
+        LOG_RECORDS.inc(kind="error")
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every interaction logged so far is written to disk.
+        
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+        
+        Returns:
+            True if everything was written within the timeout
+        """
+        return self.writer.flush(timeout)
+    
+    def close(self):
+        """Drain the background writer and close the log files."""
+        self.writer.close()
+        for handler in self._handlers:
+            self.logger.removeHandler(handler)
+            handler.close()
+        self._handlers = []
+
+
+def load_chunk_contents() -> Dict[str, str]:
+    """Map chunk ids to chunk text from the current chunk store.
+    
+    Reads the binary embedding store if present, otherwise the processed
+    chunks JSON written by the data preparation pipeline.
+    
+    Returns:
+        Dictionary of chunk id (see make_chunk_id) to content
+    """
+    from src.embeddings.embedding_store import EmbeddingStore, make_chunk_id
+    
+    if EmbeddingStore.exists():
+        chunks = EmbeddingStore().get_chunks()
+    else:
+        chunks_file = Config.CHUNKS_DATA_DIR / "processed_chunks.json"
+        if not chunks_file.exists():
+            chunks_file = Config.CHUNKS_WITH_EMBEDDINGS_FILE
+        with open(chunks_file, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+    return {make_chunk_id(chunk['metadata'], chunk['content']): chunk['content'] for chunk in chunks}
+
+
+def rehydrate_interaction(
+    record: Dict[str, Any],
+    contents: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Restore the chunk text of a compact interaction record.
+    
+    Args:
+        record: Parsed line from interactions.jsonl
+        contents: Chunk id to text map (default load_chunk_contents(); pass
+                  it in when rehydrating many records)
+    
+    Returns:
+        Copy of the record whose chunks all have 'content' (None for chunks
+        no longer in the store; ids include the content hash, so a chunk
+        whose text changed since it was logged is not found either)
+    """
+    from src.embeddings.embedding_store import make_chunk_id
+    
+    if contents is None:
+        contents = load_chunk_contents()
+    chunks = []
+    for chunk in record.get("retrieved_chunks", []):
+        chunk = dict(chunk)
+        if "content" not in chunk:
+            chunk_id = chunk.get("id") or make_chunk_id(chunk)
+            chunk["content"] = contents.get(chunk_id)
+        chunks.append(chunk)
+    return {**record, "retrieved_chunks": chunks}
+
+
+def rehydrate_interactions(
+    records: Iterable[Dict[str, Any]],
+    contents: Optional[Dict[str, str]] = None
+) -> Iterable[Dict[str, Any]]:
+    """Lazily rehydrate many records, loading the chunk store once."""
+    if contents is None:
+        contents = load_chunk_contents()
+    for record in records:
+        yield rehydrate_interaction(record, contents)
+
+
+_interaction_logger: Optional[InteractionLogger] = None
+_interaction_logger_lock = threading.Lock()
+
+
+def get_interaction_logger() -> InteractionLogger:
+    """Return the shared interaction logger, creating it on first use.
+
+    Creating the logger opens the log files and starts the background
+    writer, so it happens when the first interaction is logged rather
+    than when this module is imported.
+
+    Returns:
+        The process-wide InteractionLogger
+    """
+    global _interaction_logger
+    with _interaction_logger_lock:
+        if _interaction_logger is None:
+            _interaction_logger = InteractionLogger()
+            # Write out queued interactions when the interpreter exits
+            atexit.register(_interaction_logger.close)
+        return _interaction_logger
+
+
+def reset_interaction_logger():
+    """Close the shared interaction logger so the next use creates a new one."""
+    global _interaction_logger
+    with _interaction_logger_lock:
+        if _interaction_logger is not None:
+            atexit.unregister(_interaction_logger.close)
+            _interaction_logger.close()
+        _interaction_logger = None
 
 
-# Create a global logger instance
-interaction_logger = InteractionLogger()
+def __getattr__(name: str):
+    """Create the shared ``interaction_logger`` only when it is first accessed."""
+    if name == "interaction_logger":
+        return get_interaction_logger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,428 @@
+"""In-process metrics registry with a Prometheus text-format exporter.
+
+Counters, gauges and histograms are updated by the generator, retriever and
+interaction logger. They can be scraped over HTTP (``METRICS_PORT``) or
+written periodically to a file for the node_exporter textfile collector
+(``METRICS_TEXTFILE``).
+"""
+
+import atexit
+import logging
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow completions
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Squared L2 distance between unit vectors lies in [0, 4]
+DISTANCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.25, 1.5, 2.0, 4.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 10, 15, 20)
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a label set, e.g. '{stage="llm"}'."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base class for a named metric family with fixed label names."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Label values in labelnames order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Return (sample name, rendered labels, value) tuples."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Render the family in Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+        for sample_name, labels, value in self.samples():
+            lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Increase the counter for a label set."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            (self.name, _format_labels(self.labelnames, key), value)
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. requests in flight."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str):
+        """Set the gauge for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Increase the gauge for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        """Decrease the gauge for a label set."""
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            (self.name, _format_labels(self.labelnames, key), value)
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Record one observation for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        """Number of observations for a label set."""
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total, count))
+                for key, (counts, total, count) in self._values.items()
+            )
+        samples = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append((
+                    f"{self.name}_bucket",
+                    _format_labels(names, key + (_format_value(bound),)),
+                    cumulative
+                ))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, *args, **kwargs) -> _Metric:
+        """Return the family called name, creating it on first use."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Return a registered family by name."""
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every family in Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+    def write_textfile(self, path: Path):
+        """Atomically write the current metrics to a file.
+
+        The file is replaced in one rename so the textfile collector never
+        reads a partial write.
+
+        Args:
+            path: Destination file (conventionally ending in .prom)
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry and the metrics the application updates
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "rag_requests_total", "Answered questions by API and cache outcome", ("mode", "cache")
+)
+REQUEST_ERRORS = registry.counter(
+    "rag_request_errors_total", "Questions that failed, by exception type", ("mode", "error")
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "rag_requests_in_flight", "Questions currently being answered"
+)
+STAGE_LATENCY = registry.histogram(
+    "rag_stage_duration_seconds", "Time spent in each stage of answering a question", ("stage",)
+)
+CACHE_LOOKUPS = registry.counter(
+    "rag_cache_lookups_total", "Semantic and completion cache lookups", ("cache", "result")
+)
+TOKENS = registry.counter(
+    "rag_tokens_total", "Prompt, completion and embedding tokens by model", ("model", "type")
+)
+TOKEN_COST = registry.counter(
+    "rag_token_cost_usd_total", "Estimated spend on tokens in USD by model", ("model",)
+)
+RETRIEVAL_DISTANCE = registry.histogram(
+    "rag_retrieval_distance", "Distance of each retrieved chunk to its query",
+    buckets=DISTANCE_BUCKETS
+)
+RETRIEVED_CHUNKS = registry.histogram(
+    "rag_retrieved_chunks", "Chunks returned per retrieval", buckets=COUNT_BUCKETS
+)
+LOG_RECORDS = registry.counter(
+    "rag_log_records_total", "Records written by the interaction logger", ("kind",)
+)
+LOG_WRITE_LATENCY = registry.histogram(
+    "rag_log_write_duration_seconds", "Time log_interaction adds to a request"
+)
+LOG_QUEUE_DEPTH = registry.gauge(
+    "rag_log_queue_depth", "Interaction records waiting for the background writer"
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry on /metrics."""
+
+    registry: MetricsRegistry = registry
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics %s - %s", self.address_string(), format % args)
+
+
+def start_metrics_server(
+    port: int = None,
+    host: str = "0.0.0.0",
+    metrics_registry: MetricsRegistry = None
+) -> ThreadingHTTPServer:
+    """Serve metrics over HTTP from a daemon thread.
+
+    Args:
+        port: Port to listen on (default Config.METRICS_PORT; 0 picks a free port)
+        host: Interface to bind
+        metrics_registry: Registry to expose (default: the process-wide registry)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {
+        "registry": metrics_registry or registry
+    })
+    server = ThreadingHTTPServer((host, Config.METRICS_PORT if port is None else port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_textfile_exporter(
+    path: Path = None,
+    interval: float = None,
+    metrics_registry: MetricsRegistry = None
+) -> threading.Event:
+    """Rewrite a metrics file periodically from a daemon thread.
+
+    The file is also written once more when the process exits.
+
+    Args:
+        path: Destination file (default Config.METRICS_TEXTFILE)
+        interval: Seconds between writes (default Config.METRICS_TEXTFILE_INTERVAL)
+        metrics_registry: Registry to export (default: the process-wide registry)
+
+    Returns:
+        Event that stops the exporter when set
+    """
+    path = Path(path or Config.METRICS_TEXTFILE)
+    interval = interval or Config.METRICS_TEXTFILE_INTERVAL
+    metrics_registry = metrics_registry or registry
+    stop = threading.Event()
+
+    def write():
+        try:
+            metrics_registry.write_textfile(path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+    def loop():
+        while not stop.wait(interval):
+            write()
+
+    threading.Thread(target=loop, name="metrics-textfile", daemon=True).start()
+    atexit.register(write)
+    logger.info(f"Writing metrics to {path} every {interval:g}s")
+    return stop
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_configured_exporters():
+    """Start the exporters enabled in Config, at most once per process.
+
+    Called when an AnswerGenerator is created, so any entry point that
+    answers questions exposes metrics when METRICS_PORT or
+    METRICS_TEXTFILE is set.
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if Config.METRICS_PORT:
+        try:
+            start_metrics_server()
+        except OSError as e:
+            # e.g. Streamlit re-running in a new process while the port is taken
+            logger.warning(f"Could not start metrics server on port {Config.METRICS_PORT}: {e}")
+    if Config.METRICS_TEXTFILE:
+        start_textfile_exporter()
+
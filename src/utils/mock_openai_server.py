@@ -0,0 +1,409 @@
+"""Local OpenAI-compatible stand-in server for offline testing and benchmarking.
+
+Serves the embeddings and chat-completions endpoints (including SSE
+streaming) with deterministic hash-based embeddings, template answers built
+from the retrieved context, and configurable latency and error rates.
+
+Usage:
+    python -m src.utils.mock_openai_server --port 8100 --latency-ms 300 --error-rate 0.02
+
+Then point the application at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock
+"""
+
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSIONS = 1536  # text-embedding-3-small
+DEFAULT_ANSWER_TEMPLATE = "Based on our policy documents: {excerpt}"
+
+_WORD_RE = re.compile(r"\w+")
+_DOCUMENT_RE = re.compile(r"\[Document \d+ - (?P<source>[^\]]+)\]\n(?P<content>.*?)(?:\n\n\[Document|\n\nCUSTOMER QUESTION:|\Z)", re.S)
+_QUESTION_RE = re.compile(r"CUSTOMER QUESTION:\n(?P<question>.*?)\n\nANSWER:", re.S)
+
+
+def hash_embedding(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> List[float]:
+    """Deterministic bag-of-words embedding.
+
+    Each lowercased word is hashed to a signed dimension, so texts sharing
+    words have a high cosine similarity and retrieval behaves sensibly.
+
+    Args:
+        text: Input text
+        dimensions: Vector length
+
+    Returns:
+        Unit-length vector
+    """
+    vector = [0.0] * dimensions
+    for word in _WORD_RE.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % dimensions] += 1.0 if (value >> 63) & 1 else -1.0
+
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        vector[0] = 1.0
+        return vector
+    return [x / norm for x in vector]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (4 characters per token) for usage reporting."""
+    return max(1, len(text) // 4)
+
+
+class MockSettings:
+    """Behaviour of the stand-in server."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_sigma: float = 0.0,
+        token_delay_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        dimensions: int = DEFAULT_DIMENSIONS,
+        answer_template: str = DEFAULT_ANSWER_TEMPLATE,
+        responses: Optional[List[str]] = None,
+        seed: Optional[int] = None
+    ):
+        """Initialize the settings.
+
+        Args:
+            latency_ms: Median delay before a response (or the first streamed token)
+            latency_sigma: Log-normal spread of the delay; 0 for a fixed delay
+            token_delay_ms: Delay between streamed tokens
+            error_rate: Probability of a 500 response
+            rate_limit_rate: Probability of a 429 response
+            dimensions: Default embedding dimensions
+            answer_template: Chat answer template with {question}, {excerpt}
+                            and {source} placeholders
+            responses: Canned chat answers returned in rotation instead of
+                      the template
+            seed: Random seed for reproducible latency and errors
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.token_delay_ms = token_delay_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.dimensions = dimensions
+        self.answer_template = answer_template
+        self.responses = itertools.cycle(responses) if responses else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before responding."""
+        if self.latency_ms <= 0:
+            return 0.0
+        with self._lock:
+            factor = self._random.lognormvariate(0, self.latency_sigma) if self.latency_sigma else 1.0
+        return self.latency_ms * factor / 1000
+
+    def sample_error(self) -> Optional[int]:
+        """HTTP status of an injected failure, or None."""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def answer_for(self, messages: List[Dict[str, Any]]) -> str:
+        """Build the chat answer for a conversation."""
+        if self.responses is not None:
+            with self._lock:
+                return next(self.responses)
+
+        prompt = ""
+        for message in messages:
+            if message.get("role") == "user":
+                content = message.get("content")
+                prompt = content if isinstance(content, str) else json.dumps(content)
+
+        question_match = _QUESTION_RE.search(prompt)
+        question = question_match.group("question").strip() if question_match else prompt.strip()
+        document_match = _DOCUMENT_RE.search(prompt)
+        if document_match:
+            sentences = re.split(r"(?<=[.!?])\s+", document_match.group("content").strip())
+            excerpt = " ".join(sentences[:2])
+            source = document_match.group("source")
+        else:
+            excerpt = "I don't have that information in the provided context."
+            source = "Unknown"
+
+        return self.answer_template.format(question=question, excerpt=excerpt, source=source)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the OpenAI wire format."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    disable_nagle_algorithm = True  # Avoid 40ms delayed-ACK stalls on small writes
+    server_version = "MockOpenAI/1.0"
+
+    @property
+    def settings(self) -> MockSettings:
+        return self.server.settings
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, error_type: str):
+        headers = {"Retry-After": "0"} if status == 429 else None
+        self._send_json(status, {
+            "error": {"message": message, "type": error_type, "param": None, "code": None}
+        }, headers)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/health", "/v1/health"):
+            self._send_json(200, {"status": "ok"})
+        elif self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [
+                {"id": "mock-embedding", "object": "model", "owned_by": "mock"},
+                {"id": "mock-chat", "object": "model", "owned_by": "mock"}
+            ]})
+        else:
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        try:
+            request = self._read_json()
+        except ValueError:
+            self._send_error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+
+        path = self.path.rstrip("/")
+        if path not in ("/v1/embeddings", "/v1/chat/completions"):
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+            return
+
+        status = self.settings.sample_error()
+        delay = self.settings.sample_latency()
+        if status is not None:
+            time.sleep(delay)
+            if status == 429:
+                self._send_error(429, "Rate limit reached (injected)", "rate_limit_error")
+            else:
+                self._send_error(500, "Internal server error (injected)", "server_error")
+            return
+
+        if path == "/v1/embeddings":
+            time.sleep(delay)
+            self._handle_embeddings(request)
+        elif request.get("stream"):
+            self._handle_chat_stream(request, delay)
+        else:
+            time.sleep(delay)
+            self._handle_chat(request)
+
+    def _handle_embeddings(self, request: Dict[str, Any]):
+        inputs = request.get("input", [])
+        # Accept a string, a list of strings, or token id arrays
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        texts = [text if isinstance(text, str) else " ".join(map(str, text)) for text in inputs]
+        dimensions = request.get("dimensions") or self.settings.dimensions
+
+        data = []
+        for index, text in enumerate(texts):
+            vector = hash_embedding(text, dimensions)
+            if request.get("encoding_format") == "base64":
+                vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+
+        tokens = sum(estimate_tokens(text) for text in texts)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "mock-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+    def _usage(self, request: Dict[str, Any], answer: str) -> Dict[str, int]:
+        prompt_tokens = sum(
+            estimate_tokens(str(message.get("content", ""))) for message in request.get("messages", [])
+        )
+        completion_tokens = estimate_tokens(answer)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    def _handle_chat(self, request: Dict[str, Any]):
+        answer = self.settings.answer_for(request.get("messages", []))
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop"
+            }],
+            "usage": self._usage(request, answer)
+        })
+
+    def _write_chunk(self, payload):
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        event = f"data: {data}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+        self.wfile.flush()
+
+    def _handle_chat_stream(self, request: Dict[str, Any], delay: float):
+        answer = self.settings.answer_for(request.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = request.get("model", "mock-chat")
+
+        def chunk(delta, finish_reason=None):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        time.sleep(delay)
+        self._write_chunk(chunk({"role": "assistant", "content": ""}))
+        for token in re.findall(r"\S+\s*", answer):
+            self._write_chunk(chunk({"content": token}))
+            if self.settings.token_delay_ms:
+                time.sleep(self.settings.token_delay_ms / 1000)
+        self._write_chunk(chunk({}, "stop"))
+
+        if (request.get("stream_options") or {}).get("include_usage"):
+            final = chunk({})
+            final["choices"] = []
+            final["usage"] = self._usage(request, answer)
+            self._write_chunk(final)
+
+        self._write_chunk("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying MockSettings for its handlers."""
+
+    daemon_threads = True
+
+    def __init__(self, address, settings: MockSettings):
+        super().__init__(address, MockOpenAIHandler)
+        self.settings = settings
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to use as OPENAI_BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **settings) -> MockOpenAIServer:
+    """Start the server in a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        **settings: MockSettings arguments
+
+    Returns:
+        Running server; call ``shutdown()`` and ``server_close()`` to stop it
+    """
+    server = MockOpenAIServer((host, port), MockSettings(**settings))
+    thread = threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True)
+    thread.start()
+    logger.info(f"Mock OpenAI server listening on {server.base_url}")
+    return server
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Median response delay (time to first token when streaming)")
+    parser.add_argument("--latency-sigma", type=float, default=0.0,
+                        help="Log-normal spread of the delay (0 = fixed)")
+    parser.add_argument("--token-delay-ms", type=float, default=0.0,
+                        help="Delay between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of HTTP 429")
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS)
+    parser.add_argument("--answer-template", default=DEFAULT_ANSWER_TEMPLATE,
+                        help="Answer template with {question}, {excerpt} and {source}")
+    parser.add_argument("--responses-file", default=None,
+                        help="JSON list of canned answers returned in rotation")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses_file:
+        with open(args.responses_file, 'r', encoding='utf-8') as f:
+            responses = json.load(f)
+
+    server = MockOpenAIServer((args.host, args.port), MockSettings(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        dimensions=args.dimensions,
+        answer_template=args.answer_template,
+        responses=responses,
+        seed=args.seed
+    ))
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,200 @@
+"""Opt-in CPU and memory profiling of answer generation and ingestion.
+
+Set ``RAG_PROFILE=cpu`` to record each profiled call with cProfile, or
+``RAG_PROFILE=mem`` to record its allocations with tracemalloc. Profiles are
+written to ``logs/profiles/`` (``Config.PROFILES_DIR``), named after the
+stage and, for answers, the query:
+
+    RAG_PROFILE=cpu streamlit run src/ui/streamlit_app.py
+    python -m pstats logs/profiles/generate_answer-20240101-120000-123456-how-do-i-pay.prof
+
+cProfile only sees the thread that started it. When an attempt deadline
+(``LLM_ATTEMPT_TIMEOUT``, ``EMBEDDING_ATTEMPT_TIMEOUT``) or hedging is on,
+ResilientCaller runs the LLM and embedding calls in worker threads, so a CPU
+profile of an answer covers retrieval, prompt building and parsing, and
+shows those calls only as the time spent waiting on their futures. Their
+own cost is measured by the ``llm`` and ``embed_query`` timing spans.
+tracemalloc is process-wide and does include allocations made in workers.
+"""
+
+import cProfile
+import functools
+import inspect
+import logging
+import re
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "mem")
+
+# Frames kept per allocation; more frames give better tracebacks but cost memory
+TRACEMALLOC_FRAMES = 10
+
+_state = threading.local()
+_mem_lock = threading.Lock()
+_mem_users = 0
+
+
+def profile_mode() -> Optional[str]:
+    """Return the active profiling mode ('cpu' or 'mem'), or None if profiling is off."""
+    mode = (Config.PROFILE_MODE or "").strip().lower()
+    if not mode or mode in ("0", "off", "false", "none"):
+        return None
+    if mode not in PROFILE_MODES:
+        logger.warning(f"Ignoring unknown RAG_PROFILE '{mode}'. Use one of {PROFILE_MODES}.")
+        return None
+    return mode
+
+
+def profile_path(stage: str, label: str = None, suffix: str = ".prof") -> Path:
+    """Build a unique output path for a profile.
+
+    Args:
+        stage: Profiled stage, e.g. 'generate_answer'
+        label: Optional label such as the query; reduced to a short slug
+        suffix: File extension
+
+    Returns:
+        Path inside Config.PROFILES_DIR
+    """
+    name = f"{stage}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    if label:
+        slug = re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-")[:40].rstrip("-")
+        if slug:
+            name = f"{name}-{slug}"
+    return Path(Config.PROFILES_DIR) / f"{name}{suffix}"
+
+
+@contextmanager
+def _cpu_profile(stage: str, label: Optional[str]) -> Iterator[None]:
+    """cProfile the enclosed block and dump the stats to a .prof file.
+
+    Only the calling thread is profiled; work handed to worker threads
+    appears as time spent waiting for it.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Python 3.12+ allows one active profiler per process
+        logger.warning(f"Not profiling {stage}: {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = profile_path(stage, label, ".prof")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        logger.info(f"Wrote CPU profile of {stage} to {path}")
+
+
+@contextmanager
+def _mem_profile(stage: str, label: Optional[str]) -> Iterator[None]:
+    """Trace allocations in the enclosed block and write the top allocation sites.
+
+    tracemalloc is process-wide: with concurrent requests the report also
+    includes memory allocated by the other requests in flight.
+    """
+    global _mem_users
+    with _mem_lock:
+        if _mem_users == 0:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        _mem_users += 1
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    try:
+        yield
+    finally:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with _mem_lock:
+            _mem_users -= 1
+            if _mem_users == 0:
+                tracemalloc.stop()
+
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        top = stats[:Config.PROFILE_TOP_N]
+
+        lines = [
+            f"Stage: {stage}",
+            f"Label: {label or ''}",
+            f"Peak traced memory: {peak / 1024:.1f} KiB",
+            f"Traced memory at end: {current / 1024:.1f} KiB",
+            "",
+            f"Top {len(top)} allocation sites by growth:",
+        ]
+        lines.extend(str(stat) for stat in top)
+
+        path = profile_path(stage, label, ".txt")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        logger.info(f"Wrote memory profile of {stage} to {path}")
+
+
+@contextmanager
+def profile(stage: str, label: str = None) -> Iterator[None]:
+    """Profile the enclosed block if RAG_PROFILE is set.
+
+    Nested profiled blocks in the same thread are folded into the outermost
+    one, so a profiled stage called from another one yields a single profile.
+
+    Args:
+        stage: Profiled stage, used in the file name
+        label: Optional label such as the query
+    """
+    mode = profile_mode()
+    if mode is None or getattr(_state, "active", False):
+        yield
+        return
+
+    profiler = _cpu_profile if mode == "cpu" else _mem_profile
+    _state.active = True
+    try:
+        with profiler(stage, label):
+            yield
+    finally:
+        _state.active = False
+
+
+def profiled(stage: str, label_arg: str = None) -> Callable:
+    """Decorator that profiles every call of a function if RAG_PROFILE is set.
+
+    Args:
+        stage: Profiled stage, used in the file name
+        label_arg: Name of the argument used as the label (e.g. 'query')
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if profile_mode() is None:
+                return func(*args, **kwargs)
+            label = None
+            if label_arg is not None:
+                bound = signature.bind_partial(*args, **kwargs)
+                label = bound.arguments.get(label_arg)
+            with profile(stage, str(label) if label is not None else None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,533 @@
+"""Retries, per-attempt deadlines, request hedging and circuit breaking for upstream calls."""
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+import openai
+from langchain_core.embeddings import Embeddings
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CallStats:
+    """Counters for the upstream calls made while answering one request."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int):
+        """Increment counters by name."""
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters as a plain dictionary."""
+        return {
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins
+        }
+
+
+_current_stats: contextvars.ContextVar[Optional[CallStats]] = contextvars.ContextVar(
+    "resilience_call_stats", default=None
+)
+
+
+@contextmanager
+def collect_call_stats() -> Iterator[CallStats]:
+    """Collect retry/hedge counts for all resilient calls made in this context.
+
+    Context variables are copied into ``asyncio`` tasks and
+    ``asyncio.to_thread`` workers, so the counts cover async calls as well.
+    """
+    stats = CallStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        try:
+            _current_stats.reset(token)
+        except ValueError:
+            # Generator-based streams may be closed from another context
+            pass
+
+
+def current_call_stats() -> Optional[CallStats]:
+    """Return the CallStats being collected in this context, if any."""
+    return _current_stats.get()
+
+
+def _record(**counts: int):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(**counts)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Decide whether an upstream error is transient.
+
+    Args:
+        error: Exception raised by an attempt
+
+    Returns:
+        True for timeouts, connection errors, rate limits and 5xx responses
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, openai.APIConnectionError, httpx.TransportError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: BaseException) -> float:
+    """Seconds requested by a Retry-After header, or 0."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls are rejected for ``reset_timeout`` seconds. The first
+    call after that is let through as a probe: success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        """Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+                              (default Config.CIRCUIT_BREAKER_FAILURES)
+            reset_timeout: Seconds to stay open before probing
+                          (default Config.CIRCUIT_BREAKER_RESET_TIMEOUT)
+        """
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_BREAKER_FAILURES
+        self.reset_timeout = reset_timeout or Config.CIRCUIT_BREAKER_RESET_TIMEOUT
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half-open'."""
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted now."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let one probe through; a failure re-opens the circuit
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Count a transient failure, opening the circuit at the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(
+                        f"Circuit opened after {self.failures} consecutive failures"
+                    )
+                self.opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    """Runs upstream calls with retries, deadlines, hedging and a circuit breaker.
+
+    Each attempt is bounded by ``attempt_timeout``. Transient failures are
+    retried with full-jitter exponential backoff (honouring Retry-After).
+    With hedging enabled, a duplicate request is sent when the first one has
+    not finished after the ``hedge_percentile`` latency of recent calls, and
+    whichever finishes first wins. Attempts that have not started when the
+    deadline passes are cancelled; running sync attempts cannot be
+    interrupted, so they finish in a background thread, bounded by the HTTP
+    read timeout (capped at the attempt deadline, see http_client.get_timeout).
+    Async attempts are cancelled.
+    """
+
+    # Successful latencies kept for the hedge delay percentile
+    LATENCY_WINDOW = 200
+    # Latency samples needed before the percentile replaces hedge_min_delay
+    MIN_LATENCY_SAMPLES = 20
+
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = None,
+        attempt_timeout: float = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        hedge: bool = None,
+        hedge_percentile: float = None,
+        hedge_min_delay: float = None,
+        breaker: CircuitBreaker = None
+    ):
+        """Initialize the caller.
+
+        Args:
+            name: Upstream name used in logs (e.g. 'chat', 'embeddings')
+            max_retries: Retries after the first attempt (default Config.UPSTREAM_MAX_RETRIES)
+            attempt_timeout: Seconds allowed per attempt, None for no deadline
+            base_delay: First backoff ceiling in seconds (default Config.UPSTREAM_RETRY_BASE_DELAY)
+            max_delay: Largest backoff ceiling in seconds (default Config.UPSTREAM_RETRY_MAX_DELAY)
+            hedge: Send a hedged duplicate of slow calls (default Config.HEDGE_ENABLED)
+            hedge_percentile: Latency percentile after which to hedge
+                             (default Config.HEDGE_PERCENTILE)
+            hedge_min_delay: Lower bound on the hedge delay in seconds, also
+                            used until enough latencies have been observed
+                            (default Config.HEDGE_MIN_DELAY)
+            breaker: Circuit breaker (a new one from Config if None)
+        """
+        self.name = name
+        self.max_retries = Config.UPSTREAM_MAX_RETRIES if max_retries is None else max_retries
+        self.attempt_timeout = attempt_timeout
+        self.base_delay = base_delay or Config.UPSTREAM_RETRY_BASE_DELAY
+        self.max_delay = max_delay or Config.UPSTREAM_RETRY_MAX_DELAY
+        self.hedge = Config.HEDGE_ENABLED if hedge is None else hedge
+        self.hedge_percentile = hedge_percentile or Config.HEDGE_PERCENTILE
+        self.hedge_min_delay = hedge_min_delay or Config.HEDGE_MIN_DELAY
+        self.breaker = breaker or CircuitBreaker()
+
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self._latency_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=Config.UPSTREAM_WORKERS,
+                thread_name_prefix=f"resilient-{self.name}"
+            )
+        return self._executor
+    
+    def _submit(self, fn, args, kwargs) -> Future:
+        """Submit an attempt; its ``started`` event is set once a worker runs it."""
+        context = contextvars.copy_context()
+        started = threading.Event()
+        
+        def run():
+            started.set()
+            return context.run(fn, *args, **kwargs)
+        
+        future = self._pool().submit(run)
+        future.started = started
+        return future
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before sending a hedged request."""
+        with self._latency_lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.MIN_LATENCY_SAMPLES:
+            return self.hedge_min_delay
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return max(self.hedge_min_delay, samples[index])
+
+    def _observe(self, latency: float):
+        with self._latency_lock:
+            self._latencies.append(latency)
+
+    def backoff(self, attempt: int, error: BaseException = None) -> float:
+        """Full-jitter exponential backoff before retry number ``attempt`` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        if error is not None:
+            delay = max(delay, min(self.max_delay, _retry_after(error)))
+        return delay
+
+    def _before_attempt(self, attempt: int):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+        _record(attempts=1, retries=1 if attempt else 0)
+
+    def _after_failure(self, error: BaseException, attempt: int) -> bool:
+        """Update the breaker and decide whether to retry."""
+        if not is_retryable(error):
+            return False
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            return False
+        logger.warning(
+            f"{self.name} call failed ({type(error).__name__}: {error}); "
+            f"retry {attempt + 1}/{self.max_retries}"
+        )
+        return True
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``fn(*args, **kwargs)`` with retries, deadlines and hedging.
+
+        Returns:
+            The return value of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            Exception: The last error once retries are exhausted, or any
+                       non-transient error immediately
+        """
+        attempt = 0
+        while True:
+            self._before_attempt(attempt)
+            start_time = time.perf_counter()
+            try:
+                if self.hedge or self.attempt_timeout:
+                    result = self._run_attempt(fn, args, kwargs)
+                else:
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                if not self._after_failure(e, attempt):
+                    raise
+                attempt += 1
+                time.sleep(self.backoff(attempt, e))
+                continue
+            self._observe(time.perf_counter() - start_time)
+            self.breaker.record_success()
+            return result
+
+    def _run_attempt(self, fn, args, kwargs) -> Any:
+        """Run one attempt in worker threads, enforcing the deadline and hedging.
+
+        The deadline starts when a worker picks the attempt up, so time spent
+        queued behind other calls does not count against it.
+        """
+        futures = [self._submit(fn, args, kwargs)]
+        try:
+            futures[0].started.wait()
+            deadline = time.monotonic() + self.attempt_timeout if self.attempt_timeout else None
+
+            if self.hedge:
+                done, _ = wait(futures, timeout=self._remaining(deadline, self.hedge_delay()))
+                if not done and (deadline is None or time.monotonic() < deadline):
+                    _record(hedges=1)
+                    futures.append(self._submit(fn, args, kwargs))
+
+            pending = set(futures)
+            error = None
+            while pending:
+                done, pending = wait(
+                    pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        if future is not futures[0]:
+                            _record(hedge_wins=1)
+                        return future.result()
+                    error = future.exception()
+
+            if error is not None and not pending:
+                raise error
+            raise TimeoutError(f"{self.name} call exceeded {self.attempt_timeout}s deadline")
+        finally:
+            # Drop attempts still queued; running ones end at the HTTP read timeout
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _remaining(deadline: Optional[float], limit: float = None) -> Optional[float]:
+        if deadline is None:
+            return limit
+        remaining = max(0.0, deadline - time.monotonic())
+        return remaining if limit is None else min(remaining, limit)
+
+    async def acall(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Async counterpart of call; ``fn`` returns an awaitable.
+
+        Losing hedged attempts and attempts past their deadline are cancelled.
+        """
+        attempt = 0
+        while True:
+            self._before_attempt(attempt)
+            start_time = time.perf_counter()
+            try:
+                result = await self._arun_attempt(fn, args, kwargs)
+            except Exception as e:
+                if not self._after_failure(e, attempt):
+                    raise
+                attempt += 1
+                await asyncio.sleep(self.backoff(attempt, e))
+                continue
+            self._observe(time.perf_counter() - start_time)
+            self.breaker.record_success()
+            return result
+
+    async def _arun_attempt(self, fn, args, kwargs) -> Any:
+        if not self.hedge:
+            return await asyncio.wait_for(fn(*args, **kwargs), self.attempt_timeout)
+
+        deadline = time.monotonic() + self.attempt_timeout if self.attempt_timeout else None
+        first = asyncio.ensure_future(fn(*args, **kwargs))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=self._remaining(deadline, self.hedge_delay())
+            )
+            if not done and (deadline is None or time.monotonic() < deadline):
+                _record(hedges=1)
+                tasks.append(asyncio.ensure_future(fn(*args, **kwargs)))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self._remaining(deadline), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            _record(hedge_wins=1)
+                        return task.result()
+                    error = task.exception()
+
+            if error is not None and not pending:
+                raise error
+            raise TimeoutError(f"{self.name} call exceeded {self.attempt_timeout}s deadline")
+        finally:
+            leftover = [task for task in tasks if not task.done()]
+            for task in leftover:
+                task.cancel()
+            if leftover:
+                await asyncio.gather(*leftover, return_exceptions=True)
+
+    def stream(self, fn: Callable[..., Iterator[Any]], *args, **kwargs) -> Iterator[Any]:
+        """Stream from ``fn`` and retry failures that happen before the first chunk.
+
+        Once a chunk has been yielded the stream cannot be replayed, so later
+        errors propagate. The time to first chunk is bounded by the HTTP
+        client's read timeout rather than attempt_timeout.
+        """
+        attempt = 0
+        while True:
+            self._before_attempt(attempt)
+            start_time = time.perf_counter()
+            iterator = None
+            try:
+                iterator = iter(fn(*args, **kwargs))
+                first = next(iterator)
+            except StopIteration:
+                self.breaker.record_success()
+                return
+            except Exception as e:
+                # Release the abandoned response before retrying
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+                if not self._after_failure(e, attempt):
+                    raise
+                attempt += 1
+                time.sleep(self.backoff(attempt, e))
+                continue
+            self._observe(time.perf_counter() - start_time)
+            self.breaker.record_success()
+            yield first
+            yield from iterator
+            return
+
+    async def astream(self, fn: Callable[..., AsyncIterator[Any]], *args, **kwargs) -> AsyncIterator[Any]:
+        """Async counterpart of stream; the first chunk must arrive within attempt_timeout."""
+        attempt = 0
+        while True:
+            self._before_attempt(attempt)
+            start_time = time.perf_counter()
+            iterator = fn(*args, **kwargs).__aiter__()
+            try:
+                first = await asyncio.wait_for(iterator.__anext__(), self.attempt_timeout)
+            except StopAsyncIteration:
+                self.breaker.record_success()
+                return
+            except Exception as e:
+                # Close the abandoned stream (and its connection) before retrying
+                aclose = getattr(iterator, "aclose", None)
+                if aclose is not None:
+                    try:
+                        await aclose()
+                    except Exception as close_error:
+                        logger.debug(f"Error closing abandoned {self.name} stream: {close_error}")
+                if not self._after_failure(e, attempt):
+                    raise
+                attempt += 1
+                await asyncio.sleep(self.backoff(attempt, e))
+                continue
+            self._observe(time.perf_counter() - start_time)
+            self.breaker.record_success()
+            yield first
+            async for chunk in iterator:
+                yield chunk
+            return
+
+
+class ResilientEmbeddings(Embeddings):
+    """Embeddings wrapper that sends every request through a ResilientCaller."""
+
+    def __init__(self, embeddings: Embeddings, caller: ResilientCaller = None):
+        """Initialize the wrapper.
+
+        Args:
+            embeddings: Underlying embeddings model (e.g. OpenAIEmbeddings)
+            caller: ResilientCaller to use (default one configured for embeddings)
+        """
+        self.embeddings = embeddings
+        self.caller = caller or ResilientCaller(
+            "embeddings", attempt_timeout=Config.EMBEDDING_ATTEMPT_TIMEOUT
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.caller.call(self.embeddings.embed_documents, texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.caller.call(self.embeddings.embed_query, text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.caller.acall(self.embeddings.aembed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.caller.acall(self.embeddings.aembed_query, text)
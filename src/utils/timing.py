@@ -0,0 +1,84 @@
+"""Lightweight per-request timing spans."""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class Timings:
+    """Accumulated wall time per named stage of one request.
+
+    Spans with the same name add up, so a stage that runs more than once
+    (e.g. two embedding calls) reports its total time.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        """Add time to a stage."""
+        with self._lock:
+            self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage times in milliseconds, in first-recorded order, plus 'total'."""
+        with self._lock:
+            timings = {name: round(seconds * 1000, 3) for name, seconds in self._spans.items()}
+        timings['total'] = round((time.perf_counter() - self.start) * 1000, 3)
+        return timings
+
+
+_current_timings: contextvars.ContextVar[Optional[Timings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Timings]:
+    """Record every span entered in this context into a new Timings.
+
+    Context variables are copied into ``asyncio`` tasks and
+    ``asyncio.to_thread`` workers, so spans in those are recorded too.
+    """
+    timings = Timings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        try:
+            _current_timings.reset(token)
+        except ValueError:
+            # Generator-based streams may be closed from another context
+            pass
+
+
+def current_timings() -> Optional[Timings]:
+    """Return the Timings being collected in this context, if any."""
+    return _current_timings.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name`` of the current request.
+
+    Does nothing when no request is being timed.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    with timings.span(name):
+        yield
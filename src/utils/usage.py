@@ -0,0 +1,259 @@
+"""Token usage and cost accounting for chat and embedding requests."""
+
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+import tiktoken
+from langchain_core.embeddings import Embeddings
+
+from src.utils.metrics import TOKEN_COST, TOKENS
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, output). Embedding models only have input.
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-ada-002": (0.10, 0.0),
+}
+
+# Fixed per-message overhead of the chat format, and priming of the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "embedding_tokens")
+
+
+@lru_cache(maxsize=None)
+def _get_encoder(model: str):
+    """tiktoken encoder for a model, or None if it cannot be loaded (e.g. offline)."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for {model}, estimating tokens from length: {e}")
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for {model}, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of a text as the model's tokenizer would.
+
+    Falls back to one token per 4 characters when no tokenizer is available.
+
+    Args:
+        text: Input text
+        model: Model name used to pick the encoding
+
+    Returns:
+        Number of tokens
+    """
+    encoder = _get_encoder(model)
+    if encoder is None:
+        return (len(text) + 3) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Any], model: str) -> int:
+    """Estimate the prompt tokens of a chat request.
+
+    Args:
+        messages: LangChain messages sent to the chat model
+        model: Chat model name
+
+    Returns:
+        Number of prompt tokens including the chat format overhead
+    """
+    return sum(
+        TOKENS_PER_MESSAGE + count_tokens(str(message.content), model)
+        for message in messages
+    ) + TOKENS_PER_REPLY
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int = 0) -> Optional[float]:
+    """Price of a request in USD, or None for models without known pricing."""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        # Dated snapshots, e.g. gpt-4o-mini-2024-07-18 (longest name wins)
+        matches = [name for name in MODEL_PRICING if model.startswith(f"{name}-")]
+        if matches:
+            pricing = MODEL_PRICING[max(matches, key=len)]
+    if pricing is None:
+        return None
+    return (input_tokens * pricing[0] + output_tokens * pricing[1]) / 1_000_000
+
+
+class TokenUsage:
+    """Tokens used by one request (or any other unit of work), per model."""
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, int]] = {}
+        self.estimated = False
+        self._lock = threading.Lock()
+
+    def add(self, model: str, estimated: bool = False, **tokens: int):
+        """Add token counts for a model.
+
+        Args:
+            model: Model name
+            estimated: Whether the counts were estimated locally
+            **tokens: prompt_tokens, completion_tokens and/or embedding_tokens
+        """
+        with self._lock:
+            counts = self.models.setdefault(model, dict.fromkeys(USAGE_FIELDS, 0))
+            for field, value in tokens.items():
+                counts[field] += value
+            self.estimated = self.estimated or estimated
+
+    def merge(self, usage: Dict[str, Any]):
+        """Add the counts of another TokenUsage, given as its as_dict() output."""
+        for model, counts in (usage or {}).get('models', {}).items():
+            self.add(model, usage.get('estimated', False), **counts)
+
+    def cost(self) -> Optional[float]:
+        """Total price in USD, or None if no model used has known pricing."""
+        with self._lock:
+            models = {model: dict(counts) for model, counts in self.models.items()}
+        costs = [
+            estimate_cost(
+                model,
+                counts['prompt_tokens'] + counts['embedding_tokens'],
+                counts['completion_tokens']
+            )
+            for model, counts in models.items()
+        ]
+        costs = [cost for cost in costs if cost is not None]
+        return sum(costs) if costs else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Totals across models plus the per-model breakdown and cost."""
+        with self._lock:
+            models = {model: dict(counts) for model, counts in self.models.items()}
+            estimated = self.estimated
+        totals = {
+            field: sum(counts[field] for counts in models.values())
+            for field in USAGE_FIELDS
+        }
+        totals['total_tokens'] = sum(totals.values())
+        cost = self.cost()
+        totals['cost_usd'] = round(cost, 8) if cost is not None else None
+        totals['estimated'] = estimated
+        totals['models'] = models
+        return totals
+
+
+_current_usage: contextvars.ContextVar[Optional[TokenUsage]] = contextvars.ContextVar(
+    "token_usage", default=None
+)
+
+# Process-wide totals per model, e.g. for batch and replay reports
+usage_totals = TokenUsage()
+
+
+@contextmanager
+def collect_usage() -> Iterator[TokenUsage]:
+    """Record the tokens of every request made in this context into a new TokenUsage.
+
+    Context variables are copied into ``asyncio`` tasks and
+    ``asyncio.to_thread`` workers, so async calls are counted too.
+    """
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        try:
+            _current_usage.reset(token)
+        except ValueError:
+            # Generator-based streams may be closed from another context
+            pass
+
+
+def current_usage() -> Optional[TokenUsage]:
+    """Return the TokenUsage being collected in this context, if any."""
+    return _current_usage.get()
+
+
+def record_usage(model: str, estimated: bool = False, **tokens: int):
+    """Record tokens for the current request, the process totals and the metrics.
+
+    Args:
+        model: Model name
+        estimated: Whether the counts were estimated locally
+        **tokens: prompt_tokens, completion_tokens and/or embedding_tokens
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add(model, estimated, **tokens)
+    usage_totals.add(model, estimated, **tokens)
+
+    for field, value in tokens.items():
+        TOKENS.inc(value, model=model, type=field[:-len("_tokens")])
+    cost = estimate_cost(
+        model,
+        tokens.get('prompt_tokens', 0) + tokens.get('embedding_tokens', 0),
+        tokens.get('completion_tokens', 0)
+    )
+    if cost:
+        TOKEN_COST.inc(cost, model=model)
+
+
+class UsageTrackingEmbeddings(Embeddings):
+    """Embeddings wrapper that records the tokens of every text it embeds.
+
+    The OpenAI embeddings client does not expose the usage reported by the
+    API, so texts are counted with tiktoken. Place it below any cache so
+    only texts actually sent to the provider are counted.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str):
+        """Initialize the wrapper.
+
+        Args:
+            embeddings: Underlying embeddings model
+            model: Embedding model name, used for counting and pricing
+        """
+        self.embeddings = embeddings
+        self.model = model
+
+    def _record(self, texts: List[str]):
+        record_usage(
+            self.model,
+            estimated=True,
+            embedding_tokens=sum(count_tokens(text, self.model) for text in texts)
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.embeddings.embed_documents(texts)
+        self._record(texts)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.embeddings.embed_query(text)
+        self._record([text])
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = await self.embeddings.aembed_documents(texts)
+        self._record(texts)
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = await self.embeddings.aembed_query(text)
+        self._record([text])
+        return vector
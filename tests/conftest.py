@@ -16,3 +16,131 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "integration: marks tests as integration tests"
     )
+
+
+@pytest.fixture(autouse=True)
+def isolated_interaction_log(tmp_path, monkeypatch):
+    """Send interaction logs to tmp_path instead of the tracked logs directory."""
+    from src.utils import logger
+    from src.utils.config import Config
+    
+    logger.reset_interaction_logger()
+    monkeypatch.setattr(Config, "LOG_FILE", tmp_path / "logs" / "interactions.log")
+    yield
+    logger.reset_interaction_logger()
+
+
+class KeywordEmbeddings:
+    """Deterministic offline embeddings: hashed bag-of-words vectors."""
+    
+    dimension = 64
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def _embed(self, text):
+        import hashlib
+        vector = [0.0] * self.dimension
+        for word in text.lower().replace('?', ' ').split():
+            digest = hashlib.md5(word.encode('utf-8')).digest()
+            vector[digest[0] % self.dimension] += 1.0
+        return vector
+    
+    def embed_query(self, text):
+        self.calls += 1
+        return self._embed(text)
+    
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+    
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+    
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+
+SAMPLE_CHUNKS = [
+    ("billing_policy.txt", 0, "We accept credit cards, debit cards, UPI and net banking for bill payment."),
+    ("billing_policy.txt", 1, "Your monthly bill is generated on the 1st and sent by the 5th."),
+    ("roaming_tariff.txt", 0, "Activate international roaming from the mobile app within 24-48 hours."),
+    ("fup_policy.txt", 0, "Fair usage policy reduces speed after the high-speed data limit."),
+]
+
+
+@pytest.fixture
+def stub_retriever():
+    """DocumentRetriever over a tiny in-memory NumPy store with offline embeddings."""
+    from src.retrieval.numpy_store import NumpyVectorStore
+    from src.retrieval.retriever import DocumentRetriever
+    
+    embeddings = KeywordEmbeddings()
+    chunks = [
+        {
+            'content': content,
+            'metadata': {'source': source, 'chunk_id': chunk_id},
+            'embedding': embeddings._embed(content)
+        }
+        for source, chunk_id, content in SAMPLE_CHUNKS
+    ]
+    
+    retriever = DocumentRetriever.__new__(DocumentRetriever)
+    retriever.store_type = "numpy"
+    retriever.top_k = 2
+    retriever.embeddings = embeddings
+    retriever.vectorstore = NumpyVectorStore.from_chunks(chunks)
+    retriever.retriever = None
+    retriever.index_version = "test-index"
+    return retriever
+
+
+@pytest.fixture
+def chroma_retriever(tmp_path):
+    """DocumentRetriever over a temporary ChromaDB collection with offline embeddings."""
+    import chromadb
+    from langchain_chroma import Chroma
+    from src.retrieval.retriever import DocumentRetriever
+    
+    embeddings = KeywordEmbeddings()
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    collection = client.get_or_create_collection(name="test_collection", embedding_function=None)
+    collection.add(
+        ids=[f"{source}::{chunk_id}" for source, chunk_id, _ in SAMPLE_CHUNKS],
+        embeddings=[embeddings._embed(content) for _, _, content in SAMPLE_CHUNKS],
+        documents=[content for _, _, content in SAMPLE_CHUNKS],
+        metadatas=[{'source': source, 'chunk_id': chunk_id} for source, chunk_id, _ in SAMPLE_CHUNKS]
+    )
+    
+    retriever = DocumentRetriever.__new__(DocumentRetriever)
+    retriever.store_type = "chromadb"
+    retriever.top_k = 2
+    retriever.embeddings = embeddings
+    retriever.client = client
+    retriever.collection = collection
+    retriever.vectorstore = Chroma(
+        client=client,
+        collection_name="test_collection",
+        embedding_function=embeddings
+    )
+    retriever.retriever = None
+    retriever.index_version = "test-index"
+    return retriever
+
+
+@pytest.fixture
+def fake_generator(stub_retriever, tmp_path):
+    """AnswerGenerator wired to the stub retriever and a fake chat model."""
+    from langchain_core.language_models import FakeListChatModel
+    from src.generation.answer_cache import SemanticAnswerCache
+    from src.generation.answer_generator import AnswerGenerator
+    from src.generation.completion_cache import CompletionCache
+    
+    generator = AnswerGenerator(
+        retriever=stub_retriever,
+        api_key="test-key",
+        answer_cache=SemanticAnswerCache(),
+        completion_cache=CompletionCache(tmp_path / "completions.sqlite")
+    )
+    generator.llm = FakeListChatModel(responses=["You can pay by card or UPI."])
+    return generator
@@ -0,0 +1,186 @@
+"""Unit tests for the semantic answer cache and the completion cache."""
+
+from src.generation.answer_cache import SemanticAnswerCache
+from src.generation.completion_cache import CompletionCache
+from src.utils.config import Config
+
+
+def store_entry(cache, embedding, index_version="v1", top_k=5, answer="cached answer"):
+    """Store an answer for the given embedding."""
+    cache.store(
+        query="How do I pay my bill?",
+        query_embedding=embedding,
+        answer=answer,
+        retrieved_chunks=[{'content': "c", 'metadata': {'source': "billing_policy.txt"}}],
+        sources=["billing_policy.txt"],
+        index_version=index_version,
+        top_k=top_k
+    )
+
+
+class TestSemanticAnswerCache:
+    """Test suite for SemanticAnswerCache."""
+
+    def test_hit_above_threshold(self):
+        """Near-duplicate embeddings should return the cached answer."""
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+        store_entry(cache, [1.0, 0.0, 0.1])
+
+        hit = cache.lookup([1.0, 0.05, 0.1], index_version="v1", top_k=5)
+
+        assert hit is not None
+        assert hit['answer'] == "cached answer"
+        assert hit['similarity'] > 0.9
+        assert cache.stats()['hits'] == 1
+
+    def test_miss_below_threshold(self):
+        """Unrelated questions should not be served from the cache."""
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+        store_entry(cache, [1.0, 0.0, 0.0])
+
+        assert cache.lookup([0.0, 1.0, 0.0], index_version="v1", top_k=5) is None
+        assert cache.stats()['misses'] == 1
+
+    def test_index_version_and_top_k_must_match(self):
+        """Answers from another index build or top_k are not reused."""
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+        store_entry(cache, [1.0, 0.0])
+
+        assert cache.lookup([1.0, 0.0], index_version="v2", top_k=5) is None
+        assert cache.lookup([1.0, 0.0], index_version="v1", top_k=3) is None
+        assert cache.lookup([1.0, 0.0], index_version="v1", top_k=5) is not None
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Entries older than the TTL should be dropped."""
+        clock = [1000.0]
+        monkeypatch.setattr("src.generation.answer_cache.time.time", lambda: clock[0])
+        cache = SemanticAnswerCache(threshold=0.9, max_entries=10, ttl_seconds=60)
+        store_entry(cache, [1.0, 0.0])
+
+        clock[0] += 61
+
+        assert cache.lookup([1.0, 0.0], index_version="v1", top_k=5) is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when the cache is full."""
+        cache = SemanticAnswerCache(threshold=0.99, max_entries=2, ttl_seconds=60)
+        store_entry(cache, [1.0, 0.0, 0.0], answer="a")
+        store_entry(cache, [0.0, 1.0, 0.0], answer="b")
+        cache.lookup([1.0, 0.0, 0.0], index_version="v1", top_k=5)
+        store_entry(cache, [0.0, 0.0, 1.0], answer="c")
+
+        assert cache.stats()['evictions'] == 1
+        assert cache.lookup([0.0, 1.0, 0.0], index_version="v1", top_k=5) is None
+        assert cache.lookup([1.0, 0.0, 0.0], index_version="v1", top_k=5)['answer'] == "a"
+
+
+class TestAnswerGeneratorSemanticCache:
+    """Test the semantic cache integration in AnswerGenerator."""
+
+    def test_repeat_question_skips_llm(self, fake_generator):
+        """A repeated question should be answered without calling the LLM."""
+        first = fake_generator.generate_answer("What payment methods do you accept?", log_interaction=False)
+        fake_generator.llm.responses = ["SHOULD NOT BE USED"]
+        second = fake_generator.generate_answer("what payment methods do you accept", log_interaction=False)
+
+        assert first['cache'] is None
+        assert second['cache'] == "semantic"
+        assert second['answer'] == first['answer']
+        assert second['sources'] == first['sources']
+
+    def test_entity_change_is_not_a_hit(self, fake_generator):
+        """Questions differing only in an entity do not share an answer at the default threshold."""
+        fake_generator.llm.responses = ["France roaming costs 2 per MB.", "Japan roaming costs 5 per MB."]
+        france = fake_generator.generate_answer("Roaming charges in France", log_interaction=False)
+        japan = fake_generator.generate_answer("roaming charges in Japan", log_interaction=False)
+
+        assert fake_generator.answer_cache.threshold == Config.SEMANTIC_CACHE_THRESHOLD
+        assert japan['cache'] != "semantic"
+        assert "Japan" in japan['answer'] and "France" in france['answer']
+
+    def test_disabled_by_default(self, stub_retriever, monkeypatch):
+        """Without configuration the generator has no semantic cache."""
+        from src.generation.answer_generator import AnswerGenerator
+
+        monkeypatch.setattr(Config, "COMPLETION_CACHE_ENABLED", False)
+        generator = AnswerGenerator(retriever=stub_retriever, api_key="test-key")
+
+        assert Config.SEMANTIC_CACHE_ENABLED is False
+        assert generator.answer_cache is None
+
+    def test_cached_answer_rewrapped_without_sources(self, fake_generator):
+        """include_sources applies to cached answers without double-wrapping."""
+        fake_generator.generate_answer("What payment methods do you accept?", log_interaction=False)
+        result = fake_generator.generate_answer(
+            "What payment methods do you accept?",
+            include_sources=False,
+            log_interaction=False
+        )
+
+        assert result['cache'] == "semantic"
+        assert result['answer'] == "You can pay by card or UPI."
+
+
+class TestCompletionCache:
+    """Test suite for CompletionCache."""
+
+    def test_key_covers_all_prompt_inputs(self):
+        """Changing any prompt input should change the key."""
+        base = CompletionCache.make_key("system", "prompt", "gpt-4o-mini", 0.3)
+
+        assert base == CompletionCache.make_key("system", "prompt", "gpt-4o-mini", 0.3)
+        assert base != CompletionCache.make_key("system", "prompt", "gpt-4o-mini", 0.0)
+        assert base != CompletionCache.make_key("system", "prompt", "gpt-4o", 0.3)
+        assert base != CompletionCache.make_key("other", "prompt", "gpt-4o-mini", 0.3)
+
+    def test_persists_across_instances(self, tmp_path):
+        """Completions should survive a restart."""
+        path = tmp_path / "completions.sqlite"
+        CompletionCache(path).put("k", "answer", "v1")
+
+        assert CompletionCache(path).get("k", "v1") == "answer"
+
+    def test_rebuild_invalidates(self, tmp_path):
+        """Entries from an older index version are never served."""
+        cache = CompletionCache(tmp_path / "completions.sqlite")
+        cache.put("k", "answer", "v1")
+
+        assert cache.get("k", "v2") is None
+        assert cache.invalidate_other_versions("v2") == 1
+        assert cache.stats()['entries'] == 0
+
+    def test_size_limit(self, tmp_path):
+        """The cache should keep at most max_entries rows."""
+        cache = CompletionCache(tmp_path / "completions.sqlite", max_entries=2)
+        for key in ["a", "b", "c"]:
+            cache.put(key, key, "v1")
+
+        assert cache.stats()['entries'] == 2
+
+
+class TestAnswerGeneratorCompletionCache:
+    """Test the completion cache integration in AnswerGenerator."""
+
+    def test_same_prompt_reuses_completion(self, fake_generator):
+        """An identical prompt should not call the LLM again."""
+        fake_generator.answer_cache = None
+        first = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+        fake_generator.llm.responses = ["SHOULD NOT BE USED"]
+        second = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        assert second['cache'] == "completion"
+        assert second['answer'] == first['answer']
+
+    def test_cached_completion_not_double_wrapped(self, fake_generator):
+        """Sources are appended once, and only when requested."""
+        fake_generator.answer_cache = None
+        with_sources = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+        without_sources = fake_generator.generate_answer(
+            "How do I activate roaming?",
+            include_sources=False,
+            log_interaction=False
+        )
+
+        assert without_sources['answer'] == "You can pay by card or UPI."
+        assert with_sources['answer'].count("Source Documents:") == 1
@@ -0,0 +1,241 @@
+"""Offline unit tests for AnswerGenerator using a stub retriever and fake LLM."""
+
+import asyncio
+import json
+
+import pytest
+
+
+class TestStreamAnswer:
+    """Test suite for AnswerGenerator.stream_answer."""
+
+    def test_stream_yields_tokens_then_sources(self, fake_generator):
+        """Tokens arrive incrementally and the sources are appended at the end."""
+        fake_generator.answer_cache = None
+        stream = fake_generator.stream_answer("How do I activate roaming?", log_interaction=False)
+
+        tokens = list(stream)
+
+        assert len(tokens) > 2, "LLM output should be streamed in several fragments"
+        assert "".join(tokens) == stream.result['answer']
+        assert tokens[-1].startswith("\n\n---\nSource Documents:")
+        assert stream.result['answer'].count("Source Documents:") == 1
+
+    def test_stream_records_timings(self, fake_generator):
+        """Time to first token is measured separately from total time."""
+        fake_generator.answer_cache = None
+        stream = fake_generator.stream_answer("How do I activate roaming?", log_interaction=False)
+        list(stream)
+
+        assert stream.time_to_first_token is not None
+        assert stream.total_time >= stream.time_to_first_token
+
+    def test_stream_matches_generate_answer(self, fake_generator):
+        """Streaming and blocking generation produce the same result shape."""
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        blocking = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+        stream = fake_generator.stream_answer("How do I activate roaming?", log_interaction=False)
+        list(stream)
+
+        assert stream.result['answer'] == blocking['answer']
+        assert stream.result['sources'] == blocking['sources']
+        assert set(stream.result) == set(blocking)
+
+    def test_stream_without_sources(self, fake_generator):
+        """include_sources=False streams only the LLM answer."""
+        fake_generator.answer_cache = None
+        stream = fake_generator.stream_answer(
+            "How do I activate roaming?",
+            include_sources=False,
+            log_interaction=False
+        )
+
+        assert "".join(stream) == "You can pay by card or UPI."
+
+
+class TestAsyncGeneration:
+    """Test suite for the async retrieval and generation APIs."""
+
+    def test_aretrieve_matches_retrieve(self, stub_retriever):
+        """Async retrieval returns the same chunks as sync retrieval."""
+        query = "How do I activate international roaming?"
+
+        async_chunks = asyncio.run(stub_retriever.aretrieve(query))
+
+        assert async_chunks == stub_retriever.retrieve(query)
+
+    def test_agenerate_answer(self, fake_generator):
+        """Async generation produces the same result as sync generation."""
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+
+        result = asyncio.run(
+            fake_generator.agenerate_answer("How do I activate roaming?", log_interaction=False)
+        )
+        expected = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        # Timings differ from run to run
+        assert result.pop('timings').keys() == expected.pop('timings').keys()
+        assert result == expected
+
+    def test_agenerate_answer_concurrently(self, fake_generator):
+        """Many questions can be answered concurrently on one event loop."""
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        queries = ["How do I pay my bill?", "What is fair usage policy?", "Roaming activation?"]
+
+        async def answer_all():
+            return await asyncio.gather(*[
+                fake_generator.agenerate_answer(query, log_interaction=False)
+                for query in queries
+            ])
+
+        results = asyncio.run(answer_all())
+
+        assert [result['query'] for result in results] == queries
+
+    def test_astream_answer(self, fake_generator):
+        """Async streaming yields tokens and finalizes the result."""
+        fake_generator.answer_cache = None
+        stream = fake_generator.astream_answer("How do I activate roaming?", log_interaction=False)
+
+        async def consume():
+            return [token async for token in stream]
+
+        tokens = asyncio.run(consume())
+
+        assert "".join(tokens) == stream.result['answer']
+        assert stream.time_to_first_token is not None
+
+
+class TestBatchAnswering:
+    """Test suite for bulk answering and the batch CLI helpers."""
+
+    def test_generate_answers_preserves_order(self, fake_generator):
+        """Results come back in input order regardless of completion order."""
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        queries = [f"Question number {i} about roaming?" for i in range(10)]
+
+        results = fake_generator.generate_answers(queries, max_concurrency=3, log_interaction=False)
+
+        assert [result['query'] for result in results] == queries
+        assert all(result['latency'] >= 0 for result in results)
+
+    def test_failing_query_does_not_stop_batch(self, fake_generator, monkeypatch):
+        """A failing question is reported with an error and the rest still run."""
+        original = fake_generator.generate_answer
+
+        def flaky(query, **kwargs):
+            if query == "boom":
+                raise RuntimeError("upstream failure")
+            return original(query, **kwargs)
+
+        monkeypatch.setattr(fake_generator, "generate_answer", flaky)
+
+        results = fake_generator.generate_answers(
+            ["How do I pay my bill?", "boom", "Roaming activation?"],
+            max_concurrency=2,
+            log_interaction=False
+        )
+
+        assert results[1]['error'] == "upstream failure"
+        assert 'answer' in results[0] and 'answer' in results[2]
+
+    def test_none_query_does_not_end_the_batch(self, fake_generator):
+        """A None query yields an error result and the following queries are still answered."""
+        results = list(fake_generator.iter_answers(
+            ["How do I pay my bill?", "Roaming activation?", None, "Fair usage?"],
+            max_concurrency=1,
+            log_interaction=False
+        ))
+
+        assert len(results) == 4
+        assert 'error' in results[2]
+        assert 'answer' in results[3]
+
+    def test_run_batch_resumes_from_checkpoint(self, fake_generator, tmp_path):
+        """A rerun skips finished questions and drops a torn trailing line."""
+        from src.generation.batch import run_batch
+
+        input_file = tmp_path / "questions.jsonl"
+        input_file.write_text(
+            json.dumps({"query": "How do I pay my bill?"}) + "\n"
+            + json.dumps({"question": "What is fair usage policy?"}) + "\n"
+            + json.dumps("Roaming activation?") + "\n",
+            encoding="utf-8"
+        )
+        output_file = tmp_path / "answers.jsonl"
+        output_file.write_text(
+            json.dumps({"index": 0, "query": "How do I pay my bill?"}) + "\n" + '{"index": 1, "que',
+            encoding="utf-8"
+        )
+
+        summary = run_batch(input_file, output_file, answer_generator=fake_generator, log_interaction=False)
+
+        records = [json.loads(line) for line in output_file.read_text(encoding="utf-8").splitlines()]
+        assert summary['skipped'] == 1
+        assert summary['answered'] == 2
+        assert 'input_fingerprint' in records[0]
+        assert [record['index'] for record in records[1:]] == [0, 1, 2]
+        assert records[3]['query'] == "Roaming activation?"
+
+    def test_run_batch_retries_errors_on_resume(self, fake_generator, tmp_path, monkeypatch):
+        """Questions that failed are answered again on resume and the new result wins."""
+        from src.generation.batch import load_checkpoint, run_batch
+
+        input_file = tmp_path / "questions.jsonl"
+        input_file.write_text(
+            "\n".join(json.dumps(q) for q in ["How do I pay my bill?", "boom", "Roaming activation?"]) + "\n",
+            encoding="utf-8"
+        )
+        output_file = tmp_path / "answers.jsonl"
+        original = fake_generator.generate_answer
+
+        def flaky(query, **kwargs):
+            if query == "boom":
+                raise RuntimeError("upstream failure")
+            return original(query, **kwargs)
+
+        monkeypatch.setattr(fake_generator, "generate_answer", flaky)
+        first = run_batch(input_file, output_file, answer_generator=fake_generator, log_interaction=False)
+        assert first['errors'] == 1
+        assert load_checkpoint(output_file)[1] == {0, 2}
+
+        monkeypatch.setattr(fake_generator, "generate_answer", original)
+        second = run_batch(input_file, output_file, answer_generator=fake_generator, log_interaction=False)
+
+        records = [json.loads(line) for line in output_file.read_text(encoding="utf-8").splitlines()]
+        assert second['skipped'] == 2
+        assert second['answered'] == 1
+        assert second['errors'] == 0
+        assert [record.get('index') for record in records[1:]] == [0, 1, 2]
+        assert records[2]['error'] is None
+        assert load_checkpoint(output_file)[1] == {0, 1, 2}
+
+    def test_run_batch_refuses_other_input(self, fake_generator, tmp_path):
+        """Resuming against a different input file raises instead of skipping."""
+        from src.generation.batch import run_batch
+
+        input_file = tmp_path / "questions.jsonl"
+        input_file.write_text(json.dumps("How do I pay my bill?") + "\n", encoding="utf-8")
+        output_file = tmp_path / "answers.jsonl"
+        run_batch(input_file, output_file, answer_generator=fake_generator, log_interaction=False)
+
+        input_file.write_text(json.dumps("Roaming activation?") + "\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="different input"):
+            run_batch(input_file, output_file, answer_generator=fake_generator, log_interaction=False)
+
+        summary = run_batch(input_file, output_file, answer_generator=fake_generator,
+                            log_interaction=False, resume=False)
+        assert summary['answered'] == 1
+
+    def test_read_queries_from_csv(self, tmp_path):
+        """CSV input is read from its question column."""
+        from src.generation.batch import read_queries
+
+        input_file = tmp_path / "questions.csv"
+        input_file.write_text("id,question\n1,How do I pay?\n2,\"Roaming, abroad?\"\n", encoding="utf-8")
+
+        assert list(read_queries(input_file)) == ["How do I pay?", "Roaming, abroad?"]
@@ -0,0 +1,222 @@
+"""Unit tests for the benchmark baseline comparison."""
+
+import json
+
+import pytest
+
+from benchmarks.harness import compare_results, latency_metrics, metric
+
+
+def results(**metrics):
+    """Results document with one benchmark holding the given metrics."""
+    return {'benchmarks': {'bench': metrics}}
+
+
+class TestCompareResults:
+    """Test suite for compare_results."""
+
+    def test_lower_is_better_regression(self):
+        """A latency increase beyond the tolerance is a regression."""
+        rows = compare_results(
+            results(p95_ms=metric(130, "ms")),
+            results(p95_ms=metric(100, "ms")),
+            tolerance=0.2
+        )
+
+        assert rows[0]['status'] == "regressed"
+        assert abs(rows[0]['change'] - 0.3) < 1e-9
+
+    def test_higher_is_better_regression(self):
+        """A throughput drop beyond the tolerance is a regression."""
+        rows = compare_results(
+            results(throughput=metric(70, "MB/s", better="higher")),
+            results(throughput=metric(100, "MB/s", better="higher")),
+            tolerance=0.2
+        )
+
+        assert rows[0]['status'] == "regressed"
+
+    def test_improvement_and_noise(self):
+        """Large gains are improvements and small changes are ok."""
+        rows = compare_results(
+            results(p50_ms=metric(50, "ms"), p95_ms=metric(105, "ms")),
+            results(p50_ms=metric(100, "ms"), p95_ms=metric(100, "ms")),
+            tolerance=0.2
+        )
+
+        assert {row['metric']: row['status'] for row in rows} == {'p50_ms': "improved", 'p95_ms': "ok"}
+
+    def test_new_and_non_metric_entries_skipped(self):
+        """Metrics missing from the baseline and plain values are not compared."""
+        rows = compare_results(
+            results(p50_ms=metric(1, "ms"), chunks=12),
+            {'benchmarks': {}}
+        )
+
+        assert rows == []
+
+    def test_failed_benchmark_is_reported(self):
+        """A benchmark that errored is a row of its own, not silently skipped."""
+        rows = compare_results(
+            {'benchmarks': {'bench': {'error': "tokenizer unavailable"}}},
+            results(throughput=metric(10, "MB/s", better="higher"))
+        )
+
+        assert [(row['benchmark'], row['status']) for row in rows] == [("bench", "error")]
+
+    def test_missing_baseline_metric_is_reported(self):
+        """Baseline metrics of a suite that ran must be measured again."""
+        baseline = dict(results(p50_ms=metric(1, "ms"), p95_ms=metric(2, "ms")), suites={'retrieval': ["bench"]})
+        current = dict(results(p50_ms=metric(1, "ms")), settings={'suites': ["retrieval"]})
+
+        rows = compare_results(current, baseline)
+
+        assert {row['metric']: row['status'] for row in rows} == {'p50_ms': "ok", 'p95_ms': "missing"}
+        assert compare_results(dict(current, settings={'suites': ["ingest"]}), baseline)[-1]['status'] == "ok"
+
+    def test_only_medians_are_gated(self):
+        """Tail percentiles and means are reported but do not gate."""
+        rows = compare_results(
+            results(**latency_metrics([0.2] * 10)),
+            results(**latency_metrics([0.1] * 10))
+        )
+
+        assert {row['metric']: row['gate'] for row in rows} == {
+            'p50_ms': True, 'p95_ms': False, 'p99_ms': False, 'mean_ms': False
+        }
+
+    def test_latency_metrics(self):
+        """Percentiles are reported in milliseconds."""
+        values = latency_metrics([0.001 * i for i in range(1, 101)])
+
+        assert abs(values['p50_ms']['value'] - 50.5) < 1e-6
+        assert values['p99_ms']['value'] > values['p95_ms']['value']
+
+
+class TestRunExitStatus:
+    """Test suite for the exit status of benchmarks.run."""
+
+    @pytest.fixture
+    def run_with(self, monkeypatch, tmp_path):
+        """Run benchmarks.run.main with canned results against a baseline file."""
+        from benchmarks import run
+
+        def run_with(current, baseline=None, args=()):
+            monkeypatch.setattr(run, "run_suites", lambda *a, **kw: current)
+            baseline_file = tmp_path / "baseline.json"
+            if baseline is not None:
+                baseline_file.write_text(json.dumps(baseline), encoding="utf-8")
+            return run.main([
+                "--output", str(tmp_path / "current.json"),
+                "--baseline", str(baseline_file),
+                *args
+            ])
+
+        return run_with
+
+    def test_regression_fails(self, run_with):
+        """A regression beyond the tolerance exits with status 1."""
+        assert run_with(results(p50_ms=metric(150, "ms")), results(p50_ms=metric(100, "ms"))) == 1
+        assert run_with(results(p50_ms=metric(130, "ms")), results(p50_ms=metric(100, "ms"))) == 0
+        assert run_with(results(p50_ms=metric(130, "ms")), results(p50_ms=metric(100, "ms")), ["--tolerance", "0.2"]) == 1
+
+    def test_missing_baseline_fails(self, run_with):
+        """Without a baseline the run cannot pass the gate."""
+        assert run_with(results(p95_ms=metric(100, "ms"))) == 2
+
+    def test_failed_benchmark_fails(self, run_with):
+        """A benchmark error exits with status 2 and is never saved as the baseline."""
+        current = {'benchmarks': {'bench': {'error': "boom"}}}
+
+        assert run_with(current, results(p95_ms=metric(100, "ms"))) == 2
+        assert run_with(current, args=["--save-baseline"]) == 2
+
+    def test_ungated_regression_passes(self, run_with):
+        """A slower tail percentile alone does not fail the run."""
+        current = results(p99_ms=metric(300, "ms", gate=False))
+
+        assert run_with(current, results(p99_ms=metric(100, "ms", gate=False))) == 0
+
+    def test_mode_mismatch_fails(self, run_with):
+        """Live results are not compared against an offline baseline."""
+        baseline = dict(results(p95_ms=metric(100, "ms")), settings={'live': False})
+
+        assert run_with(results(p95_ms=metric(100, "ms")), baseline, ["--live"]) == 2
+
+    def test_committed_baseline_is_offline(self):
+        """The stored baseline comes from an offline run and records its environment."""
+        from benchmarks.harness import BASELINE_FILE, load_results
+
+        baseline = load_results(BASELINE_FILE)
+
+        assert baseline['settings']['live'] is False
+        assert {'commit', 'python', 'platform', 'processor'} <= set(baseline['environment'])
+        assert not [name for name, result in baseline['benchmarks'].items() if 'error' in result]
+        assert baseline['benchmarks']['chunking']['throughput']['unit'] == "MB/s"
+
+
+class TestReplay:
+    """Test suite for the replay load generator."""
+
+    def test_arrival_offsets(self):
+        """Uniform arrivals are evenly spaced and bounded by duration or count."""
+        from benchmarks.replay import arrival_offsets
+
+        assert arrival_offsets(4, duration=1.0, max_requests=None, arrival="uniform") == [0.0, 0.25, 0.5, 0.75]
+        assert len(arrival_offsets(100, duration=None, max_requests=7, seed=1)) == 7
+
+    def test_load_queries_from_interaction_log(self, tmp_path):
+        """Queries are read from interaction log records."""
+        from benchmarks.replay import load_queries
+
+        log = tmp_path / "interactions.jsonl"
+        log.write_text(
+            json.dumps({"timestamp": "t", "query": "How do I pay?", "generated_response": "..."}) + "\n"
+            + json.dumps({"timestamp": "t", "query": "Roaming?", "generated_response": "..."}) + "\n",
+            encoding="utf-8"
+        )
+
+        assert load_queries(log) == ["How do I pay?", "Roaming?"]
+
+    def test_load_queries_from_rotated_log(self, tmp_path):
+        """Gzipped rotated segments are replayed, oldest first, before the live file."""
+        from benchmarks.replay import load_queries
+        from src.utils.logger import JsonlWriter
+
+        log = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(log, background=False, fsync="never", rotate_bytes=80, rotate_interval=0, compress=True)
+        for i in range(5):
+            writer.write({"timestamp": "t", "query": f"Question {i}?", "generated_response": "..."})
+        writer.close()
+
+        assert any(segment.suffix == ".gz" for segment in writer.segments())
+        assert load_queries(log) == [f"Question {i}?" for i in range(5)]
+        assert load_queries(tmp_path) == load_queries(log)
+
+    def test_run_replay_reports(self, fake_generator, monkeypatch):
+        """The report counts requests, errors and cache hits."""
+        from benchmarks.replay import run_replay
+
+        original = fake_generator.generate_answer
+
+        def flaky(query, **kwargs):
+            if query == "boom":
+                raise RuntimeError("upstream failure")
+            return original(query, **kwargs)
+
+        monkeypatch.setattr(fake_generator, "generate_answer", flaky)
+
+        report = run_replay(
+            fake_generator,
+            ["How do I pay my bill?", "boom"],
+            rate=500,
+            concurrency=1,
+            duration=None,
+            max_requests=6
+        )
+
+        assert report['requests'] == 6
+        assert report['errors'] == 3
+        assert report['error_types'] == {'RuntimeError': 3}
+        assert report['cache_hit_rates']['semantic'] == 2 / 3
+        assert report['latency_ms']['p99'] >= report['latency_ms']['p50']
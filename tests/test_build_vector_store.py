@@ -0,0 +1,115 @@
+"""Unit tests for building the Chroma vector store from stored embeddings."""
+
+import importlib
+import json
+
+import chromadb
+import pytest
+
+from src.embeddings.embedding_store import EmbeddingStore, make_chunk_id
+from src.utils.config import Config
+
+# The package re-exports the function under the module's name
+builder = importlib.import_module("src.embeddings.build_vector_store")
+
+
+def make_chunks(count, dimension=8):
+    """Chunks with distinct one-hot embeddings."""
+    return [
+        {
+            'content': f"Policy paragraph {i}",
+            'metadata': {'source': "policy.txt", 'chunk_id': i},
+            'embedding': [1.0 if d == i % dimension else 0.0 for d in range(dimension)]
+        }
+        for i in range(count)
+    ]
+
+
+def open_collection():
+    """The built chromadb collection."""
+    client = chromadb.PersistentClient(path=str(Config.VECTOR_STORE_PATH))
+    return client.get_collection(Config.COLLECTION_NAME)
+
+
+class FakeEmbeddings:
+    """Offline embeddings recording the texts sent for embedding."""
+
+    texts = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def embed_documents(self, texts):
+        FakeEmbeddings.texts.extend(texts)
+        return [[0.5] * 8 for _ in texts]
+
+    def embed_query(self, text):
+        return [0.5] * 8
+
+
+@pytest.fixture
+def build_env(tmp_path, monkeypatch):
+    """Isolated chunk, store and Chroma paths with offline embeddings."""
+    monkeypatch.setattr(Config, "EMBEDDING_STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr(Config, "CHUNKS_WITH_EMBEDDINGS_FILE", tmp_path / "chunks_with_embeddings.json")
+    monkeypatch.setattr(Config, "VECTOR_STORE_PATH", tmp_path / "chroma")
+    monkeypatch.setattr(builder, "OpenAIEmbeddings", FakeEmbeddings)
+    FakeEmbeddings.texts = []
+    return tmp_path
+
+
+class TestBuildVectorStore:
+    """Test suite for the batched bulk load in build_vector_store."""
+
+    def test_inserts_stored_vectors_in_batches(self, build_env):
+        """Vectors from the binary store are inserted without embedding calls."""
+        EmbeddingStore.write(make_chunks(5), directory=Config.EMBEDDING_STORE_DIR)
+        progress = []
+
+        vectorstore = builder.build_vector_store(batch_size=2, progress=lambda *args: progress.append(args))
+
+        assert FakeEmbeddings.texts == []
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+        assert open_collection().count() == 5
+        [hit] = vectorstore.similarity_search_by_vector([0.0, 0.0, 0.0, 1.0, 0, 0, 0, 0], k=1)
+        assert hit.page_content == "Policy paragraph 3"
+
+    def test_embeds_only_chunks_without_vectors(self, build_env):
+        """Chunks in the JSON file without an embedding are embedded; the rest are reused."""
+        chunks = make_chunks(3)
+        del chunks[1]['embedding']
+        Config.CHUNKS_WITH_EMBEDDINGS_FILE.write_text(json.dumps(chunks), encoding='utf-8')
+
+        builder.build_vector_store()
+
+        assert FakeEmbeddings.texts == ["Policy paragraph 1"]
+        assert open_collection().count() == 3
+
+    def test_rebuild_is_idempotent_and_collects_garbage(self, build_env):
+        """Rebuilds upsert under stable ids and delete vectors of removed chunks."""
+        chunks = make_chunks(4)
+        EmbeddingStore.write(chunks, directory=Config.EMBEDDING_STORE_DIR)
+        builder.build_vector_store(batch_size=3)
+        # A copy stored under a random id, as earlier builds did
+        open_collection().add(ids=["legacy-uuid"], embeddings=[[0.1] * 8], documents=["stale"])
+
+        builder.build_vector_store(batch_size=3)
+        assert open_collection().count() == 4
+
+        chunks[1]['content'] = "Policy paragraph 1, revised"
+        EmbeddingStore.write(chunks[:3], directory=Config.EMBEDDING_STORE_DIR)
+        builder.build_vector_store(batch_size=3)
+
+        stored = open_collection().get()
+        assert sorted(stored['ids']) == sorted(
+            make_chunk_id(chunk['metadata'], chunk['content']) for chunk in chunks[:3]
+        )
+        assert "Policy paragraph 1, revised" in stored['documents']
+
+    def test_other_model_is_reembedded(self, build_env):
+        """Vectors made with a different embedding model are not reused."""
+        EmbeddingStore.write(make_chunks(2), directory=Config.EMBEDDING_STORE_DIR, model="other-model")
+
+        builder.build_vector_store()
+
+        assert len(FakeEmbeddings.texts) == 2
@@ -0,0 +1,75 @@
+"""Unit tests for token-budgeted context packing."""
+
+from src.generation.context_builder import ContextBuilder
+
+
+def make_chunk(source, chunk_id, content):
+    """Build a retrieved chunk dictionary."""
+    return {'content': content, 'metadata': {'source': source, 'chunk_id': chunk_id}}
+
+
+OVERLAP = "Roaming must be activated before travelling abroad. "
+FIRST = "International roaming is available on all postpaid plans. " + OVERLAP
+SECOND = OVERLAP + "Daily packs start at the price listed on the website."
+
+
+class TestContextBuilder:
+    """Test suite for ContextBuilder."""
+
+    def test_adjacent_chunks_merged_without_overlap(self):
+        """Neighbouring chunks of one source share their overlap only once."""
+        builder = ContextBuilder(max_tokens=1000)
+        packed = builder.build([
+            make_chunk("roaming_policy.txt", 4, SECOND),
+            make_chunk("roaming_policy.txt", 3, FIRST)
+        ])
+
+        assert packed['context'].count(OVERLAP.strip()) == 1
+        assert packed['context'].count("[Document") == 1
+        assert FIRST + SECOND[len(OVERLAP):] in packed['context']
+        assert packed['chunks_merged'] == 1
+        assert packed['tokens_saved'] > 0
+
+    def test_string_chunk_ids_are_merged(self):
+        """Chunk ids stored as strings (numpy backend metadata) still merge."""
+        builder = ContextBuilder(max_tokens=1000)
+        packed = builder.build([
+            make_chunk("roaming_policy.txt", "3", FIRST),
+            make_chunk("roaming_policy.txt", "4", SECOND)
+        ])
+
+        assert packed['chunks_merged'] == 1
+
+    def test_non_adjacent_chunks_kept_separate(self):
+        """Chunks from other sources or with gaps are separate documents."""
+        builder = ContextBuilder(max_tokens=1000)
+        packed = builder.build([
+            make_chunk("roaming_policy.txt", 1, FIRST),
+            make_chunk("roaming_policy.txt", 3, SECOND),
+            make_chunk("billing_policy.txt", 2, SECOND)
+        ])
+
+        assert packed['context'].count("[Document") == 3
+        assert packed['chunks_merged'] == 0
+
+    def test_budget_drops_lower_ranked_chunks(self):
+        """Chunks that would exceed the budget are dropped in rank order."""
+        builder = ContextBuilder(max_tokens=60)
+        packed = builder.build([
+            make_chunk("a.txt", 1, FIRST),
+            make_chunk("b.txt", 1, SECOND),
+            make_chunk("c.txt", 1, "Short.")
+        ])
+
+        assert packed['context'].startswith("[Document 1 - a.txt]")
+        assert "b.txt" not in packed['context']
+        assert packed['chunks_dropped'] >= 1
+        assert packed['context_tokens'] <= 60
+
+    def test_first_chunk_truncated_to_budget(self):
+        """The best chunk is always kept, truncated when it alone is too long."""
+        builder = ContextBuilder(max_tokens=10)
+        packed = builder.build([make_chunk("a.txt", 1, FIRST * 5)])
+
+        assert packed['chunks_used'] == 1
+        assert packed['context_tokens'] <= 12
@@ -0,0 +1,109 @@
+"""Unit tests for the two-tier query embedding cache."""
+
+import asyncio
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.retrieval.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that record every text sent to the model."""
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)) * self.scale, 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Location of the SQLite cache tier."""
+    return tmp_path / "query_embeddings.sqlite"
+
+
+class TestCachedEmbeddings:
+    """Test suite for CachedEmbeddings."""
+
+    def test_repeat_query_served_from_memory(self, cache_path):
+        """Normalized repeats should not reach the underlying model."""
+        base = CountingEmbeddings()
+        cache = CachedEmbeddings(base, model="m1", cache_path=cache_path)
+
+        first = cache.embed_query("What payment methods do you accept?")
+        second = cache.embed_query("  what payment methods   do you ACCEPT? ")
+
+        assert first == second
+        assert len(base.calls) == 1
+        assert cache.stats()['memory_hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_disk_tier_survives_restart(self, cache_path):
+        """A new cache instance should load vectors from SQLite."""
+        CachedEmbeddings(CountingEmbeddings(), model="m1", cache_path=cache_path).embed_query("roaming")
+
+        base = CountingEmbeddings()
+        cache = CachedEmbeddings(base, model="m1", cache_path=cache_path)
+        cache.embed_query("roaming")
+
+        assert base.calls == []
+        assert cache.stats()['disk_hits'] == 1
+
+    def test_model_change_invalidates(self, cache_path):
+        """Rows written for another model must not be served."""
+        CachedEmbeddings(CountingEmbeddings(), model="m1", cache_path=cache_path).embed_query("roaming")
+
+        base = CountingEmbeddings(scale=2.0)
+        cache = CachedEmbeddings(base, model="m2", cache_path=cache_path)
+
+        assert cache.stats()['disk_entries'] == 0
+        assert cache.embed_query("roaming") == [14.0, 1.0]
+        assert len(base.calls) == 1
+
+    def test_embed_documents_batches_only_misses(self, cache_path):
+        """Only uncached, distinct texts should be sent in one batch."""
+        base = CountingEmbeddings()
+        cache = CachedEmbeddings(base, model="m1", cache_path=cache_path)
+        cache.embed_query("a")
+
+        vectors = cache.embed_documents(["a", "bb", "bb", "ccc"])
+
+        assert vectors == [[1.0, 1.0], [2.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+        assert base.calls[-1] == ["bb", "ccc"]
+
+    def test_size_limits(self, cache_path):
+        """Both tiers should be bounded by their configured sizes."""
+        cache = CachedEmbeddings(
+            CountingEmbeddings(),
+            model="m1",
+            cache_path=cache_path,
+            max_memory_entries=2,
+            max_disk_entries=3
+        )
+
+        for text in ["a", "b", "c", "d", "e"]:
+            cache.embed_query(text)
+
+        stats = cache.stats()
+        assert stats['memory_entries'] == 2
+        assert stats['disk_entries'] == 3
+
+    def test_async_shares_cache_with_sync(self, cache_path):
+        """Async lookups should share cache entries with sync calls."""
+        base = CountingEmbeddings()
+        cache = CachedEmbeddings(base, model="m1", cache_path=cache_path)
+        cache.embed_query("billing")
+
+        vector = asyncio.run(cache.aembed_query("Billing"))
+        vectors = asyncio.run(cache.aembed_documents(["billing", "roaming"]))
+
+        assert vector == [7.0, 1.0]
+        assert vectors == [[7.0, 1.0], [7.0, 1.0]]
+        assert base.calls == [["billing"], ["roaming"]]
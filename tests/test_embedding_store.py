@@ -0,0 +1,130 @@
+"""Unit tests for the binary memory-mapped embedding store."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.data_preparation.manifest import content_hash
+from src.embeddings.embedding_store import EmbeddingStore, convert_json_to_store, make_chunk_id
+from src.retrieval.numpy_store import NumpyVectorStore
+
+
+@pytest.fixture
+def chunks():
+    """Small chunk list with unnormalized embeddings."""
+    return [
+        {
+            'content': f"chunk {i}",
+            'metadata': {'source': "billing_policy.txt", 'chunk_id': i},
+            'embedding': [float(i + 1), 0.0, 1.0, 0.0]
+        }
+        for i in range(3)
+    ]
+
+
+class TestEmbeddingStore:
+    """Test suite for EmbeddingStore."""
+
+    def test_write_and_mmap_roundtrip(self, tmp_path, chunks):
+        """Written stores should reopen memory-mapped with normalized rows."""
+        EmbeddingStore.write(chunks, directory=tmp_path, dtype="float32")
+        store = EmbeddingStore(tmp_path)
+
+        assert isinstance(store.matrix, np.memmap)
+        assert store.matrix.shape == (3, 4)
+        assert np.allclose(np.linalg.norm(store.matrix, axis=1), 1.0)
+        assert store.ids == [f"billing_policy.txt::{i}::{content_hash(f'chunk {i}')}" for i in range(3)]
+        assert store.get_chunks()[1] == {
+            'content': "chunk 1",
+            'metadata': {'source': "billing_policy.txt", 'chunk_id': 1}
+        }
+
+    def test_index_holds_only_ids_and_offsets(self, tmp_path, chunks):
+        """Chunk text lives in the chunks file and is read by offset."""
+        EmbeddingStore.write(chunks, directory=tmp_path, dtype="float32")
+        index = json.loads((tmp_path / EmbeddingStore.INDEX_FILE).read_text())
+
+        assert set(index['records'][0]) == {'id', 'row', 'offset', 'length'}
+        assert "chunk 1" not in json.dumps(index)
+
+        store = EmbeddingStore(tmp_path)
+        assert store.get_chunk(2)['content'] == "chunk 2"
+        vectors = NumpyVectorStore(store_dir=tmp_path)
+        results = vectors.similarity_search_by_vector_with_score([2.0, 0.0, 1.0, 0.0], k=1)
+        assert results[0]['content'] == "chunk 1"
+        assert results[0]['metadata'] == {'source': "billing_policy.txt", 'chunk_id': "1"}
+
+    def test_chunk_ids_are_stable_and_content_addressed(self):
+        """Ids depend on source, position and text only."""
+        metadata = {'source': "faqs.txt", 'chunk_id': 2}
+
+        assert make_chunk_id(metadata, "Text") == make_chunk_id(dict(metadata), "Text")
+        assert make_chunk_id(metadata, "Text") != make_chunk_id(metadata, "New text")
+        assert make_chunk_id({**metadata, 'content_hash': content_hash("Text")}) == make_chunk_id(metadata, "Text")
+        assert make_chunk_id(metadata) == "faqs.txt::2"
+
+    def test_float16_store(self, tmp_path, chunks):
+        """float16 stores halve the matrix size and still load for search."""
+        EmbeddingStore.write(chunks, directory=tmp_path, dtype="float16")
+        store = EmbeddingStore(tmp_path)
+
+        assert store.matrix.dtype == np.float16
+        vectors = NumpyVectorStore(store_dir=tmp_path)
+        assert vectors.matrix.dtype == np.float32
+        assert vectors.search([3.0, 0.0, 1.0, 0.0], k=1)[0][0] == 2
+
+    def test_numpy_store_uses_mmap_without_copy(self, tmp_path, chunks):
+        """A float32 normalized store should be searched in place."""
+        EmbeddingStore.write(chunks, directory=tmp_path, dtype="float32")
+
+        vectors = NumpyVectorStore(store_dir=tmp_path)
+
+        assert isinstance(vectors.matrix, np.memmap)
+        results = vectors.similarity_search_by_vector_with_score([1.0, 0.0, 1.0, 0.0], k=1)
+        assert results[0]['content'] == "chunk 0"
+
+    def test_convert_from_json(self, tmp_path, chunks):
+        """The converter should read a chunks_with_embeddings.json file."""
+        json_file = tmp_path / "chunks_with_embeddings.json"
+        json_file.write_text(json.dumps(chunks))
+
+        store = convert_json_to_store(json_file, tmp_path / "store")
+
+        assert store.count() == 3
+        assert EmbeddingStore.exists(tmp_path / "store")
+
+    def test_rejects_unknown_dtype(self, tmp_path, chunks):
+        """Only float32 and float16 matrices are supported."""
+        with pytest.raises(ValueError):
+            EmbeddingStore.write(chunks, directory=tmp_path, dtype="int8")
+
+    def test_rewrite_swaps_matrix_and_index_together(self, tmp_path, chunks):
+        """A rewrite publishes a new matrix file through the index and removes the old one."""
+        first = EmbeddingStore.write(chunks, directory=tmp_path, dtype="float32")
+        second = EmbeddingStore.write(chunks[:2], directory=tmp_path, dtype="float32")
+
+        assert second.matrix_file != first.matrix_file
+        assert list(tmp_path.glob(EmbeddingStore.MATRIX_PATTERN)) == [second.matrix_file]
+        assert list(tmp_path.glob(EmbeddingStore.CHUNKS_PATTERN)) == [second.chunks_file]
+        assert EmbeddingStore(tmp_path).count() == 2
+
+    def test_interrupted_write_keeps_previous_store(self, tmp_path, chunks, monkeypatch):
+        """A write that fails before the index swap leaves the old index and matrix in use."""
+        from src.embeddings import embedding_store
+
+        EmbeddingStore.write(chunks, directory=tmp_path, dtype="float32")
+        real_replace = embedding_store.os.replace
+
+        def crash_on_index(src, dst):
+            if str(dst).endswith(EmbeddingStore.INDEX_FILE):
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(embedding_store.os, "replace", crash_on_index)
+        with pytest.raises(OSError):
+            EmbeddingStore.write(chunks[:1], directory=tmp_path, dtype="float32")
+
+        store = EmbeddingStore(tmp_path)
+        assert store.count() == 3
+        assert store.get_chunks()[2]['content'] == "chunk 2"
@@ -0,0 +1,78 @@
+"""Unit tests for the shared pooled HTTP transport."""
+
+import asyncio
+
+import pytest
+
+from src.utils import http_client
+from src.utils.config import Config
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """Start and end every test without cached clients."""
+    http_client.close_http_clients()
+    yield
+    http_client.close_http_clients()
+
+
+class TestSharedHttpClients:
+    """Test suite for src.utils.http_client."""
+
+    def test_clients_are_process_wide_singletons(self):
+        """Repeated lookups return the same client objects."""
+        assert http_client.get_http_client("chat") is http_client.get_http_client("chat")
+        assert http_client.get_async_http_client("chat") is http_client.get_async_http_client("chat")
+
+    def test_endpoints_share_one_transport(self):
+        """Embeddings and chat clients pool connections through one transport."""
+        chat = http_client.get_http_client("chat")
+        embeddings = http_client.get_http_client("embeddings")
+
+        assert chat is not embeddings
+        assert chat._transport is embeddings._transport
+
+    def test_per_endpoint_timeouts(self, monkeypatch):
+        """Each endpoint uses its configured read timeout."""
+        monkeypatch.setattr(Config, "EMBEDDING_TIMEOUT", 7.0)
+        monkeypatch.setattr(Config, "CHAT_TIMEOUT", 90.0)
+        monkeypatch.setattr(Config, "EMBEDDING_ATTEMPT_TIMEOUT", 10.0)
+        monkeypatch.setattr(Config, "LLM_ATTEMPT_TIMEOUT", 120.0)
+
+        assert http_client.get_http_client("embeddings").timeout.read == 7.0
+        assert http_client.get_http_client("chat").timeout.read == 90.0
+        assert http_client.get_timeout("chat").connect == Config.HTTP_CONNECT_TIMEOUT
+
+    def test_timeout_capped_at_attempt_deadline(self, monkeypatch):
+        """Requests abandoned at their attempt deadline stop at the same time."""
+        monkeypatch.setattr(Config, "CHAT_TIMEOUT", 120.0)
+        monkeypatch.setattr(Config, "LLM_ATTEMPT_TIMEOUT", 60.0)
+
+        assert http_client.get_timeout("chat").read == 60.0
+
+    def test_unknown_endpoint_rejected(self):
+        """Typos in endpoint names fail loudly."""
+        with pytest.raises(ValueError):
+            http_client.get_timeout("completions")
+
+    def test_generator_uses_shared_client(self, fake_generator):
+        """AnswerGenerator is wired to the shared chat client by default."""
+        assert fake_generator.http_async_client is http_client.get_async_http_client("chat")
+
+    def test_async_client_survives_new_event_loops(self):
+        """Each asyncio.run gets its own pool, closed when that loop shuts down."""
+        from src.utils.mock_openai_server import start_server
+
+        server = start_server(dimensions=8)
+        client = http_client.get_async_http_client("embeddings")
+
+        async def embed():
+            response = await client.post(server.base_url + "/embeddings", json={"model": "m", "input": ["roaming"]})
+            return response.status_code
+
+        try:
+            assert [asyncio.run(embed()) for _ in range(3)] == [200, 200, 200]
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert len(client._transport._pools) == 0
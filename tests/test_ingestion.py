@@ -0,0 +1,159 @@
+"""Unit tests for incremental ingestion with the content-hash manifest."""
+
+import pytest
+
+from src.data_preparation import process_pipeline
+from src.data_preparation.manifest import IngestionManifest, content_hash
+from src.embeddings.embedding_generator import EmbeddingGenerator
+from src.utils.config import Config
+
+
+class ParagraphChunker:
+    """Offline stand-in for DocumentChunker: one chunk per paragraph."""
+
+    chunked = []
+
+    def chunk_document(self, document):
+        ParagraphChunker.chunked.append(document['filename'])
+        paragraphs = [p.strip() for p in document['content'].split("\n\n") if p.strip()]
+        return [
+            {
+                'content': paragraph,
+                'metadata': {
+                    'source': document['filename'],
+                    'chunk_id': i,
+                    'token_count': len(paragraph.split()),
+                    'content_hash': content_hash(paragraph)
+                }
+            }
+            for i, paragraph in enumerate(paragraphs)
+        ]
+
+    def validate_chunks(self, chunks):
+        return {'total_chunks': len(chunks), 'valid_chunks': len(chunks),
+                'min_tokens': 0, 'max_tokens': 0, 'avg_tokens': 0}
+
+
+class CountingEmbeddings:
+    """Offline embeddings that record every text sent for embedding."""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """Two raw documents and isolated chunk/manifest paths."""
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    (raw_dir / "billing.txt").write_text("Pay by card.\n\nBills arrive on the 5th.", encoding="utf-8")
+    (raw_dir / "roaming.txt").write_text("Roaming is activated in the app.", encoding="utf-8")
+
+    monkeypatch.setattr(Config, "RAW_DATA_DIR", raw_dir)
+    monkeypatch.setattr(Config, "CHUNKS_DATA_DIR", tmp_path)
+    monkeypatch.setattr(Config, "INGESTION_MANIFEST_FILE", tmp_path / "manifest.json")
+    monkeypatch.setattr(Config, "CHUNKS_WITH_EMBEDDINGS_FILE", tmp_path / "missing.json")
+    monkeypatch.setattr(Config, "DOCUMENT_FILES", ["billing.txt", "roaming.txt"])
+    monkeypatch.setattr(process_pipeline, "DocumentChunker", ParagraphChunker)
+    ParagraphChunker.chunked = []
+    return raw_dir
+
+
+@pytest.fixture
+def generator():
+    """EmbeddingGenerator over offline embeddings."""
+    generator = EmbeddingGenerator.__new__(EmbeddingGenerator)
+    generator.model_name = "test-embedding"
+    generator.embeddings = CountingEmbeddings()
+    return generator
+
+
+class TestIncrementalIngestion:
+    """Test suite for manifest-driven rechunking and re-embedding."""
+
+    def test_only_changed_documents_are_rechunked(self, corpus):
+        """Unchanged documents keep their chunks; the manifest reflects every file."""
+        first = process_pipeline.process_documents()
+        assert ParagraphChunker.chunked == ["billing.txt", "roaming.txt"]
+
+        ParagraphChunker.chunked = []
+        (corpus / "billing.txt").write_text("Pay by card or UPI.\n\nBills arrive on the 5th.", encoding="utf-8")
+        second = process_pipeline.process_documents()
+
+        assert ParagraphChunker.chunked == ["billing.txt"]
+        assert [chunk['content'] for chunk in second] == [
+            "Pay by card or UPI.", "Bills arrive on the 5th.", "Roaming is activated in the app."
+        ]
+        assert second[2] == first[2]
+
+        manifest = IngestionManifest.load()
+        assert set(manifest.files) == {"billing.txt", "roaming.txt"}
+        assert manifest.files["billing.txt"]["chunks"][0] == content_hash("Pay by card or UPI.")
+
+    def test_full_run_rechunks_everything(self, corpus):
+        """incremental=False ignores the manifest."""
+        process_pipeline.process_documents()
+        ParagraphChunker.chunked = []
+
+        process_pipeline.process_documents(incremental=False)
+
+        assert ParagraphChunker.chunked == ["billing.txt", "roaming.txt"]
+
+    def test_settings_change_invalidates_manifest(self, corpus, monkeypatch):
+        """Changing the chunk size rechunks unchanged documents."""
+        process_pipeline.process_documents()
+        ParagraphChunker.chunked = []
+        monkeypatch.setattr(Config, "CHUNK_SIZE", Config.CHUNK_SIZE + 100)
+
+        process_pipeline.process_documents()
+
+        assert ParagraphChunker.chunked == ["billing.txt", "roaming.txt"]
+
+    def test_manifest_diff(self):
+        """Chunks are classified by their position and content hash."""
+        old = IngestionManifest(settings={})
+        old.files = {"a.txt": {"hash": "1", "chunks": ["x", "y", "z"]}, "b.txt": {"hash": "2", "chunks": ["w"]}}
+        new = IngestionManifest(settings={})
+        new.files = {"a.txt": {"hash": "3", "chunks": ["x", "q"]}, "c.txt": {"hash": "4", "chunks": ["v"]}}
+
+        diff = new.diff(old)
+
+        assert diff == {
+            'added': ["c.txt::0"],
+            'changed': ["a.txt::1"],
+            'removed': ["a.txt::2", "b.txt::0"],
+            'unchanged': ["a.txt::0"],
+        }
+
+    def test_embeds_only_new_chunks_and_drops_removed(self, corpus, generator, tmp_path):
+        """Existing vectors are reused by content hash; removed chunks leave the store."""
+        store_dir = tmp_path / "store"
+        chunks = process_pipeline.process_documents()
+        generator.update_embedding_store(chunks, directory=store_dir)
+        assert len(generator.embeddings.texts) == 3
+
+        generator.embeddings.texts = []
+        (corpus / "billing.txt").write_text("Pay by card or UPI.", encoding="utf-8")
+        chunks = process_pipeline.process_documents()
+        store = generator.update_embedding_store(chunks, directory=store_dir)
+
+        assert generator.embeddings.texts == ["Pay by card or UPI."]
+        assert [chunk['content'] for chunk in store.get_chunks()] == [
+            "Pay by card or UPI.", "Roaming is activated in the app."
+        ]
+
+    def test_model_change_reembeds_everything(self, corpus, generator, tmp_path):
+        """Vectors from another embedding model are not reused."""
+        store_dir = tmp_path / "store"
+        chunks = process_pipeline.process_documents()
+        generator.update_embedding_store(chunks, directory=store_dir)
+
+        generator.embeddings.texts = []
+        generator.model_name = "other-embedding"
+        generator.update_embedding_store(chunks, directory=store_dir)
+
+        assert len(generator.embeddings.texts) == 3
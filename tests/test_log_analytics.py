@@ -0,0 +1,135 @@
+"""Unit tests for the streaming interaction log analytics."""
+
+import gzip
+import json
+
+import pytest
+
+from src.utils.log_analytics import (
+    SpaceSavingCounter, export_columnar, flatten_record, iter_frames, summarize
+)
+from src.utils.logger import JsonlWriter
+
+
+def interaction(query, sources, hour=10, latency=None):
+    """Build a compact interaction record as InteractionLogger writes it."""
+    metadata = {"model": "gpt-4o-mini", "top_k": 3, "cache": False}
+    if latency is not None:
+        metadata["timings"] = {"llm": latency / 2, "total": latency}
+        metadata["usage"] = {"total_tokens": 100, "cost_usd": 0.001}
+    return {
+        "timestamp": f"2024-05-01T{hour:02d}:15:00.000000",
+        "query": query,
+        "retrieved_chunks": [
+            {"id": f"{source}::0", "source": source, "chunk_id": 0, "distance": 0.3 + i / 10}
+            for i, source in enumerate(sources)
+        ],
+        "generated_response": "Answer.",
+        "metadata": metadata
+    }
+
+
+@pytest.fixture
+def rotated_log(tmp_path):
+    """A log with gzipped rotated segments and a live file."""
+    path = tmp_path / "interactions.jsonl"
+    writer = JsonlWriter(
+        path, background=False, fsync="never",
+        rotate_bytes=1500, rotate_interval=0, compress=True
+    )
+    for i in range(12):
+        writer.write(interaction("How do I pay my bill?", ["billing_policy.txt", "faqs.txt"], 10, 400))
+    for i in range(6):
+        writer.write(interaction("  Roaming   CHARGES? ", ["roaming_tariff.txt"], 11, 1200))
+    for i in range(2):
+        writer.write(interaction("Unrelated question", [], 11))
+    writer.close()
+    assert writer.segments()
+    return path
+
+
+class TestLogAnalytics:
+    """Test suite for reading, aggregating and exporting interaction logs."""
+
+    def test_flatten_compact_and_full_records(self):
+        """Sources and distances are read from both record layouts."""
+        compact = flatten_record(interaction("q", ["faqs.txt", "billing_policy.txt"], latency=250))
+        full = flatten_record({
+            "timestamp": "2024-05-01T10:00:00",
+            "query": "q",
+            "retrieved_chunks": [{"content": "...", "metadata": {"source": "faqs.txt"}, "distance": 0.5}],
+            "generated_response": "",
+            "metadata": {}
+        })
+
+        assert compact["sources"] == ["faqs.txt", "billing_policy.txt"]
+        assert compact["top_distance"] == pytest.approx(0.3)
+        assert compact["latency_ms"] == 250
+        assert full["sources"] == ["faqs.txt"]
+        assert full["latency_ms"] is None
+        assert full["cache"] == "none"
+
+    def test_summary_across_rotated_segments(self, rotated_log):
+        """Segments and the live file are read in chunks and aggregated together."""
+        frames = list(iter_frames([rotated_log], chunk_size=4))
+        assert max(len(frame) for frame in frames) <= 4
+
+        report = summarize([rotated_log.parent], chunk_size=4).report(top_n=5)
+
+        assert report["records"] == 20
+        assert report["empty_retrievals"] == 2
+        assert report["empty_retrieval_rate"] == pytest.approx(0.1)
+        assert report["top_queries"][0] == ("how do i pay my bill?", 12)
+        assert ("roaming charges?", 6) in report["top_queries"]
+        assert report["sources"][0][:2] in [("billing_policy.txt", 12), ("faqs.txt", 12)]
+        assert sum(hits for _, hits, _ in report["sources"]) == 30
+        assert report["total_tokens"] == 1800
+
+        latency = report["latency_by_hour"]
+        assert list(latency["requests"]) == [12, 8]
+        assert list(latency["mean_ms"]) == [400, 1200]
+        assert list(latency["p95_ms"]) == [400, 1200]
+
+    def test_top_queries_are_bounded(self, rotated_log):
+        """Tracking fewer distinct queries than logged keeps the heavy hitters."""
+        report = summarize([rotated_log], chunk_size=4, max_queries=2).report(top_n=5)
+
+        assert len(report["top_queries"]) <= 2
+        query, count = report["top_queries"][0]
+        assert query == "how do i pay my bill?"
+        assert 12 <= count <= 12 + report["top_queries_error"]
+
+    def test_space_saving_counter(self):
+        """Counts never underestimate and stay within the reported error."""
+        counter = SpaceSavingCounter(capacity=2)
+        counter.update({"a": 5, "b": 1, "c": 1})
+        counter.update({"d": 2})
+        counter.update({"a": 3})
+
+        assert len(counter.counts) == 2
+        assert counter.most_common(1) == [("a", 8)]
+        assert counter.error == 1
+        assert counter.counts["d"] == 3
+
+    def test_skips_malformed_lines(self, tmp_path):
+        """A truncated last line does not stop the analysis."""
+        path = tmp_path / "interactions-20240501-000000.jsonl.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(interaction("q", ["faqs.txt"])) + "\n")
+            f.write('{"timestamp": "2024-05-01T')
+
+        assert summarize([path]).records == 1
+
+    @pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+    def test_columnar_export_round_trip(self, rotated_log, tmp_path, suffix):
+        """Summaries from an export match those from the JSON lines logs."""
+        pytest.importorskip("pyarrow")
+        output = tmp_path / f"interactions{suffix}"
+
+        assert export_columnar(output, [rotated_log], chunk_size=7) == 20
+
+        original = summarize([rotated_log]).report()
+        exported = summarize([output], chunk_size=5).report()
+        for key in ("records", "empty_retrievals", "top_queries", "sources", "total_tokens"):
+            assert exported[key] == original[key]
+        assert exported["latency_by_hour"].equals(original["latency_by_hour"])
@@ -0,0 +1,234 @@
+"""Unit tests for the interaction logger and its background JSON lines writer."""
+
+import json
+import threading
+
+import pytest
+
+from src.data_preparation.manifest import content_hash
+from src.utils.logger import InteractionLogger, JsonlWriter
+
+
+def read_records(path):
+    """Parse every line of a JSON lines file."""
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestJsonlWriter:
+    """Test suite for batching, flushing and shutdown of JsonlWriter."""
+
+    def test_flush_writes_queued_records_in_order(self, tmp_path):
+        """Records queued before flush() are on disk when it returns."""
+        path = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(path, batch_size=3, flush_interval=60, fsync="never")
+
+        for i in range(7):
+            writer.write({"i": i})
+        assert writer.flush(timeout=5)
+
+        assert [record["i"] for record in read_records(path)] == list(range(7))
+        writer.close()
+
+    def test_time_based_flush(self, tmp_path):
+        """A partial batch is written once flush_interval has passed."""
+        path = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(path, batch_size=1000, flush_interval=0.05, fsync="never")
+        written = threading.Event()
+
+        original = writer._write_batch
+
+        def record_write(records):
+            original(records)
+            written.set()
+
+        writer._write_batch = record_write
+        writer.write({"query": "How do I pay?"})
+
+        assert written.wait(timeout=5)
+        assert read_records(path) == [{"query": "How do I pay?"}]
+        writer.close()
+
+    def test_close_drains_queue(self, tmp_path):
+        """Closing writes everything still queued and rejects new records."""
+        path = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(path, batch_size=1000, flush_interval=60, fsync="always")
+
+        for i in range(50):
+            writer.write({"i": i})
+        writer.close()
+
+        assert len(read_records(path)) == 50
+        with pytest.raises(ValueError):
+            writer.write({"i": 50})
+
+    def test_concurrent_writers(self, tmp_path):
+        """Records from many threads are written whole, none lost or torn."""
+        path = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(path, batch_size=16, flush_interval=0.01, fsync="interval")
+
+        def produce(thread_id):
+            for i in range(100):
+                writer.write({"thread": thread_id, "i": i, "text": "x" * 500})
+
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        records = read_records(path)
+        assert len(records) == 800
+        for thread_id in range(8):
+            assert [r["i"] for r in records if r["thread"] == thread_id] == list(range(100))
+
+    def test_synchronous_mode(self, tmp_path):
+        """With background=False each record is on disk when write() returns."""
+        path = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(path, background=False, fsync="never")
+
+        writer.write({"i": 1})
+
+        assert read_records(path) == [{"i": 1}]
+        writer.close()
+
+    def test_unknown_fsync_policy(self, tmp_path):
+        """Invalid fsync policies are rejected up front."""
+        with pytest.raises(ValueError):
+            JsonlWriter(tmp_path / "x.jsonl", fsync="sometimes", background=False)
+
+
+class TestInteractionLogger:
+    """Test suite for InteractionLogger with the background writer."""
+
+    def test_log_interaction_round_trip(self, tmp_path):
+        """Logged interactions appear in interactions.jsonl after flush()."""
+        logger = InteractionLogger(log_file=tmp_path / "interactions.log")
+
+        logger.log_interaction(
+            query="How do I activate roaming?",
+            retrieved_chunks=[{"content": "Use the app.", "metadata": {"source": "roaming.txt"}}],
+            generated_response="Use the app.",
+            metadata={"top_k": 1}
+        )
+        assert logger.flush(timeout=5)
+
+        [record] = read_records(tmp_path / "interactions.jsonl")
+        assert record["query"] == "How do I activate roaming?"
+        assert record["metadata"] == {"top_k": 1}
+        logger.close()
+
+    def test_shared_logger_is_created_on_first_use(self):
+        """No log file is opened until get_interaction_logger() is called."""
+        from src.utils import logger as logger_module
+        from src.utils.config import Config
+
+        assert logger_module._interaction_logger is None
+        assert not Config.LOG_FILE.exists()
+
+        shared = logger_module.get_interaction_logger()
+
+        assert shared is logger_module.get_interaction_logger()
+        assert shared.log_file == Config.LOG_FILE
+        assert Config.LOG_FILE.exists()
+
+    def test_interaction_logger_attribute_is_lazy(self):
+        """The interaction_logger re-export resolves to the shared logger on access."""
+        import src.utils
+        from src.utils import logger as logger_module
+
+        assert logger_module._interaction_logger is None
+        assert "interaction_logger" in src.utils.__all__
+        assert src.utils.interaction_logger is logger_module.get_interaction_logger()
+
+
+class TestCompactLogs:
+    """Test suite for compact records, rotation, compression and rehydration."""
+
+    CHUNK = {
+        "content": "Activate roaming from the mobile app.",
+        "metadata": {"source": "roaming_tariff.txt", "chunk_id": 3},
+        "distance": 0.42
+    }
+
+    def log_one(self, tmp_path, compact):
+        logger = InteractionLogger(log_file=tmp_path / "interactions.log", compact=compact)
+        logger.log_interaction("Roaming?", [self.CHUNK], "Use the app.")
+        logger.close()
+        [record] = read_records(tmp_path / "interactions.jsonl")
+        return record["retrieved_chunks"][0]
+
+    def test_compact_chunk_record(self, tmp_path):
+        """Compact mode logs the chunk reference and distance, not its text."""
+        chunk = self.log_one(tmp_path, compact=True)
+
+        assert chunk == {
+            "id": f"roaming_tariff.txt::3::{content_hash(self.CHUNK['content'])}",
+            "source": "roaming_tariff.txt",
+            "chunk_id": 3,
+            "distance": 0.42
+        }
+
+    def test_full_chunk_record(self, tmp_path):
+        """Full mode adds the text; source and distance come from the chunk."""
+        chunk = self.log_one(tmp_path, compact=False)
+
+        assert chunk["content"] == self.CHUNK["content"]
+        assert chunk["source"] == "roaming_tariff.txt"
+        assert chunk["distance"] == 0.42
+
+    def test_rehydrate_restores_content(self):
+        """Compact references are resolved against the chunk store."""
+        from src.utils.logger import rehydrate_interaction
+
+        record = {"query": "Roaming?", "retrieved_chunks": [
+            {"id": "roaming_tariff.txt::3", "source": "roaming_tariff.txt", "chunk_id": 3},
+            {"id": "gone.txt::0", "source": "gone.txt", "chunk_id": 0},
+        ]}
+
+        result = rehydrate_interaction(record, {"roaming_tariff.txt::3": "Activate roaming."})
+
+        assert [chunk["content"] for chunk in result["retrieved_chunks"]] == ["Activate roaming.", None]
+        assert "content" not in record["retrieved_chunks"][0]
+
+    def test_rotates_by_size_and_compresses(self, tmp_path):
+        """Full segments are moved aside and gzipped; the live file stays plain."""
+        import gzip
+
+        path = tmp_path / "interactions.jsonl"
+        writer = JsonlWriter(
+            path, background=False, fsync="never",
+            rotate_bytes=1000, rotate_interval=0, compress=True
+        )
+        for i in range(30):
+            writer.write({"i": i, "text": "x" * 100})
+        writer.close()
+
+        segments = writer.segments()
+        assert segments and all(segment.suffix == ".gz" for segment in segments)
+        records = []
+        for segment in segments:
+            with gzip.open(segment, "rt", encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f)
+        records.extend(read_records(path))
+        assert sorted(record["i"] for record in records) == list(range(30))
+        assert path.stat().st_size <= 1000
+
+    def test_rotates_when_period_ends(self, tmp_path, monkeypatch):
+        """A file from an earlier rotation period is rotated on the next write."""
+        path = tmp_path / "interactions.jsonl"
+        path.write_text('{"i": 0}\n', encoding="utf-8")
+        yesterday = path.stat().st_mtime - 86400
+        import os
+        os.utime(path, (yesterday, yesterday))
+
+        writer = JsonlWriter(
+            path, background=False, fsync="never",
+            rotate_bytes=0, rotate_interval=86400, compress=False
+        )
+        writer.write({"i": 1})
+        writer.close()
+
+        [segment] = writer.segments()
+        assert read_records(segment) == [{"i": 0}]
+        assert read_records(path) == [{"i": 1}]
@@ -0,0 +1,130 @@
+"""Unit tests for the metrics registry and its Prometheus exporters."""
+
+import urllib.request
+
+import pytest
+
+from src.utils import metrics
+from src.utils.metrics import MetricsRegistry, start_metrics_server
+
+
+class TestRegistry:
+    """Test suite for counters, gauges, histograms and text rendering."""
+
+    def test_counter_renders_labels(self):
+        """Counters render one sample per label set with HELP and TYPE lines."""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("cache",))
+        requests.inc(cache="none")
+        requests.inc(2, cache="semantic")
+
+        text = registry.render()
+
+        assert "# HELP requests_total Requests\n# TYPE requests_total counter\n" in text
+        assert 'requests_total{cache="none"} 1\n' in text
+        assert 'requests_total{cache="semantic"} 2\n' in text
+
+    def test_counter_rejects_decrease_and_wrong_labels(self):
+        """Counters only go up and require exactly their label names."""
+        counter = MetricsRegistry().counter("errors_total", "Errors", ("type",))
+
+        with pytest.raises(ValueError):
+            counter.inc(-1, type="x")
+        with pytest.raises(ValueError):
+            counter.inc(stage="llm")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Bucket counts include every smaller bucket, ending with +Inf."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1\n' in text
+        assert 'latency_seconds_bucket{le="1"} 2\n' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3\n' in text
+        assert "latency_seconds_sum 5.55\n" in text
+        assert "latency_seconds_count 3\n" in text
+
+    def test_label_values_are_escaped(self):
+        """Quotes, backslashes and newlines in label values are escaped."""
+        registry = MetricsRegistry()
+        registry.gauge("info", "Info", ("label",)).set(1, label='a"b\\c\nd')
+
+        assert 'info{label="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+    def test_registering_same_name_returns_same_metric(self):
+        """Families are created once and type mismatches are rejected."""
+        registry = MetricsRegistry()
+        counter = registry.counter("hits_total", "Hits")
+
+        assert registry.counter("hits_total", "Hits") is counter
+        with pytest.raises(ValueError):
+            registry.gauge("hits_total", "Hits")
+
+
+class TestExporters:
+    """Test suite for the HTTP endpoint and the textfile exporter."""
+
+    def test_http_endpoint_serves_metrics(self):
+        """GET /metrics returns the registry in exposition format."""
+        registry = MetricsRegistry()
+        registry.counter("scrapes_total", "Scrapes").inc()
+        server = start_metrics_server(port=0, host="127.0.0.1", metrics_registry=registry)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert "scrapes_total 1\n" in body
+
+    def test_write_textfile(self, tmp_path):
+        """The textfile exporter writes the rendered registry atomically."""
+        registry = MetricsRegistry()
+        registry.counter("writes_total", "Writes").inc()
+        path = tmp_path / "rag.prom"
+
+        registry.write_textfile(path)
+
+        assert path.read_text(encoding="utf-8") == registry.render()
+        assert list(tmp_path.iterdir()) == [path]
+
+
+class TestInstrumentation:
+    """Test suite for the metrics updated while answering questions."""
+
+    def test_generate_answer_updates_metrics(self, fake_generator):
+        """A fresh answer counts the request, its stages and the retrieval."""
+        fake_generator.answer_cache = None
+        requests_before = metrics.REQUESTS.value(mode="generate", cache="none")
+        llm_before = metrics.STAGE_LATENCY.count(stage="llm")
+        retrievals_before = metrics.RETRIEVED_CHUNKS.count()
+
+        fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        assert metrics.REQUESTS.value(mode="generate", cache="none") == requests_before + 1
+        assert metrics.STAGE_LATENCY.count(stage="llm") == llm_before + 1
+        assert metrics.RETRIEVED_CHUNKS.count() == retrievals_before + 1
+        assert metrics.REQUESTS_IN_FLIGHT.value() == 0
+
+    def test_failures_are_counted(self, fake_generator, monkeypatch):
+        """Exceptions while answering are counted by type."""
+        def fail(*args, **kwargs):
+            raise RuntimeError("vector store unavailable")
+
+        monkeypatch.setattr(fake_generator.retriever, "retrieve", fail)
+        fake_generator.answer_cache = None
+        before = metrics.REQUEST_ERRORS.value(mode="generate", error="RuntimeError")
+
+        with pytest.raises(RuntimeError):
+            fake_generator.generate_answer("How do I pay?", log_interaction=False)
+
+        assert metrics.REQUEST_ERRORS.value(mode="generate", error="RuntimeError") == before + 1
+        assert metrics.REQUESTS_IN_FLIGHT.value() == 0
@@ -0,0 +1,94 @@
+"""Wire-format tests for the local OpenAI-compatible stand-in server."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from src.generation.prompt_templates import PromptTemplates
+from src.utils.mock_openai_server import hash_embedding, start_server
+
+
+@pytest.fixture(scope="module")
+def mock_server():
+    """Stand-in server on a free local port."""
+    server = start_server(dimensions=64)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def chat_model(server, **kwargs):
+    return ChatOpenAI(model="mock-chat", api_key="mock", base_url=server.base_url, max_retries=0, **kwargs)
+
+
+def rag_messages():
+    prompt = PromptTemplates.format_rag_prompt(
+        query="How do I activate roaming?",
+        context="[Document 1 - roaming_policy.txt]\nRoaming is activated from the app. It takes 10 minutes.\n"
+    )
+    return [SystemMessage(content=PromptTemplates.SYSTEM_PROMPT), HumanMessage(content=prompt)]
+
+
+class TestMockOpenAIServer:
+    """Test suite for the mock server using the real OpenAI clients."""
+
+    def test_embeddings_are_deterministic(self, mock_server):
+        """Embeddings match the local hash function and are unit length."""
+        embeddings = OpenAIEmbeddings(
+            model="mock-embedding",
+            api_key="mock",
+            base_url=mock_server.base_url,
+            check_embedding_ctx_length=False
+        )
+
+        vectors = embeddings.embed_documents(["roaming charges", "bill payment"])
+
+        assert np.allclose(vectors[0], hash_embedding("roaming charges", 64), atol=1e-6)
+        assert np.isclose(np.linalg.norm(vectors[1]), 1.0)
+        assert embeddings.embed_query("roaming charges") == vectors[0]
+
+    def test_similar_texts_are_close(self):
+        """Texts sharing words score higher than unrelated texts."""
+        query = np.array(hash_embedding("activate international roaming", 256))
+        related = np.array(hash_embedding("how to activate roaming abroad", 256))
+        unrelated = np.array(hash_embedding("late payment fee on bills", 256))
+
+        assert query @ related > query @ unrelated
+
+    def test_chat_answer_uses_context(self, mock_server):
+        """The template answer quotes the first retrieved document."""
+        response = chat_model(mock_server).invoke(rag_messages())
+
+        assert "Roaming is activated from the app." in response.content
+        assert response.usage_metadata['total_tokens'] > 0
+
+    def test_streaming(self, mock_server):
+        """Streaming yields several chunks that add up to the full answer."""
+        model = chat_model(mock_server)
+
+        chunks = [chunk.content for chunk in model.stream(rag_messages())]
+
+        assert len([c for c in chunks if c]) > 3
+        assert "".join(chunks) == model.invoke(rag_messages()).content
+
+    def test_async_streaming(self, mock_server):
+        """The async client parses the SSE stream as well."""
+        async def consume():
+            return [chunk.content async for chunk in chat_model(mock_server).astream(rag_messages())]
+
+        assert "Roaming is activated" in "".join(asyncio.run(consume()))
+
+    def test_injected_errors(self):
+        """Configured error rates surface as HTTP errors."""
+        import openai
+
+        server = start_server(rate_limit_rate=1.0)
+        try:
+            with pytest.raises(openai.RateLimitError):
+                chat_model(server).invoke("hello")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,87 @@
+"""Unit tests for the in-process NumPy vector store."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.retrieval.numpy_store import NumpyVectorStore
+
+
+def make_chunks(vectors):
+    """Build chunk dictionaries around the given embedding vectors."""
+    return [
+        {
+            'content': f"chunk {i}",
+            'metadata': {'source': f"doc_{i % 2}.txt", 'chunk_id': i},
+            'embedding': list(vector)
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def store():
+    """Store with four orthogonal-ish vectors of different magnitudes."""
+    vectors = [
+        [1.0, 0.0, 0.0],
+        [0.0, 3.0, 0.0],
+        [0.0, 0.0, 0.5],
+        [2.0, 2.0, 0.0],
+    ]
+    return NumpyVectorStore.from_chunks(make_chunks(vectors))
+
+
+class TestNumpyVectorStore:
+    """Test suite for NumpyVectorStore."""
+
+    def test_matrix_is_normalized_float32(self, store):
+        """Rows should be unit length and stored contiguously as float32."""
+        assert store.matrix.dtype == np.float32
+        assert store.matrix.flags['C_CONTIGUOUS']
+        assert np.allclose(np.linalg.norm(store.matrix, axis=1), 1.0)
+
+    def test_search_orders_by_distance(self, store):
+        """Nearest vectors should come first with squared L2 distances."""
+        results = store.search([1.0, 0.1, 0.0], k=2)
+
+        assert [index for index, _ in results] == [0, 3]
+        assert results[0][1] < results[1][1]
+        assert all(0.0 <= distance <= 4.0 for _, distance in results)
+
+    def test_search_k_larger_than_store(self, store):
+        """Requesting more results than stored returns every vector."""
+        results = store.search([0.0, 1.0, 0.0], k=10)
+
+        assert len(results) == store.count()
+        assert results[0][0] == 1
+
+    def test_search_many_matches_search(self, store):
+        """Batched search should return the same hits as per-query search."""
+        queries = [[1.0, 0.1, 0.0], [0.0, 0.0, 1.0], [0.3, 0.2, 0.0]]
+
+        batched = store.search_many(queries, k=2)
+
+        assert len(batched) == len(queries)
+        for query, hits in zip(queries, batched):
+            expected = store.search(query, k=2)
+            assert [index for index, _ in hits] == [index for index, _ in expected]
+            assert [d for _, d in hits] == pytest.approx([d for _, d in expected], abs=1e-6)
+
+    def test_output_shape_matches_retriever(self, store):
+        """Results should use the retriever's content/metadata/distance keys."""
+        results = store.similarity_search_by_vector_with_score([0.0, 0.0, 1.0], k=1)
+
+        assert results[0]['content'] == "chunk 2"
+        assert results[0]['metadata'] == {'source': "doc_0.txt", 'chunk_id': "2"}
+        assert results[0]['distance'] == pytest.approx(0.0, abs=1e-6)
+
+    def test_load_from_file(self, tmp_path):
+        """The store should load a chunks_with_embeddings.json style file."""
+        chunks_file = tmp_path / "chunks_with_embeddings.json"
+        chunks_file.write_text(json.dumps(make_chunks([[1.0, 0.0], [0.0, 1.0]])))
+
+        store = NumpyVectorStore(chunks_file)
+
+        assert store.count() == 2
+        assert store.dimension == 2
@@ -0,0 +1,90 @@
+"""Unit tests for the opt-in CPU and memory profiling hooks."""
+
+import pstats
+
+import pytest
+
+from src.utils.config import Config
+from src.utils.profiling import profile, profile_path, profiled
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    """Write profiles to a temporary directory."""
+    directory = tmp_path / "profiles"
+    monkeypatch.setattr(Config, "PROFILES_DIR", directory)
+    return directory
+
+
+class TestProfiling:
+    """Test suite for RAG_PROFILE-driven profiling."""
+
+    def test_disabled_by_default(self, profiles_dir, monkeypatch):
+        """Nothing is written when RAG_PROFILE is unset."""
+        monkeypatch.setattr(Config, "PROFILE_MODE", "")
+
+        with profile("generate_answer", "How do I pay?"):
+            sum(range(1000))
+
+        assert not profiles_dir.exists()
+
+    def test_cpu_profile_is_loadable(self, profiles_dir, monkeypatch):
+        """CPU mode dumps a .prof file that pstats can read."""
+        monkeypatch.setattr(Config, "PROFILE_MODE", "cpu")
+
+        with profile("process_documents"):
+            sorted(range(10000), reverse=True)
+
+        [path] = profiles_dir.glob("process_documents-*.prof")
+        assert pstats.Stats(str(path)).total_calls > 0
+
+    def test_mem_profile_reports_allocations(self, profiles_dir, monkeypatch):
+        """Memory mode writes the peak and top allocation sites."""
+        monkeypatch.setattr(Config, "PROFILE_MODE", "mem")
+
+        with profile("build_vector_store"):
+            data = [bytearray(1024) for _ in range(200)]
+
+        [path] = profiles_dir.glob("build_vector_store-*.txt")
+        report = path.read_text(encoding="utf-8")
+        assert "Peak traced memory" in report
+        assert "test_profiling.py" in report
+        assert len(data) == 200
+
+    def test_nested_profiles_are_folded(self, profiles_dir, monkeypatch):
+        """Profiled calls inside a profiled block do not write their own file."""
+        monkeypatch.setattr(Config, "PROFILE_MODE", "cpu")
+
+        with profile("outer"):
+            with profile("inner"):
+                pass
+
+        assert [path.name.split("-")[0] for path in profiles_dir.iterdir()] == ["outer"]
+
+    def test_decorator_labels_by_argument(self, profiles_dir, monkeypatch):
+        """The label argument becomes a slug in the file name."""
+        monkeypatch.setattr(Config, "PROFILE_MODE", "cpu")
+
+        @profiled("generate_answer", label_arg="query")
+        def answer(query, top_k=None):
+            return query.upper()
+
+        assert answer("How do I pay my bill?") == "HOW DO I PAY MY BILL?"
+        [path] = profiles_dir.iterdir()
+        assert path.name.endswith("-how-do-i-pay-my-bill.prof")
+
+    def test_profile_path_slug_is_bounded(self, profiles_dir):
+        """Long or symbol-only labels still give short, safe file names."""
+        long_name = profile_path("generate_answer", "x" * 200).name
+        assert len(long_name) < 100
+        assert profile_path("generate_answer", "???").name.count("-") == 3
+
+    def test_generate_answer_is_profiled(self, fake_generator, profiles_dir, monkeypatch):
+        """generate_answer writes one profile labelled by the query."""
+        monkeypatch.setattr(Config, "PROFILE_MODE", "cpu")
+        fake_generator.answer_cache = None
+
+        fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        [path] = profiles_dir.glob("generate_answer-*how-do-i-activate-roaming.prof")
+        assert path.stat().st_size > 0
@@ -109,6 +109,27 @@ class TestRetriever:
         sources = [chunk['metadata'].get('source', '') for chunk in chunks]
         assert expected_source in sources, \
             f"Expected {expected_source} in sources, got {sources}"
+    
+    def test_retrieve_many_matches_retrieve(self, answer_generator):
+        """Test that batched retrieval returns per-query results in order."""
+        queries = [q['question'] for q in TEST_QUERIES]
+        batched = answer_generator.retriever.retrieve_many(queries, top_k=3)
+        
+        assert len(batched) == len(queries), "Should return one result list per query"
+        for query, chunks in zip(queries[:3], batched[:3]):
+            single = answer_generator.retriever.retrieve(query, top_k=3)
+            assert [c['content'] for c in chunks] == [c['content'] for c in single], \
+                f"Batched results differ from single retrieval for '{query}'"
+    
+    def test_generate_answer_with_batched_chunks(self, answer_generator):
+        """Test that pre-retrieved chunks can be passed to generate_answer."""
+        queries = [q['question'] for q in TEST_QUERIES[:2]]
+        batched = answer_generator.retriever.retrieve_many(queries)
+        
+        for query, chunks in zip(queries, batched):
+            result = answer_generator.generate_answer(query, retrieved_chunks=chunks)
+            assert result['retrieved_chunks'] == chunks, "Should reuse the given chunks"
+            assert result['answer'], "Answer should not be empty"
 
 
 class TestAnswerQuality:
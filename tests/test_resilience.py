@@ -0,0 +1,258 @@
+"""Unit tests for retries, deadlines, hedging and the circuit breaker."""
+
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from src.utils.config import Config
+from src.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    collect_call_stats,
+    is_retryable
+)
+
+
+def connection_error():
+    """A transient OpenAI connection error."""
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat"))
+
+
+def flaky(failures, result="ok", error_factory=connection_error):
+    """Return a callable that fails `failures` times before succeeding."""
+    calls = []
+
+    def call(*args):
+        calls.append(args)
+        if len(calls) <= failures:
+            raise error_factory()
+        return result
+
+    call.calls = calls
+    return call
+
+
+def make_caller(**kwargs):
+    """Caller with negligible backoff for fast tests."""
+    kwargs.setdefault("max_retries", 3)
+    kwargs.setdefault("base_delay", 0.001)
+    kwargs.setdefault("max_delay", 0.001)
+    kwargs.setdefault("hedge", False)
+    return ResilientCaller("test", **kwargs)
+
+
+class TestResilientCaller:
+    """Test suite for ResilientCaller."""
+
+    def test_retries_transient_errors(self):
+        """Transient failures are retried and counted."""
+        fn = flaky(2)
+
+        with collect_call_stats() as stats:
+            assert make_caller().call(fn, "x") == "ok"
+
+        assert len(fn.calls) == 3
+        assert stats.as_dict() == {'attempts': 3, 'retries': 2, 'hedges': 0, 'hedge_wins': 0}
+
+    def test_gives_up_after_max_retries(self):
+        """The last error is raised once retries are exhausted."""
+        fn = flaky(10)
+
+        with pytest.raises(openai.APIConnectionError):
+            make_caller(max_retries=2).call(fn)
+        assert len(fn.calls) == 3
+
+    def test_non_transient_error_not_retried(self):
+        """Errors such as bad requests propagate immediately."""
+        fn = flaky(1, error_factory=lambda: ValueError("bad prompt"))
+
+        with pytest.raises(ValueError):
+            make_caller().call(fn)
+        assert len(fn.calls) == 1
+
+    def test_attempt_deadline(self):
+        """An attempt over its deadline is abandoned and retried."""
+        calls = []
+
+        def slow_then_fast():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.5)
+            return "fast"
+
+        start = time.perf_counter()
+        assert make_caller(attempt_timeout=0.05).call(slow_then_fast) == "fast"
+        assert time.perf_counter() - start < 0.4
+
+    def test_queued_time_does_not_count_against_deadline(self, monkeypatch):
+        """The deadline starts when a worker picks the attempt up."""
+        monkeypatch.setattr(Config, "UPSTREAM_WORKERS", 1)
+        caller = make_caller(attempt_timeout=0.3, max_retries=0)
+        busy = caller._pool().submit(time.sleep, 0.2)
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.15)
+            return "done"
+
+        assert caller.call(work) == "done"
+        assert len(calls) == 1
+        busy.result()
+
+    def test_queued_attempts_cancelled_on_deadline(self, monkeypatch):
+        """A hedge still queued when the deadline passes never reaches the upstream."""
+        monkeypatch.setattr(Config, "UPSTREAM_WORKERS", 1)
+        calls = []
+
+        def first_slow():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return "slow"
+            return "fast"
+
+        caller = make_caller(hedge=True, hedge_min_delay=0.01, attempt_timeout=0.05, max_retries=1)
+        assert caller.call(first_slow) == "fast"
+        time.sleep(0.05)
+
+        assert len(calls) == 2
+
+    def test_astream_closes_abandoned_stream(self):
+        """A stream that misses its first-chunk deadline is closed before the retry."""
+        closed = []
+
+        class SlowStream:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                await asyncio.sleep(1)
+
+            async def aclose(self):
+                closed.append(1)
+
+        async def fast():
+            yield "a"
+
+        streams = [SlowStream(), fast()]
+
+        async def consume():
+            caller = make_caller(attempt_timeout=0.05, max_retries=1)
+            return [chunk async for chunk in caller.astream(lambda: streams.pop(0))]
+
+        assert asyncio.run(consume()) == ["a"]
+        assert closed == [1]
+
+    def test_hedged_request_wins(self):
+        """A hedged duplicate is sent for a slow call and its result is used."""
+        calls = []
+
+        def first_slow():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "hedge"
+
+        caller = make_caller(hedge=True, hedge_min_delay=0.02, attempt_timeout=5)
+        with collect_call_stats() as stats:
+            assert caller.call(first_slow) == "hedge"
+
+        assert stats.hedges == 1
+        assert stats.hedge_wins == 1
+
+    def test_async_retries(self):
+        """acall retries transient failures of coroutines."""
+        attempts = []
+
+        async def fn():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise connection_error()
+            return "ok"
+
+        assert asyncio.run(make_caller(attempt_timeout=1).acall(fn)) == "ok"
+        assert len(attempts) == 2
+
+    def test_stream_retries_before_first_chunk(self):
+        """A stream failing before its first chunk is restarted."""
+        attempts = []
+
+        def stream():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise connection_error()
+            yield from ["a", "b"]
+
+        assert list(make_caller().stream(stream)) == ["a", "b"]
+        assert len(attempts) == 2
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker."""
+
+    def test_opens_and_fails_fast(self):
+        """After the threshold the upstream is not called at all."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        caller = make_caller(max_retries=1, breaker=breaker)
+        fn = flaky(10)
+
+        with pytest.raises(openai.APIConnectionError):
+            caller.call(fn)
+        with pytest.raises(CircuitOpenError):
+            caller.call(fn)
+
+        assert breaker.state == "open"
+        assert len(fn.calls) == 2
+
+    def test_half_open_probe_closes(self, monkeypatch):
+        """A successful probe after the reset timeout closes the circuit."""
+        clock = [100.0]
+        monkeypatch.setattr("src.utils.resilience.time.monotonic", lambda: clock[0])
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+
+        clock[0] += 11
+        assert breaker.state == "half-open"
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_rate_limit_is_retryable(self):
+        """429 and 5xx responses are transient, 4xx are not."""
+        def status_error(code):
+            response = httpx.Response(code, request=httpx.Request("POST", "https://api.openai.com"))
+            return openai.APIStatusError("error", response=response, body=None)
+
+        assert is_retryable(status_error(429))
+        assert is_retryable(status_error(503))
+        assert not is_retryable(status_error(400))
+
+
+class TestAnswerGeneratorResilience:
+    """Test the resilience integration in AnswerGenerator."""
+
+    def test_retry_counts_in_result(self, fake_generator):
+        """A transient LLM failure is retried and reported in the result."""
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        fake_generator.llm_caller = make_caller(attempt_timeout=5)
+        invoke = fake_generator.llm.invoke
+        failures = []
+
+        def flaky_invoke(messages):
+            if not failures:
+                failures.append(1)
+                raise connection_error()
+            return invoke(messages)
+
+        object.__setattr__(fake_generator.llm, "invoke", flaky_invoke)
+        result = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        assert result['answer'].startswith("You can pay by card or UPI.")
+        assert result['resilience']['retries'] == 1
@@ -0,0 +1,54 @@
+"""Offline tests for batched retrieval on both vector store backends."""
+
+import pytest
+
+QUERIES = [
+    "How do I pay my bill?",
+    "How do I activate international roaming?",
+    "What is the fair usage policy?",
+]
+
+
+@pytest.fixture(params=["stub_retriever", "chroma_retriever"])
+def retriever(request):
+    """The offline retriever for each backend (numpy and chromadb)."""
+    return request.getfixturevalue(request.param)
+
+
+class TestRetrieveMany:
+    """Test suite for DocumentRetriever.retrieve_many."""
+
+    def test_matches_retrieve_in_query_order(self, retriever):
+        """Each batched result equals retrieve() for the query at the same position."""
+        batched = retriever.retrieve_many(QUERIES, top_k=3)
+
+        assert len(batched) == len(QUERIES)
+        for query, chunks in zip(QUERIES, batched):
+            single = retriever.retrieve(query, top_k=3)
+            assert [chunk['content'] for chunk in chunks] == [chunk['content'] for chunk in single]
+            assert [chunk['metadata'] for chunk in chunks] == [chunk['metadata'] for chunk in single]
+            assert [chunk['distance'] for chunk in chunks] == pytest.approx(
+                [chunk['distance'] for chunk in single], abs=1e-5
+            )
+
+    def test_returns_top_k_per_query(self, retriever):
+        """Every query gets the retriever's default number of chunks."""
+        batched = retriever.retrieve_many(QUERIES)
+
+        assert [len(chunks) for chunks in batched] == [retriever.top_k] * len(QUERIES)
+
+    def test_embeds_all_queries_in_one_call(self, retriever):
+        """All queries are embedded with a single embedding request."""
+        calls = retriever.embeddings.calls
+
+        retriever.retrieve_many(QUERIES)
+
+        assert retriever.embeddings.calls == calls + 1
+
+    def test_empty_queries(self, retriever):
+        """No queries return no results."""
+        assert retriever.retrieve_many([]) == []
+
+    def test_count(self, retriever):
+        """count() reports every stored chunk."""
+        assert retriever.count() == 4
@@ -0,0 +1,102 @@
+"""Unit tests for per-request timing spans and the stage breakdown in results."""
+
+import asyncio
+import time
+
+from src.utils.timing import Timings, collect_timings, current_timings, span
+
+
+class TestTimings:
+    """Test suite for Timings and the span context manager."""
+
+    def test_span_outside_request_is_noop(self):
+        """Spans entered while no request is being timed record nothing."""
+        with span("embed_query"):
+            pass
+
+        assert current_timings() is None
+
+    def test_spans_accumulate_by_name(self):
+        """Repeated stages add up and total covers the whole request."""
+        with collect_timings() as timings:
+            for _ in range(2):
+                with span("embed_query"):
+                    time.sleep(0.005)
+
+        result = timings.as_dict()
+
+        assert list(result) == ["embed_query", "total"]
+        assert result["embed_query"] >= 10
+        assert result["total"] >= result["embed_query"]
+
+    def test_collect_resets_context(self):
+        """The collector is removed from the context on exit."""
+        with collect_timings():
+            assert isinstance(current_timings(), Timings)
+
+        assert current_timings() is None
+
+    def test_spans_in_worker_threads_are_recorded(self):
+        """asyncio.to_thread copies the context, so its spans count too."""
+        def work():
+            with span("vector_search"):
+                pass
+
+        async def request():
+            with collect_timings() as timings:
+                await asyncio.to_thread(work)
+            return timings.as_dict()
+
+        assert "vector_search" in asyncio.run(request())
+
+
+class TestResultTimings:
+    """Test suite for the 'timings' breakdown returned by AnswerGenerator."""
+
+    def test_generate_answer_reports_stages(self, fake_generator):
+        """A fresh answer reports retrieval, prompt and LLM stages."""
+        fake_generator.answer_cache = None
+
+        timings = fake_generator.generate_answer(
+            "How do I activate roaming?", log_interaction=False
+        )['timings']
+
+        for stage in ("embed_query", "vector_search", "context_build", "prompt_build",
+                      "completion_cache", "llm", "total"):
+            assert stage in timings
+        assert timings["total"] >= timings["llm"]
+
+    def test_completion_cache_hit_skips_llm(self, fake_generator):
+        """An answer served from the completion cache has no LLM stage."""
+        fake_generator.answer_cache = None
+        fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        result = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        assert result['cache'] == 'completion'
+        assert "llm" not in result['timings']
+
+    def test_stream_reports_stages(self, fake_generator):
+        """Streamed answers carry the same breakdown once consumed."""
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        stream = fake_generator.stream_answer("How do I activate roaming?", log_interaction=False)
+        list(stream)
+
+        assert "llm" in stream.result['timings']
+        assert "vector_search" in stream.result['timings']
+
+    def test_timings_are_logged(self, fake_generator, monkeypatch):
+        """The interaction log metadata carries the stage timings."""
+        from src.utils.logger import get_interaction_logger
+
+        logged = []
+        monkeypatch.setattr(
+            get_interaction_logger(), "log_interaction",
+            lambda **kwargs: logged.append(kwargs)
+        )
+        fake_generator.answer_cache = None
+
+        fake_generator.generate_answer("How do I activate roaming?")
+
+        assert "llm" in logged[0]['metadata']['timings']
@@ -0,0 +1,147 @@
+"""Unit tests for token usage and cost accounting."""
+
+import asyncio
+
+from src.utils import usage as usage_module
+from src.utils.usage import (
+    TokenUsage,
+    UsageTrackingEmbeddings,
+    collect_usage,
+    count_tokens,
+    estimate_cost,
+    record_usage
+)
+
+
+class TestTokenUsage:
+    """Test suite for TokenUsage, pricing and the usage collector."""
+
+    def test_as_dict_totals_models_and_cost(self):
+        """Totals sum across models and the cost uses each model's pricing."""
+        usage = TokenUsage()
+        usage.add("gpt-4o-mini", prompt_tokens=1000, completion_tokens=200)
+        usage.add("text-embedding-3-small", estimated=True, embedding_tokens=50)
+
+        result = usage.as_dict()
+
+        assert result['prompt_tokens'] == 1000
+        assert result['completion_tokens'] == 200
+        assert result['embedding_tokens'] == 50
+        assert result['total_tokens'] == 1250
+        assert result['estimated'] is True
+        expected = (1000 * 0.15 + 200 * 0.60 + 50 * 0.02) / 1_000_000
+        assert abs(result['cost_usd'] - expected) < 1e-9
+
+    def test_dated_snapshot_uses_base_pricing(self):
+        """Dated model snapshots are priced like their base model."""
+        assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000) == estimate_cost("gpt-4o-mini", 1_000_000)
+        assert estimate_cost("my-local-model", 1000) is None
+
+    def test_merge_aggregates_per_model(self):
+        """Per-request usage can be aggregated into a run total."""
+        request = TokenUsage()
+        request.add("gpt-4o-mini", prompt_tokens=10, completion_tokens=5)
+        total = TokenUsage()
+
+        total.merge(request.as_dict())
+        total.merge(request.as_dict())
+        total.merge(None)
+
+        assert total.models["gpt-4o-mini"]["prompt_tokens"] == 20
+
+    def test_record_usage_goes_to_current_request(self):
+        """Recorded tokens are attributed to the enclosing collector only."""
+        with collect_usage() as outer:
+            record_usage("gpt-4o-mini", prompt_tokens=7)
+
+        record_usage("gpt-4o-mini", prompt_tokens=3)
+
+        assert outer.as_dict()['prompt_tokens'] == 7
+
+    def test_count_tokens_is_positive(self):
+        """Token counts work with or without a downloadable tokenizer."""
+        assert count_tokens("How do I activate international roaming?", "gpt-4o-mini") > 0
+        assert count_tokens("", "gpt-4o-mini") == 0
+
+
+class TestUsageTrackingEmbeddings:
+    """Test suite for counting embedding tokens."""
+
+    def test_embedding_tokens_are_counted(self, stub_retriever):
+        """Sync and async embedding calls both record embedding tokens."""
+        embeddings = UsageTrackingEmbeddings(stub_retriever.embeddings, "text-embedding-3-small")
+
+        with collect_usage() as usage:
+            embeddings.embed_query("roaming activation")
+            embeddings.embed_documents(["bill payment", "fair usage"])
+            asyncio.run(embeddings.aembed_query("data limits"))
+
+        counts = usage.models["text-embedding-3-small"]
+        expected = sum(
+            usage_module.count_tokens(text, "text-embedding-3-small")
+            for text in ("roaming activation", "bill payment", "fair usage", "data limits")
+        )
+        assert counts["embedding_tokens"] == expected
+
+
+class TestResultUsage:
+    """Test suite for the 'usage' field of AnswerGenerator results."""
+
+    def test_fake_llm_usage_is_estimated(self, fake_generator):
+        """Without provider usage, prompt and completion tokens are estimated."""
+        fake_generator.answer_cache = None
+
+        result = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        assert result['usage']['prompt_tokens'] > 0
+        assert result['usage']['completion_tokens'] > 0
+        assert result['usage']['estimated'] is True
+
+    def test_provider_usage_is_used(self, fake_generator):
+        """Counts reported by the provider are used as-is."""
+        from langchain_core.messages import AIMessage
+
+        class ReportingModel:
+            def invoke(self, messages):
+                return AIMessage(
+                    content="Pay by card.",
+                    usage_metadata={'input_tokens': 321, 'output_tokens': 4, 'total_tokens': 325}
+                )
+
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        fake_generator.llm = ReportingModel()
+
+        result = fake_generator.generate_answer("How do I pay?", log_interaction=False)
+
+        assert result['usage']['models'][fake_generator.llm_model] == {
+            'prompt_tokens': 321, 'completion_tokens': 4, 'embedding_tokens': 0
+        }
+        assert result['usage']['estimated'] is False
+
+    def test_completion_cache_hit_uses_no_llm_tokens(self, fake_generator):
+        """Answers reused from the completion cache cost no chat tokens."""
+        fake_generator.answer_cache = None
+        fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        result = fake_generator.generate_answer("How do I activate roaming?", log_interaction=False)
+
+        assert result['cache'] == 'completion'
+        assert result['usage']['prompt_tokens'] == 0
+
+    def test_streamed_usage_is_logged(self, fake_generator, monkeypatch):
+        """Streamed answers carry usage in the result and the interaction log."""
+        from src.utils.logger import get_interaction_logger
+
+        logged = []
+        monkeypatch.setattr(
+            get_interaction_logger(), "log_interaction",
+            lambda **kwargs: logged.append(kwargs)
+        )
+        fake_generator.answer_cache = None
+        fake_generator.completion_cache = None
+        stream = fake_generator.stream_answer("How do I activate roaming?")
+        list(stream)
+
+        assert stream.result['usage']['completion_tokens'] > 0
+        assert logged[0]['metadata']['usage'] == stream.result['usage']